@@ -1,10 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.config.config import config_by_name
 from app.utils.logger import Logger
 from app.common.response import register_error_handlers
+from app.common.compression import CompressionMiddleware
+from app.common.static_files import PrecompressedStaticFiles, get_index_path, create_index_response
+from app.utils.metrics import MetricsMiddleware, instrument_engine, render_metrics
+from app.utils.tracing import TracingMiddleware, trace_database, tracer
+from app.utils.profiler import ProfilingMiddleware
+from app.utils.slow_query import slow_query_log
 from app.api import router as api_router
 from app.api.internal_router import router as internal_api_router # internal_router 임포트
 import os
@@ -29,41 +34,84 @@ def create_app(config_name):
     config = config_by_name[config_name]()
     app.state.config = config
     
+    # 요청 단위 프로파일링 (X-Profile + X-Admin-Token), 비활성화 시 미들웨어 자체를 추가하지 않음
+    if config.PROFILING_ENABLED:
+        app.add_middleware(ProfilingMiddleware)
+    
+    # 응답 압축 (JSON/NDJSON/정적 텍스트)
+    if config.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=config.COMPRESSION_MINIMUM_SIZE,
+            gzip_level=config.COMPRESSION_GZIP_LEVEL,
+            brotli_quality=config.COMPRESSION_BROTLI_QUALITY,
+        )
+    
+    # 요청 ID 부여와 트레이싱 (traceparent/X-Request-ID를 하위 호출로 전파)
+    from app.database import engine, SessionLocal
+    app.state.tracer = tracer.init_app(app)
+    if tracer.enabled:
+        trace_database(engine, SessionLocal)
+    app.add_middleware(TracingMiddleware)
+    
+    # 느린 쿼리 기록 (임계값 이상만 링 버퍼에 저장)
+    app.state.slow_query_log = slow_query_log.init_app(app)
+    if slow_query_log.enabled:
+        slow_query_log.instrument(engine)
+    
+    # 요청/DB/외부 호출 메트릭 (압축 시간까지 포함하도록 가장 바깥에 추가)
+    if config.METRICS_ENABLED:
+        instrument_engine(engine)
+        app.add_middleware(MetricsMiddleware)
+    
     # Lab environment setup
     if config_name == 'lab_development':
         external_config = None
-        app.state.message_queue = None
     else:
         external_config = load_dynamic_config(config)
-        app.state.message_queue = None  # 필요시 MessageQueue 구현
     
     Logger.init_app(app)
     
+    # 이벤트 브로커 및 아웃박스 릴레이 설정
+    from app.core.message_broker import create_message_broker
+    from app.core.outbox_relay import OutboxRelay
+    app.state.message_queue = create_message_broker(config, external_config)
+    app.state.outbox_relay = OutboxRelay().init_app(app)
+    
+    # 난이도 설정 스냅샷 (DB 설정을 읽어 두고 버전이 바뀌면 교체)
+    from app.core.difficulty_settings import difficulty_settings
+    app.state.difficulty_settings = difficulty_settings.init_app(app)
+    
     # Initialize services based on environment
     if config_name == 'lab_development' or not CORE_MODULES_AVAILABLE:
-        # Use mocks for lab environment
-        from app.lab import MockStoryService, MockOpenAIService
-        app.state.story_service = MockStoryService().init_app(app)
+        # Use mocks for lab environment (이야기는 로컬 DB에 실제로 저장, 외부 서비스만 대역 사용)
+        from app.core.story_service import StoryService
+        from app.lab import MockOpenAIService
+        from app.lab.user_service import router as lab_user_service_router
+        app.state.story_service = StoryService().init_app(app)
         app.state.openai_service = MockOpenAIService().init_app(app)
+        app.include_router(lab_user_service_router, prefix="/lab/user-service", include_in_schema=False)
         app.state.s3_service = None
+        app.state.image_pipeline = None
+        app.state.image_gc = None
         app.state.external_config = None
     else:
         # Use real services for other environments
         from app.core.story_service import StoryService
         from app.core.openai_service import OpenAIService
         from app.core.s3_service import S3Service
+        from app.core.image_pipeline import ImagePipeline
+        from app.core.image_gc import ImageGarbageCollector
         app.state.story_service = StoryService().init_app(app)
         app.state.openai_service = OpenAIService().init_app(app)
         app.state.s3_service = S3Service().init_app(app)
+        app.state.image_pipeline = ImagePipeline().init_app(app)
+        app.state.image_gc = ImageGarbageCollector().init_app(app)
         app.state.external_config = external_config
 
-    # 데이터베이스 초기화
-    try:
-        from app.database import init_db
-        init_db()
-    except Exception as e:
-        print(f"데이터베이스 초기화 실패: {e}")
-        print("일부 기능이 제한될 수 있습니다.")
+    # 스키마 확인/연결 풀 워밍업 (앱 생성 시가 아니라 워커 startup 후 백그라운드에서 실행, /health/ready로 확인)
+    from app.core.warmup import AppWarmup
+    app.state.warmup = AppWarmup().init_app(app)
     
     # 정적 파일 서빙 설정 - FastAPI StaticFiles 사용으로 최적화
     static_dir = os.path.join(os.getcwd(), "static")
@@ -71,20 +119,20 @@ def create_app(config_name):
     print(f"Static directory exists: {os.path.exists(static_dir)}")
     
     if os.path.exists(static_dir):
-        # 정적 파일을 FastAPI의 StaticFiles로 서빙
-        app.mount("/static", StaticFiles(directory=static_dir), name="static")
+        # 정적 파일 서빙 (build_static.py 결과물은 미리 압축된 파일 + immutable 캐시)
+        app.mount("/static", PrecompressedStaticFiles(directory=static_dir), name="static")
         
         # 루트 경로에서 정적 파일 서빙
         @app.get("/")
         def serve_root():
-            return FileResponse(os.path.join(static_dir, "elderly", "index.html"))
+            return create_index_response(get_index_path(static_dir, "elderly"))
         
         # admin 페이지 서빙
         @app.get("/admin")
         def serve_admin():
-            admin_index = os.path.join(static_dir, "admin", "index.html")
+            admin_index = get_index_path(static_dir, "admin")
             if os.path.exists(admin_index):
-                return FileResponse(admin_index)
+                return create_index_response(admin_index)
             return {"error": "Admin page not found"}
     
     # 헬스체크 엔드포인트 추가
@@ -92,6 +140,23 @@ def create_app(config_name):
     def health_check():
         return {"status": "ok", "service": "story-api", "port": 8011}
     
+    # 프로세스 생존 확인 (DB 등 외부 상태와 무관, 실패 시 재시작 대상)
+    @app.get("/health/live")
+    def liveness_check():
+        return {"status": "ok"}
+    
+    # 트래픽 수신 가능 여부 (워밍업 완료 + DB 응답), 준비 전에는 503
+    @app.get("/health/ready")
+    def readiness_check():
+        ready, body = app.state.warmup.readiness()
+        return JSONResponse(body, status_code=200 if ready else 503)
+    
+    if config.METRICS_ENABLED:
+        # Prometheus 스크레이프 엔드포인트
+        @app.get("/metrics", include_in_schema=False)
+        def metrics():
+            return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+    
     app.include_router(api_router, prefix=config.APP_PREFIX)
     app.include_router(internal_api_router) # 내부 API 라우터 포함
     register_error_handlers(app)
@@ -1,9 +1,186 @@
-from fastapi import APIRouter
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import FileResponse, PlainTextResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
+from app.common.response import create_response, create_ndjson_response, BadRequest
+from app.common.compression import compression
+from app.database import get_db
+from app.helper.story_helper import query_story_list, iter_story_records, get_export_headers
+from app.helper.game_helper import get_difficulty_settings_version, list_difficulty_settings, save_difficulty_setting
+from app.core.difficulty_settings import GLOBAL_SCOPE, PROFILE_SCOPE, USER_SCOPE, difficulty_settings
+from app.api.difficulty import parse_settings_body
+from app.models.story import Story
+from app.utils.security import require_admin_token
+from app.utils import profiler
+import asyncio
+import cProfile
 
 router = APIRouter()
 
 @router.get("/")
 async def admin_panel():
     """Admin panel 메인 페이지"""
-    return FileResponse("static/admin/index.html") 
\ No newline at end of file
+    return FileResponse("static/admin/index.html")
+
+@router.post("/images/gc", dependencies=[Depends(require_admin_token)], description="고아 이미지 정리")
+async def collect_orphan_images(
+    request: Request,
+    dry_run: bool = Query(True, description="true면 삭제 없이 보고서만 반환"),
+    grace_hours: int = Query(None, ge=0, description="최근 업로드 보존 시간 (기본값: IMAGE_GC_GRACE_HOURS)")
+):
+    image_gc = getattr(request.app.state, 'image_gc', None)
+    if image_gc is None:
+        raise BadRequest("이미지 정리를 사용할 수 없는 환경입니다.")
+    
+    # 버킷 전체 목록 조회와 일괄 삭제는 블로킹이므로 스레드 풀에서 실행
+    loop = asyncio.get_running_loop()
+    report = await loop.run_in_executor(None, lambda: image_gc.collect(dry_run=dry_run, grace_hours=grace_hours))
+    return create_response(report)
+
+@router.get("/stories/export", dependencies=[Depends(require_admin_token)], description="전체 이야기 내보내기")
+@compression(gzip_level=1, brotli_quality=1)
+async def export_all_stories(
+    request: Request,
+    user_id: Optional[int] = None,
+    updated_after: Optional[str] = Query(None, description="ISO 8601 시각 이후 수정된 이야기만"),
+    gzip: bool = Query(False, description="true면 .ndjson.gz로 압축"),
+    include_segments: bool = True,
+    db: Session = Depends(get_db)
+):
+    query = query_story_list(db)
+    if user_id is not None:
+        query = query.filter(Story.user_id == user_id)
+    if updated_after:
+        try:
+            query = query.filter(Story.updated_at >= datetime.fromisoformat(updated_after))
+        except ValueError:
+            raise BadRequest(f"잘못된 시각 형식입니다: {updated_after}")
+    
+    return create_ndjson_response(
+        iter_story_records(db, query.order_by(Story.id), include_segments=include_segments),
+        headers=get_export_headers("stories-all", gzip),
+        gzip=gzip
+    )
+
+@router.get("/difficulty-settings", dependencies=[Depends(require_admin_token)], description="난이도 설정 조회")
+async def get_difficulty_settings_overview(request: Request, db: Session = Depends(get_db)):
+    """저장된 덮어쓰기 목록과 이 작업자가 사용 중인 스냅샷 (버전이 다르면 다음 갱신 주기에 반영)"""
+    snapshot = difficulty_settings.snapshot
+    return create_response({
+        "version": get_difficulty_settings_version(db),
+        "loaded_version": snapshot.version,
+        "loaded_at": datetime.fromtimestamp(snapshot.loaded_at).isoformat(),
+        "default_profile": snapshot.default_profile,
+        "global": dict(snapshot.global_thresholds),
+        "profiles": {name: dict(thresholds) for name, thresholds in snapshot.profiles.items()},
+        "overrides": [{
+            "scope": setting.scope,
+            "key": setting.scope_key,
+            "profile": setting.profile,
+            "settings": setting.overrides or {},
+            "version": setting.version,
+            "updated_by": setting.updated_by,
+            "updated_at": setting.updated_at.isoformat() if setting.updated_at else None
+        } for setting in list_difficulty_settings(db)]
+    })
+
+@router.put("/difficulty-settings/{scope}", dependencies=[Depends(require_admin_token)], description="난이도 설정 변경")
+async def update_difficulty_settings_scope(
+    request: Request,
+    scope: str,
+    body: dict,
+    db: Session = Depends(get_db)
+):
+    """
+    전체(global), 프로필(profile, key=프로필 이름), 사용자(user, key=사용자 ID) 설정 덮어쓰기 저장
+
+    global/user의 profile은 적용할 프로필이며, 모든 작업자가 다음 갱신 주기 안에 반영합니다.
+    """
+    snapshot = difficulty_settings.snapshot
+    key = str(body.get("key") or "").strip()
+    if scope == GLOBAL_SCOPE:
+        key = ""
+        profile, overrides = parse_settings_body(body, snapshot, base=snapshot.global_thresholds)
+    elif scope == PROFILE_SCOPE:
+        if not key or body.get("profile"):
+            raise BadRequest("프로필 설정은 key(프로필 이름)만 지정해야 합니다.")
+        key = key.upper()
+        profile, overrides = parse_settings_body(
+            body, snapshot, base=snapshot.profiles.get(key, snapshot.global_thresholds)
+        )
+    elif scope == USER_SCOPE:
+        if not key.isdigit():
+            raise BadRequest("사용자 설정은 key에 사용자 ID를 지정해야 합니다.")
+        profile, overrides = parse_settings_body(body, snapshot)
+    else:
+        raise BadRequest(f"지원하지 않는 범위입니다: {scope} (global | profile | user)")
+
+    saved = save_difficulty_setting(db, scope, key, profile, overrides)
+    difficulty_settings.refresh()
+    return create_response({"scope": scope, "key": key, "profile": profile, "settings": overrides, "version": saved.version})
+
+@router.get("/slow-queries", dependencies=[Depends(require_admin_token)], description="느린 쿼리 조회")
+async def get_slow_queries(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000, description="최근 기록 개수")
+):
+    """최근 느린 쿼리(최신순)와 지문별 집계(총 시간순, 실행 계획 포함)"""
+    slow_query_log = request.app.state.slow_query_log
+    return create_response({
+        "enabled": slow_query_log.enabled,
+        "threshold_ms": slow_query_log.threshold * 1000,
+        "entries": slow_query_log.get_entries(limit),
+        "fingerprints": slow_query_log.get_fingerprints(limit)
+    })
+
+@router.delete("/slow-queries", dependencies=[Depends(require_admin_token)], description="느린 쿼리 기록 초기화")
+async def clear_slow_queries(request: Request):
+    request.app.state.slow_query_log.clear()
+    return create_response({"cleared": True})
+
+@router.get("/profile", dependencies=[Depends(require_admin_token)], description="워커 프로세스 프로파일링")
+async def profile_worker(
+    request: Request,
+    seconds: float = Query(10.0, gt=0, description="측정 시간 (초)"),
+    format: str = Query("collapsed", pattern="^(collapsed|pstats)$", description="collapsed(flamegraph) | pstats"),
+    interval: float = Query(0.005, ge=0.001, le=1.0, description="샘플링 간격 (collapsed, 초)"),
+    include_idle: bool = Query(False, description="대기 중인 스레드 스택 포함 여부 (collapsed)"),
+    sort: str = Query("cumulative", description="pstats 정렬 기준")
+):
+    """
+    요청을 받은 워커에서 seconds 동안 프로파일 수집
+
+    collapsed는 모든 스레드를 샘플링하고, pstats는 이벤트 루프 스레드를 cProfile로 측정합니다.
+    여러 워커로 실행 중이면 요청을 받은 워커 하나만 측정됩니다.
+    """
+    config = request.app.state.config
+    if not config.PROFILING_ENABLED:
+        raise BadRequest("프로파일링이 비활성화되어 있습니다. (PROFILING_ENABLED)")
+    if seconds > config.PROFILE_MAX_SECONDS:
+        raise BadRequest(f"측정 시간은 최대 {config.PROFILE_MAX_SECONDS}초입니다.")
+    if format == "pstats" and sort not in ("cumulative", "tottime", "calls", "ncalls", "time"):
+        raise BadRequest(f"지원하지 않는 정렬 기준입니다: {sort}")
+
+    try:
+        profiler.acquire_profiler()
+    except profiler.ProfilerBusyError as e:
+        raise BadRequest(str(e))
+    try:
+        if format == "pstats":
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profile.disable()
+            return PlainTextResponse(profiler.format_pstats(profile, sort))
+
+        # 샘플링은 블로킹 대기이므로 스레드 풀에서 실행
+        loop = asyncio.get_running_loop()
+        collapsed, sample_count = await loop.run_in_executor(
+            None, lambda: profiler.sample_for(seconds, interval, include_idle)
+        )
+        return PlainTextResponse(collapsed, headers={"X-Profile-Samples": str(sample_count)})
+    finally:
+        profiler.release_profiler()
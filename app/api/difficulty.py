@@ -2,8 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.core.difficulty_service import DifficultyService
+from app.core.difficulty_rules import normalize_thresholds, validate_thresholds
+from app.core.difficulty_settings import USER_SCOPE, difficulty_settings
+from app.helper.game_helper import save_difficulty_setting
 from app.utils.security import get_current_user_validated
-from app.common.response import create_response
+from app.common.response import create_response, BadRequest
+from typing import Any, Mapping, Optional
 import logging
 
 router = APIRouter()
@@ -23,8 +27,7 @@ async def submit_game_result_with_difficulty(
         if game_result.get('user_id') != user_id:
             raise HTTPException(status_code=403, detail="자신의 게임 결과만 제출할 수 있습니다.")
         
-        # 게임 결과 저장
-        from app.helper.game_helper import save_game_result
+        # 게임 결과 저장 + 난이도 조절 (한 트랜잭션)
         from app.schemas.game_result import GameResultCreate
         
         result_create = GameResultCreate(
@@ -36,12 +39,7 @@ async def submit_game_result_with_difficulty(
             score=None  # 점수는 사용하지 않음
         )
         
-        saved_result = save_game_result(db, result_create)
-        
-        # 난이도 조절
-        difficulty_info = difficulty_service.update_user_difficulty(
-            db, user_id, game_result['game_type']
-        )
+        saved_result, difficulty_info = difficulty_service.record_game_result(db, result_create)
         
         # 사용자에게 메시지 생성
         message = difficulty_service.get_difficulty_message(
@@ -49,8 +47,8 @@ async def submit_game_result_with_difficulty(
             difficulty_info['recommended_game_type']
         )
         
-        logger.info(f"Game result submitted with difficulty adjustment: user_id={user_id}, "
-                   f"game_type={game_result['game_type']}, correct={game_result['is_correct']}")
+        logger.info("Game result submitted with difficulty adjustment: user_id=%s, game_type=%s, correct=%s",
+                    user_id, game_result['game_type'], game_result['is_correct'])
         
         return create_response({
             "message": "게임 결과가 성공적으로 저장되었습니다.",
@@ -60,7 +58,7 @@ async def submit_game_result_with_difficulty(
         })
         
     except Exception as e:
-        logger.error(f"Error submitting game result with difficulty: {e}")
+        logger.error("Error submitting game result with difficulty: %s", e)
         raise HTTPException(status_code=500, detail=f"게임 결과 저장에 실패했습니다: {str(e)}")
 
 @router.get("/recommendation", description="사용자에게 추천할 게임 유형 조회")
@@ -81,19 +79,14 @@ async def get_game_recommendation(
             recommended_game_type = 'SENTENCE_SEQUENCE'
             message = "문장 순서 맞추기부터 시작해보세요!"
         else:
-            # 기존 사용자는 성과를 바탕으로 추천
-            from app.helper.game_helper import get_recent_game_results
-            
-            total_games = len(get_recent_game_results(db, user_id, 'SENTENCE_SEQUENCE', 100)) + \
-                         len(get_recent_game_results(db, user_id, 'WORD_SEQUENCE', 100))
-            
-            if total_games < 5:  # 게임 기록이 5개 미만이면 쉬운 난이도로 시작
+            # 기존 사용자는 실력 점수를 바탕으로 추천 (난이도 행에 저장된 게임 수 사용)
+            if user_difficulty.rated_games < 5:  # 게임 기록이 5개 미만이면 쉬운 난이도로 시작
                 recommended_game_type = 'SENTENCE_SEQUENCE'
                 message = "게임 기록이 적어 문장 순서 맞추기부터 시작해보세요!"
             else:
                 # 충분한 게임 기록이 있으면 성과를 바탕으로 추천
                 recommended_game_type = difficulty_service.determine_next_game_type(
-                    db, user_id, user_difficulty.current_game_type
+                    db, user_id, user_difficulty.current_game_type, user_difficulty
                 )
                 message = difficulty_service.get_difficulty_message(
                     user_difficulty.current_game_type, recommended_game_type
@@ -107,7 +100,7 @@ async def get_game_recommendation(
         })
         
     except Exception as e:
-        logger.error(f"Error getting game recommendation: {e}")
+        logger.error("Error getting game recommendation: %s", e)
         raise HTTPException(status_code=500, detail=f"게임 추천 조회에 실패했습니다: {str(e)}")
 
 @router.get("/stats", description="사용자의 게임 통계 조회")
@@ -157,74 +150,89 @@ async def get_user_game_stats(
         })
         
     except Exception as e:
-        logger.error(f"Error getting user game stats: {e}")
+        logger.error("Error getting user game stats: %s", e)
         raise HTTPException(status_code=500, detail=f"게임 통계 조회에 실패했습니다: {str(e)}") 
 
-@router.put("/settings", description="난이도 조절 설정 변경")
+# 설정 조회 응답의 기준값 설명
+SETTINGS_DESCRIPTION = {
+    "PROMOTE_RATING": "실력 점수가 이 값 이상이면 단어 순서 맞추기로 상승",
+    "DEMOTE_RATING": "실력 점수가 이 값 이하면 문장 순서 맞추기로 하락 (두 기준 사이는 현재 난이도 유지)",
+    "CONSECUTIVE_SUCCESS_FOR_INCREASE": "연속 성공 시 난이도 상승 횟수",
+    "CONSECUTIVE_FAILURE_FOR_DECREASE": "연속 실패 시 난이도 하락 횟수",
+    "EASY_TO_MEDIUM": "쉬운 난이도에서 중간 난이도로 상승하는 성공률",
+    "HARD_TO_EASY": "어려운 난이도에서 쉬운 난이도로 하락하는 성공률",
+    "MIN_GAMES_FOR_ANALYSIS": "난이도 분석을 위한 최소 게임 수"
+}
+
+def parse_settings_body(body: dict, snapshot, base: Optional[Mapping[str, Any]] = None):
+    """
+    설정 변경 요청 본문을 (프로필, 덮어쓸 기준값)으로 검증 (잘못되면 BadRequest)
+
+    {"profile": "BEGINNER", "settings": {...}} 형식과 기준값만 나열한 이전 형식을 모두 받습니다.
+    base는 덮어쓸 기준값이며, 없으면 지정한 프로필(또는 기본 프로필)의 기준값입니다.
+    """
+    profile = body.get("profile")
+    overrides = body["settings"] if "settings" in body else {
+        key: value for key, value in body.items() if key not in ("profile", "scope", "key")
+    }
+    if not isinstance(overrides, dict):
+        raise BadRequest("settings는 객체여야 합니다.")
+    if profile is not None:
+        profile = str(profile).upper()
+        if profile not in snapshot.profiles:
+            raise BadRequest(f"알 수 없는 프로필: {body.get('profile')} (사용 가능: {', '.join(snapshot.profiles)})")
+    if base is None:
+        base = snapshot.profiles[profile] if profile else snapshot.default_thresholds
+    try:
+        normalized = normalize_thresholds(overrides)
+        validate_thresholds({**base, **normalized})
+    except ValueError as e:
+        raise BadRequest(str(e))
+    return profile, normalized
+
+@router.put("/settings", description="내 난이도 조절 설정 변경 (프로필, 기준값 덮어쓰기)")
 async def update_difficulty_settings(
     request: Request,
     settings: dict,
     db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_validated)
 ):
-    """사용자별 난이도 조절 설정을 변경합니다."""
+    """
+    사용자별 난이도 조절 설정을 요청 본문으로 교체합니다 (프로필을 생략하면 기본 프로필).
+
+    저장 후 이 작업자는 즉시, 다른 작업자는 다음 갱신 주기(DIFFICULTY_SETTINGS_POLL_INTERVAL) 안에 반영합니다.
+    """
+    profile, overrides = parse_settings_body(settings, difficulty_settings.snapshot)
     try:
-        # 관리자 권한 확인 (예시)
-        # if not is_admin(user_id):
-        #     raise HTTPException(status_code=403, detail="관리자만 설정을 변경할 수 있습니다.")
-        
-        # 설정 유효성 검사
-        valid_settings = {
-            'consecutive_success_for_increase': int,
-            'consecutive_failure_for_decrease': int,
-            'easy_to_medium_threshold': float,
-            'hard_to_easy_threshold': float,
-            'min_games_for_analysis': int
-        }
-        
-        for key, value_type in valid_settings.items():
-            if key in settings:
-                try:
-                    settings[key] = value_type(settings[key])
-                except (ValueError, TypeError):
-                    raise HTTPException(status_code=400, detail=f"잘못된 설정값: {key}")
-        
-        # 설정 저장 (예: Redis, DB, 환경변수 등)
-        # 여기서는 간단히 로그만 남김
-        logger.info(f"Difficulty settings updated by user {user_id}: {settings}")
+        saved = save_difficulty_setting(db, USER_SCOPE, str(user_id), profile, overrides, updated_by=user_id)
+        difficulty_settings.refresh()
+        snapshot = difficulty_settings.snapshot
+        
+        logger.info("Difficulty settings updated by user %s: profile=%s, settings=%s", user_id, profile, overrides)
         
         return create_response({
             "message": "난이도 조절 설정이 업데이트되었습니다.",
-            "settings": settings
+            "version": saved.version,
+            "profile": snapshot.profile_for(user_id),
+            "overrides": overrides,
+            "settings": dict(snapshot.thresholds_for(user_id))
         })
         
     except Exception as e:
-        logger.error(f"Error updating difficulty settings: {e}")
+        logger.error("Error updating difficulty settings: %s", e)
         raise HTTPException(status_code=500, detail=f"설정 변경에 실패했습니다: {str(e)}")
 
 @router.get("/settings", description="현재 난이도 조절 설정 조회")
 async def get_difficulty_settings(
     request: Request,
-    db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_validated)
 ):
-    """현재 난이도 조절 설정을 조회합니다."""
-    try:
-        from app.config.difficulty_config import get_difficulty_thresholds
-        
-        current_settings = get_difficulty_thresholds()
-        
-        return create_response({
-            "settings": current_settings,
-            "description": {
-                "CONSECUTIVE_SUCCESS_FOR_INCREASE": "연속 성공 시 난이도 상승 횟수",
-                "CONSECUTIVE_FAILURE_FOR_DECREASE": "연속 실패 시 난이도 하락 횟수",
-                "EASY_TO_MEDIUM_THRESHOLD": "쉬운 난이도에서 중간 난이도로 상승하는 성공률",
-                "HARD_TO_EASY_THRESHOLD": "어려운 난이도에서 쉬운 난이도로 하락하는 성공률",
-                "MIN_GAMES_FOR_ANALYSIS": "난이도 분석을 위한 최소 게임 수"
-            }
-        })
-        
-    except Exception as e:
-        logger.error(f"Error getting difficulty settings: {e}")
-        raise HTTPException(status_code=500, detail=f"설정 조회에 실패했습니다: {str(e)}") 
\ No newline at end of file
+    """현재 사용자에게 적용되는 난이도 조절 설정을 조회합니다 (메모리 스냅샷, DB 조회 없음)."""
+    snapshot = difficulty_settings.snapshot
+    return create_response({
+        "version": snapshot.version,
+        "profile": snapshot.profile_for(user_id),
+        "settings": dict(snapshot.thresholds_for(user_id)),
+        "profiles": list(snapshot.profiles),
+        "description": SETTINGS_DESCRIPTION
+    })
@@ -1,9 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.common.response import create_response
-from app.helper.story_helper import get_internal_stories_helper # 새로운 헬퍼 함수 임포트
-from app.schemas.story import StoryResponse
+from app.common.response import create_response, create_json_response, create_ndjson_response, BadRequest
+from app.common.compression import compression
+from app.helper.story_helper import (
+    get_internal_stories_helper, get_story_changes_helper, iter_story_changes,
+    parse_story_fields, serialize_story_list
+)
+from app.utils.functions import decode_cursor
+from app.helper.outbox_helper import get_outbox_events_after, serialize_outbox_event
 from app.database import get_db
 from app.models.story import Story # Story 모델 임포트
 import logging
@@ -22,14 +27,80 @@ async def get_internal_stories(
     updated_after: Optional[str] = None, # dify-data-sync-service에서 사용할 파라미터
     skip: int = 0, 
     limit: int = 100, 
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """인증 없이 내부 서비스가 이야기 목록을 조회합니다. (fields=id,title 또는 view=summary로 필요한 컬럼만 조회)"""
+    logger.info("Internal story fetch triggered. updated_after: %s", updated_after)
+    
+    selected_fields = parse_story_fields(fields, view)
+    stories = get_internal_stories_helper(db, skip=skip, limit=limit, updated_after=updated_after, fields=selected_fields)
+    
+    return create_json_response(serialize_story_list(stories, selected_fields))
+
+@router.get("/stories/changes", description="내부 서비스용 이야기 변경 피드 (커서 기반, 인증 없음)")
+@compression(gzip_level=1, brotli_quality=1)
+async def get_internal_story_changes(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    include_segments: bool = False,
+    format: str = "json",
     db: Session = Depends(get_db)
 ):
-    """인증 없이 내부 서비스가 이야기 목록을 조회합니다."""
-    logger.info(f"Internal story fetch triggered. updated_after: {updated_after}")
+    """
+    (updated_at, id) 순서로 생성/수정(upsert)과 삭제(delete) 변경을 전달합니다.
+    
+    - format=json: limit 단위 한 페이지와 meta.next_cursor 반환
+    - format=ndjson: 커서 이후 전체 변경을 한 줄에 하나씩 스트리밍 (전체 재동기화용)
     
-    stories = get_internal_stories_helper(db, skip=skip, limit=limit, updated_after=updated_after)
+    CHANGE_FEED_SAFETY_LAG_SECONDS보다 최근 변경은 다음 조회에서 전달됩니다.
+    """
+    logger.info("Internal story change feed triggered. cursor: %s, format: %s", cursor, format)
+    
+    if limit < 1 or limit > 1000:
+        raise BadRequest("limit은 1 이상 1000 이하여야 합니다.")
+    try:
+        decode_cursor(cursor)
+    except ValueError as e:
+        raise BadRequest(str(e))
+    safety_lag = request.app.state.config.CHANGE_FEED_SAFETY_LAG_SECONDS
+    
+    if format == "ndjson":
+        return create_ndjson_response(iter_story_changes(
+            db, cursor=cursor, page_size=limit, include_segments=include_segments, safety_lag=safety_lag
+        ))
+    if format != "json":
+        raise BadRequest("format은 json 또는 ndjson이어야 합니다.")
+    
+    changes, next_cursor, has_more = get_story_changes_helper(
+        db, cursor=cursor, limit=limit, include_segments=include_segments, safety_lag=safety_lag
+    )
+    return create_json_response(changes, meta={"next_cursor": next_cursor, "has_more": has_more})
+
+@router.get("/events", description="내부 서비스용 이야기 변경 이벤트 스트림 (sequence 기반, 인증 없음)")
+async def get_internal_events(
+    request: Request,
+    after_sequence: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """
+    아웃박스에 기록된 이야기 변경 이벤트를 sequence 순서로 조회합니다.
+    브로커를 구독하지 않는 소비자용 풀 방식이며, 소비자는 event_id로 중복을 제거합니다.
+    CHANGE_FEED_SAFETY_LAG_SECONDS보다 최근 이벤트는 다음 조회에서 전달됩니다.
+    """
+    if limit < 1 or limit > 1000:
+        raise BadRequest("limit은 1 이상 1000 이하여야 합니다.")
     
-    return create_response([StoryResponse.model_validate(story.__dict__) for story in stories])
+    safety_lag = request.app.state.config.CHANGE_FEED_SAFETY_LAG_SECONDS
+    events = [
+        serialize_outbox_event(event)
+        for event in get_outbox_events_after(db, after_sequence, limit, safety_lag=safety_lag)
+    ]
+    next_sequence = events[-1]["sequence"] if events else after_sequence
+    return create_json_response(events, meta={"next_sequence": next_sequence})
 
 @router.get("/story-ids", description="내부 서비스용 모든 이야기 ID 목록 조회 (인증 없음)")
 async def get_all_story_ids(
@@ -20,12 +20,12 @@ async def get_personalized_recommendation(
     try:
         recommendation = personalization_service.get_personalized_recommendation(db, user_id)
         
-        logger.info(f"Personalized recommendation generated for user {user_id}: {recommendation['recommended_game_type']}")
+        logger.info("Personalized recommendation generated for user %s: %s", user_id, recommendation['recommended_game_type'])
         
         return create_response(recommendation)
         
     except Exception as e:
-        logger.error(f"Error getting personalized recommendation: {e}")
+        logger.error("Error getting personalized recommendation: %s", e)
         raise HTTPException(status_code=500, detail=f"개인화된 추천 조회에 실패했습니다: {str(e)}")
 
 @router.get("/learning-progress", description="학습 진행도 조회")
@@ -97,7 +97,7 @@ async def get_learning_progress(
         })
         
     except Exception as e:
-        logger.error(f"Error getting learning progress: {e}")
+        logger.error("Error getting learning progress: %s", e)
         raise HTTPException(status_code=500, detail=f"학습 진행도 조회에 실패했습니다: {str(e)}")
 
 @router.get("/performance-insights", description="성과 인사이트 조회")
@@ -152,5 +152,5 @@ async def get_performance_insights(
         })
         
     except Exception as e:
-        logger.error(f"Error getting performance insights: {e}")
+        logger.error("Error getting performance insights: %s", e)
         raise HTTPException(status_code=500, detail=f"성과 인사이트 조회에 실패했습니다: {str(e)}") 
\ No newline at end of file
@@ -1,76 +1,134 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status, Request
 from sqlalchemy.orm import Session
-from typing import List
-from app.common.response import create_response, NotFoundError, BadRequest
+from typing import List, Optional
+from app.common.response import create_response, create_json_response, create_ndjson_response, NotFoundError, BadRequest
+from app.common.compression import compression
 from app.helper.story_helper import (
     create_story_helper, get_stories_helper, get_story_helper,
-    update_story_helper, delete_story_helper
+    update_story_helper, delete_story_helper, add_story_tombstone,
+    parse_story_fields, query_story_list, iter_story_records, get_export_headers, get_story_page_helper,
+    pick_story_for_level, pick_segment_for_level
 )
+from app.helper.game_helper import get_user_difficulty
+from app.helper.outbox_helper import add_story_event, STORY_UPDATED, STORY_DELETED
 from app.schemas.story import StoryCreate, StoryUpdate, StoryResponse
+from app.config.config import Config
 from app.database import get_db
 from app.utils.security import get_current_user_validated
 from app.models.story import Story, StorySegment
 from app.core.story_service import StoryService
-import random
+from app.core.difficulty_rules import RATING_INITIAL, puzzle_difficulty_band
+from app.utils.functions import make_excerpt, decode_cursor
+from app.utils.metrics import track_dependency, record_dependency_error
+from app.utils.tracing import get_trace_headers
+import logging
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 story_service = StoryService()
 
+# 사용자/보호자 조회용 User Service (app/utils/security.py와 같은 설정)
+USER_SERVICE_URL = Config.USER_SERVICE_URL
+
 @router.get("/", description="이야기 목록 조회")
 async def get_stories(
     request: Request,
-    skip: int = 0, 
-    limit: int = 100, 
+    cursor: Optional[str] = Query(None, description="이전 응답의 meta.next_cursor"),
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="조회할 필드 (쉼표 구분, 예: id,title,image_variants)"),
+    view: Optional[str] = Query(None, description="full | summary (summary는 content 대신 excerpt, segment_count)"),
+    include_total: bool = Query(False, description="meta.total 포함 (PostgreSQL은 플래너 추정치)"),
     db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_validated)
 ):
-    """로그인 사용자의 이야기 목록 조회 (시니어는 보호자의 이야기도 포함)"""
-    # 사용자 정보 가져오기
-    user_response = await get_user_info_from_user_service(user_id)
-    user_role = user_response.get('role')
+    """
+    로그인 사용자의 이야기 목록을 최신순 키셋 페이지로 조회 (시니어는 보호자의 이야기도 포함)
     
-    if user_role == 'senior':
-        # 시니어인 경우: 자신의 이야기 + 보호자의 이야기
-        stories = await get_stories_for_senior(db, user_id)
-    else:
-        # 보호자인 경우: 자신이 등록한 이야기만
-        stories = db.query(Story).filter(Story.user_id == user_id).offset(skip).limit(limit).all()
+    다음 페이지는 meta.next_cursor를 cursor로 전달해 조회하며, 마지막 페이지면 next_cursor가 null입니다.
+    """
+    selected_fields = parse_story_fields(fields, view)
+    try:
+        decode_cursor(cursor)
+    except ValueError as e:
+        raise BadRequest(str(e))
     
-    return create_response([StoryResponse.model_validate(story.__dict__) for story in stories])
+    # 시니어: 자신 + 보호자의 이야기, 보호자: 자신이 등록한 이야기
+    user_ids = await get_visible_user_ids(user_id)
+    records, meta = get_story_page_helper(
+        db, user_ids, cursor=cursor, limit=limit, fields=selected_fields, include_total=include_total
+    )
+    return create_json_response(records, meta=meta)
 
 async def get_user_info_from_user_service(user_id: int):
     """User Service에서 사용자 정보 가져오기"""
     import httpx
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"http://user-service:8000/users/{user_id}")
-        if response.status_code == 200:
-            return response.json()
-        return {"role": "senior"}  # 기본값
-
-async def get_stories_for_senior(db: Session, senior_id: int):
-    """시니어를 위한 이야기 목록 (자신의 이야기 + 보호자의 이야기)"""
+    with track_dependency("user_service", "get_user"):
+        async with httpx.AsyncClient(headers=get_trace_headers()) as client:
+            response = await client.get(f"{USER_SERVICE_URL}/users/{user_id}")
+    if response.status_code == 200:
+        return response.json()
+    if response.status_code >= 500:
+        record_dependency_error("user_service", "get_user")
+    return {"role": "senior"}  # 기본값
+
+async def get_guardian_ids(senior_id: int) -> List[int]:
+    """User Service에서 시니어의 보호자 ID 목록 가져오기"""
     import httpx
     
-    # 1. 시니어의 보호자 목록 가져오기
-    async with httpx.AsyncClient() as client:
-        # 특정 시니어의 보호자 목록을 가져오기
-        response = await client.get(f"http://user-service:8000/users/{senior_id}/guardians")
-        if response.status_code == 200:
-            guardians_data = response.json()
-            guardian_ids = [guardian['id'] for guardian in guardians_data]
-        else:
-            # API 호출 실패 시 로그 출력
-            print(f"가족 관계 조회 실패: {response.status_code} - {response.text}")
-            guardian_ids = []
-    
-    # 2. 자신의 이야기 + 보호자들의 이야기 가져오기
-    all_user_ids = [senior_id] + guardian_ids
-    print(f"시니어 {senior_id}의 이야기 조회: 사용자 ID들 = {all_user_ids}")
-    
-    stories = db.query(Story).filter(Story.user_id.in_(all_user_ids)).all()
-    print(f"총 {len(stories)}개의 이야기 발견")
-    
-    return stories
+    with track_dependency("user_service", "get_guardians"):
+        async with httpx.AsyncClient(headers=get_trace_headers()) as client:
+            # 특정 시니어의 보호자 목록을 가져오기
+            response = await client.get(f"{USER_SERVICE_URL}/users/{senior_id}/guardians")
+    if response.status_code == 200:
+        guardians_data = response.json()
+        return [guardian['id'] for guardian in guardians_data]
+    if response.status_code >= 500:
+        record_dependency_error("user_service", "get_guardians")
+    # API 호출 실패 시 로그 출력
+    logger.warning("가족 관계 조회 실패: %s - %s", response.status_code, response.text)
+    return []
+
+async def get_visible_user_ids(user_id: int) -> List[int]:
+    """이야기 목록에 포함할 사용자 ID (시니어: 자신 + 보호자, 보호자: 자신)"""
+    user_response = await get_user_info_from_user_service(user_id)
+    if user_response.get('role') == 'senior':
+        return [user_id] + await get_guardian_ids(user_id)
+    return [user_id]
+
+@router.get("/stream", description="이야기 목록 스트리밍 (NDJSON)")
+@compression(gzip_level=1, brotli_quality=1)
+async def stream_stories(
+    request: Request,
+    fields: Optional[str] = Query(None, description="조회할 필드 (쉼표 구분)"),
+    view: Optional[str] = Query(None, description="full | summary"),
+    include_segments: bool = False,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_validated)
+):
+    """목록 전체를 한 줄에 하나씩 스트리밍 (결과 크기와 무관하게 첫 바이트가 바로 전송됨)"""
+    selected_fields = parse_story_fields(fields, view)
+    user_ids = await get_visible_user_ids(user_id)
+    query = query_story_list(db, selected_fields).filter(Story.user_id.in_(user_ids)).order_by(Story.id)
+    return create_ndjson_response(
+        iter_story_records(db, query, selected_fields, include_segments=include_segments)
+    )
+
+@router.get("/export", description="이야기 내보내기 (NDJSON 파일, gzip 선택)")
+@compression(gzip_level=1, brotli_quality=1)
+async def export_stories(
+    request: Request,
+    gzip: bool = Query(False, description="true면 .ndjson.gz로 압축"),
+    include_segments: bool = True,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_validated)
+):
+    user_ids = await get_visible_user_ids(user_id)
+    query = query_story_list(db).filter(Story.user_id.in_(user_ids)).order_by(Story.id)
+    return create_ndjson_response(
+        iter_story_records(db, query, include_segments=include_segments),
+        headers=get_export_headers("stories", gzip),
+        gzip=gzip
+    )
 
 @router.post("/", status_code=status.HTTP_201_CREATED, description="이야기 생성")
 async def create_story(
@@ -82,7 +140,8 @@ async def create_story(
     """로그인 사용자의 이야기 생성 (문장 분할 포함)"""
     try:
         # StoryService를 사용하여 이야기 생성 (문장 분할 포함)
-        result = story_service.create_story(db, story, request.app, user_id)
+        image_variants = await story_service.get_image_variants(request.app, story.image_url)
+        result = story_service.create_story(db, story, request.app, user_id, image_variants=image_variants)
         return create_response(result)
     except Exception as e:
         raise BadRequest(f"이야기 생성에 실패했습니다: {str(e)}")
@@ -119,80 +178,63 @@ async def get_story_segments(
         "segment_text": segment.segment_text
     } for segment in segments])
 
-@router.get("/segments/random", description="랜덤 세그먼트 조회")
+def get_puzzle_band(db: Session, user_id: int):
+    """사용자 실력 점수에 맞는 퍼즐 난이도 구간 (난이도 기록이 없으면 초기 점수 기준)"""
+    user_difficulty = get_user_difficulty(db, user_id)
+    rating = user_difficulty.skill_rating if user_difficulty else RATING_INITIAL
+    return puzzle_difficulty_band(rating)
+
+@router.get("/segments/random", description="랜덤 세그먼트 조회 (실력에 맞는 난이도)")
 async def get_random_segment(
     request: Request,
     db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_validated)
 ):
-    """사용자의 모든 이야기에서 랜덤으로 하나의 세그먼트 조회 (시니어는 보호자의 이야기도 포함)"""
-    # 사용자 정보 가져오기
-    user_response = await get_user_info_from_user_service(user_id)
-    user_role = user_response.get('role')
-    
-    if user_role == 'senior':
-        # 시니어인 경우: 자신의 이야기 + 보호자의 이야기
-        stories = await get_stories_for_senior(db, user_id)
-    else:
-        # 보호자인 경우: 자신이 등록한 이야기만
-        stories = db.query(Story).filter(Story.user_id == user_id).all()
-    
-    if not stories:
-        raise NotFoundError("사용자의 이야기가 없습니다.")
-    
-    story_ids = [story.id for story in stories]
-    
-    # 모든 세그먼트 가져오기
-    all_segments = db.query(StorySegment).filter(StorySegment.story_id.in_(story_ids)).all()
-    if not all_segments:
+    """사용자의 이야기에서 실력에 맞는 난이도의 세그먼트 하나를 무작위로 조회 (시니어는 보호자의 이야기도 포함)"""
+    user_ids = await get_visible_user_ids(user_id)
+    low, high = get_puzzle_band(db, user_id)
+
+    # 난이도 인덱스에서 구간에 맞는 이야기와 세그먼트 선택 (전체 조회 없음)
+    picked_story = pick_story_for_level(db, user_ids, low, high)
+    if picked_story is None:
         raise NotFoundError("사용할 수 있는 세그먼트가 없습니다.")
-    
-    # 랜덤으로 하나 선택
-    random_segment = random.choice(all_segments)
-    
+
+    random_segment = pick_segment_for_level(db, picked_story[0], low, high)
+    if random_segment is None:
+        raise NotFoundError("사용할 수 있는 세그먼트가 없습니다.")
+
     return create_response({
         "id": random_segment.id,
         "story_id": random_segment.story_id,
         "order": random_segment.order,
-        "segment_text": random_segment.segment_text
+        "segment_text": random_segment.segment_text,
+        "difficulty_score": random_segment.difficulty_score
     })
 
-@router.get("/segments/sentence/random", description="랜덤 문장 단위 세그먼트 조회")
+@router.get("/segments/sentence/random", description="랜덤 문장 단위 세그먼트 조회 (실력에 맞는 난이도)")
 async def get_random_sentence_segment(
     request: Request,
     db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_validated)
 ):
-    """사용자의 모든 이야기에서 랜덤으로 하나의 이야기를 선택하고, 그 이야기의 모든 문장들을 반환 (SENTENCE_SEQUENCE용)"""
-    # 사용자 정보 가져오기
-    user_response = await get_user_info_from_user_service(user_id)
-    user_role = user_response.get('role')
-    
-    if user_role == 'senior':
-        # 시니어인 경우: 자신의 이야기 + 보호자의 이야기
-        stories = await get_stories_for_senior(db, user_id)
-    else:
-        # 보호자인 경우: 자신이 등록한 이야기만
-        stories = db.query(Story).filter(Story.user_id == user_id).all()
-    
-    if not stories:
+    """사용자의 이야기에서 실력에 맞는 난이도의 이야기를 무작위로 선택하고, 그 이야기의 모든 문장들을 반환 (SENTENCE_SEQUENCE용)"""
+    user_ids = await get_visible_user_ids(user_id)
+    low, high = get_puzzle_band(db, user_id)
+
+    # 난이도 인덱스에서 구간에 맞는 이야기 선택 (세그먼트가 있는 이야기만)
+    picked_story = pick_story_for_level(db, user_ids, low, high)
+    if picked_story is None:
         raise NotFoundError("사용자의 이야기가 없습니다.")
-    
-    # 랜덤으로 하나의 이야기 선택
-    random_story = random.choice(stories)
-    story_id = random_story.id
-    
+    story_id, difficulty_score = picked_story[:2]
+
     # 선택된 이야기의 모든 문장들을 order 순서대로 가져오기
-    all_segments = db.query(StorySegment).filter(
+    sorted_segments = db.query(StorySegment).filter(
         StorySegment.story_id == story_id
     ).order_by(StorySegment.order).all()
-    
-    if not all_segments:
+
+    if not sorted_segments:
         raise NotFoundError("선택된 이야기에 사용할 수 있는 세그먼트가 없습니다.")
-    
-    # 모든 문장들을 order 순서대로 정렬
-    sorted_segments = sorted(all_segments, key=lambda x: x.order)
-    
+
     return create_response({
         "story_id": story_id,
         "segments": [
@@ -204,7 +246,8 @@ async def get_random_sentence_segment(
             for segment in sorted_segments
         ],
         "type": "sentence_sequence",
-        "total_segments": len(sorted_segments)
+        "total_segments": len(sorted_segments),
+        "difficulty_score": difficulty_score
     })
 
 @router.put("/{story_id}", description="이야기 수정")
@@ -212,29 +255,51 @@ async def update_story(
     request: Request,
     story_id: int, 
     story_update: StoryUpdate, 
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_validated)
 ):
+    update_data = story_update.model_dump(exclude_unset=True)
+    if 'image_url' in update_data:
+        update_data['image_variants'] = await story_service.get_image_variants(request.app, update_data['image_url'])
     db_story = db.query(Story).filter(Story.id == story_id, Story.user_id == user_id).first()
     if not db_story:
         raise NotFoundError("이야기를 찾을 수 없습니다.")
-    update_data = story_update.model_dump(exclude_unset=True)
+    previous_image_url = db_story.image_url
     for key, value in update_data.items():
         setattr(db_story, key, value)
+    if 'content' in update_data:
+        db_story.excerpt = make_excerpt(db_story.content)
+    db.flush()
+    add_story_event(db, STORY_UPDATED, db_story)
     db.commit()
     db.refresh(db_story)
+    if previous_image_url != db_story.image_url:
+        _release_images(request, background_tasks, [previous_image_url])
     return create_response(StoryResponse.model_validate(db_story.__dict__))
 
 @router.delete("/{story_id}", description="이야기 삭제")
 async def delete_story(
     request: Request,
     story_id: int, 
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_validated)
 ):
     db_story = db.query(Story).filter(Story.id == story_id, Story.user_id == user_id).first()
     if not db_story:
         raise NotFoundError("이야기를 찾을 수 없습니다.")
+    image_url = db_story.image_url
+    add_story_event(db, STORY_DELETED, db_story)
     db.delete(db_story)
+    add_story_tombstone(db, story_id)
     db.commit()
-    return create_response({"msg": "삭제되었습니다."}) 
\ No newline at end of file
+    _release_images(request, background_tasks, [image_url])
+    return create_response({"msg": "삭제되었습니다."})
+
+def _release_images(request: Request, background_tasks: BackgroundTasks, image_urls: List[str]):
+    """응답 후 더 이상 참조되지 않는 이미지 정리 예약"""
+    image_gc = getattr(request.app.state, 'image_gc', None)
+    image_urls = [image_url for image_url in image_urls if image_url]
+    if image_gc is not None and image_urls:
+        background_tasks.add_task(image_gc.release_images, image_urls) 
\ No newline at end of file
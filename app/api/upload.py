@@ -1,47 +1,109 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, UploadFile, File, HTTPException, Request
 from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+import hashlib
+import logging
 import os
+import shutil
+import tempfile
 from typing import List
+from app.common.response import create_response
+from app.database import get_db, SessionLocal
+from app.helper.outbox_helper import add_story_event, STORY_UPDATED
+from app.models.story import Story
+from app.schemas.upload import PresignedUploadRequest, UploadCompleteRequest
+from app.utils.security import get_current_user_validated
+from app.utils.metrics import record_cache
+from app.utils.request_context import run_in_executor
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# 업로드 제한
+MAX_IMAGE_SIZE = 5 * 1024 * 1024  # 5MB
+UPLOAD_CHUNK_SIZE = 64 * 1024
+ALLOWED_IMAGE_EXTENSIONS = ['jpg', 'jpeg', 'png', 'gif', 'webp']
+
+def _copy_to_temp_file(fileobj, suffix: str) -> str:
+    """
+    업로드 파일(SpooledTemporaryFile)을 청크 단위로 이름 있는 임시 파일에 복사하고 경로 반환 (블로킹)
+
+    파생 이미지 프로세스가 바이트 대신 경로로 원본을 읽으므로 API 프로세스 메모리에 전체 파일을 올리지 않음
+    """
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as target:
+        shutil.copyfileobj(fileobj, target, UPLOAD_CHUNK_SIZE)
+    fileobj.seek(0)
+    return target.name
 
 @router.post("/image")
 async def upload_image(request: Request, file: UploadFile = File(...)):
     """이미지 업로드"""
+    image_path = None
     try:
         # 파일 타입 검증
         if not file.content_type.startswith('image/'):
             raise HTTPException(status_code=400, detail="이미지 파일만 업로드 가능합니다.")
         
-        # 파일 크기 검증 (5MB 제한)
-        file_size = 0
-        file_content = b""
-        while chunk := await file.read(8192):
-            file_size += len(chunk)
-            if file_size > 5 * 1024 * 1024:  # 5MB
-                raise HTTPException(status_code=400, detail="파일 크기는 5MB를 초과할 수 없습니다.")
-            file_content += chunk
-        
-        # 파일 확장자 추출
+        # 파일 확장자 추출 (내용을 읽기 전에 먼저 검증)
         file_extension = file.filename.split('.')[-1].lower()
-        if file_extension not in ['jpg', 'jpeg', 'png', 'gif', 'webp']:
+        if file_extension not in ALLOWED_IMAGE_EXTENSIONS:
             raise HTTPException(status_code=400, detail="지원하지 않는 이미지 형식입니다.")
         
         # S3 서비스가 있는지 확인
         if not hasattr(request.app.state, 's3_service') or request.app.state.s3_service is None:
             raise HTTPException(status_code=500, detail="S3 서비스가 설정되지 않았습니다.")
         
-        # S3에 업로드
-        s3_url = request.app.state.s3_service.upload_image(file_content, file_extension)
+        s3_service = request.app.state.s3_service
+        
+        # 파일 크기 검증 (5MB 제한) 및 내용 해시 계산
+        # 업로드 파일은 이미 SpooledTemporaryFile(큰 파일은 디스크)에 담겨 있으므로
+        # 청크 단위로 크기/해시만 계산하고 바이트를 메모리에 이어 붙이지 않음
+        file_size = 0
+        content_hash = hashlib.sha256()
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            file_size += len(chunk)
+            if file_size > MAX_IMAGE_SIZE:
+                raise HTTPException(status_code=400, detail="파일 크기는 5MB를 초과할 수 없습니다.")
+            content_hash.update(chunk)
+        await file.seek(0)
+        
+        # 같은 내용의 이미지는 같은 키에 한 번만 저장
+        key = s3_service.get_content_hash_key(content_hash.hexdigest(), file_extension)
+        existing = await s3_service.get_object_info_async(key)
+        # 재사용하는 객체는 아직 이야기에 연결되지 않았으므로 LastModified를 갱신해 GC 유예 시간을 다시 시작
+        # (갱신 전에 GC가 삭제했으면 새로 업로드)
+        deduplicated = existing is not None and await s3_service.touch_object_async(key, existing['content_type'])
+        record_cache("image_dedupe", deduplicated)
+        image_pipeline = getattr(request.app.state, 'image_pipeline', None)
+        if deduplicated:
+            s3_url = s3_service.get_object_url(key)
+            logger.info("이미 저장된 이미지 재사용: %s", key)
+        else:
+            # upload_fileobj는 업로드 후 파일을 닫으므로 파생 이미지용 원본은 먼저 임시 파일로 복사해 둠
+            if image_pipeline is not None:
+                image_path = await run_in_executor(None, _copy_to_temp_file, file.file, f".{file_extension}")
+            # S3에 스트리밍 업로드 (업로드 전용 스레드 풀에서 실행, 이벤트 루프 비차단)
+            s3_url = await s3_service.upload_fileobj_async(file.file, file_extension, key=key)
         
         if not s3_url:
             raise HTTPException(status_code=500, detail="이미지 업로드에 실패했습니다.")
         
+        # 파생 이미지 (썸네일/태블릿 크기) 준비
+        variants = None
+        if deduplicated:
+            variants = await run_in_executor(None, s3_service.get_image_variants, s3_url)
+        if variants is None and image_pipeline is not None:
+            image_source = image_path or await run_in_executor(None, s3_service.download_bytes, key)
+            if image_source:
+                variants = await image_pipeline.create_variants(s3_service, key, image_source)
+        
         return JSONResponse(content={
             "results": {
                 "image_url": s3_url,
+                "image_variants": variants,
                 "filename": file.filename,
-                "size": file_size
+                "size": file_size,
+                "deduplicated": deduplicated
             },
             "error": None
         })
@@ -50,15 +112,157 @@ async def upload_image(request: Request, file: UploadFile = File(...)):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"업로드 중 오류가 발생했습니다: {str(e)}")
+    finally:
+        if image_path:
+            os.unlink(image_path)
+
+def _get_s3_service(request: Request):
+    """S3 서비스 조회 (설정되지 않았으면 500)"""
+    s3_service = getattr(request.app.state, 's3_service', None)
+    if s3_service is None:
+        raise HTTPException(status_code=500, detail="S3 서비스가 설정되지 않았습니다.")
+    return s3_service
+
+@router.post("/image/presign", description="S3 직접 업로드용 presigned URL 발급")
+async def presign_image_upload(
+    request: Request,
+    upload_request: PresignedUploadRequest,
+    user_id: int = Depends(get_current_user_validated)
+):
+    """
+    클라이언트가 API 서버를 거치지 않고 S3에 이미지를 직접 업로드하도록 presigned URL을 발급합니다.
+    업로드 후 /image/complete로 검증을 요청해야 합니다.
+    """
+    if not upload_request.content_type.startswith('image/'):
+        raise HTTPException(status_code=400, detail="이미지 파일만 업로드 가능합니다.")
+    
+    file_extension = upload_request.filename.split('.')[-1].lower()
+    if file_extension not in ALLOWED_IMAGE_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="지원하지 않는 이미지 형식입니다.")
+    
+    method = upload_request.method.lower()
+    if method not in ('post', 'put'):
+        raise HTTPException(status_code=400, detail="method는 post 또는 put이어야 합니다.")
+    if method == 'put' and not upload_request.size:
+        raise HTTPException(status_code=400, detail="PUT 업로드에는 파일 크기(size)가 필요합니다.")
+    if upload_request.size is not None and not 0 < upload_request.size <= MAX_IMAGE_SIZE:
+        raise HTTPException(status_code=400, detail="파일 크기는 5MB를 초과할 수 없습니다.")
+    
+    presigned = _get_s3_service(request).create_presigned_upload(
+        file_extension,
+        upload_request.content_type,
+        MAX_IMAGE_SIZE,
+        user_id,
+        method=method,
+        content_length=upload_request.size
+    )
+    if not presigned:
+        raise HTTPException(status_code=500, detail="업로드 URL 발급에 실패했습니다.")
+    
+    return create_response(presigned)
+
+@router.post("/image/complete", description="S3 직접 업로드 완료 검증 및 이야기 연결")
+async def complete_image_upload(
+    request: Request,
+    complete_request: UploadCompleteRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_validated)
+):
+    """
+    업로드된 객체를 HEAD로 검증하고, story_id가 있으면 이야기 이미지로 연결합니다.
+    presign에서 요청한 사용자에게 발급한 키(사용자별 접두사)만 완료할 수 있습니다.
+    """
+    s3_service = _get_s3_service(request)
+    key = complete_request.key
+    if not key.startswith(s3_service.get_user_upload_prefix(user_id)) or '/' in key[len('story-images/'):]:
+        raise HTTPException(status_code=400, detail="잘못된 이미지 키입니다.")
+    
+    object_info = await s3_service.get_object_info_async(complete_request.key)
+    if not object_info:
+        raise HTTPException(status_code=404, detail="업로드된 이미지를 찾을 수 없습니다.")
+    if object_info['size'] > MAX_IMAGE_SIZE:
+        raise HTTPException(status_code=400, detail="파일 크기는 5MB를 초과할 수 없습니다.")
+    if not object_info['content_type'].startswith('image/'):
+        raise HTTPException(status_code=400, detail="이미지 파일만 업로드 가능합니다.")
+    
+    image_url = s3_service.get_object_url(complete_request.key)
+    
+    if complete_request.story_id is not None:
+        story = db.query(Story).filter(
+            Story.id == complete_request.story_id, Story.user_id == user_id
+        ).first()
+        if not story:
+            raise HTTPException(status_code=404, detail="이야기를 찾을 수 없습니다.")
+        previous_image_url = story.image_url
+        if previous_image_url != image_url:
+            # 이전 이미지의 파생 이미지는 새 이미지와 맞지 않으므로 백그라운드 작업이 새로 채울 때까지 비움
+            story.image_variants = None
+        story.image_url = image_url
+        db.flush()
+        add_story_event(db, STORY_UPDATED, story)
+        db.commit()
+        # 이야기 수정과 같이 더 이상 참조되지 않는 이전 이미지 정리 예약
+        image_gc = getattr(request.app.state, 'image_gc', None)
+        if image_gc is not None and previous_image_url and previous_image_url != image_url:
+            background_tasks.add_task(image_gc.release_images, [previous_image_url])
+    
+    # 직접 업로드된 이미지는 응답 후 백그라운드에서 파생 이미지 생성
+    if getattr(request.app.state, 'image_pipeline', None) is not None:
+        background_tasks.add_task(
+            _create_variants_for_uploaded_image, request.app, complete_request.key, complete_request.story_id
+        )
+    
+    return create_response({
+        "image_url": image_url,
+        "size": object_info['size'],
+        "content_type": object_info['content_type'],
+        "story_id": complete_request.story_id
+    })
+
+async def _create_variants_for_uploaded_image(app, key: str, story_id: int = None):
+    """S3에 직접 업로드된 이미지의 파생 이미지 생성 후 이야기에 반영"""
+    s3_service = app.state.s3_service
+    image_bytes = await run_in_executor(None, s3_service.download_bytes, key)
+    if not image_bytes:
+        return
+    
+    variants = await app.state.image_pipeline.create_variants(s3_service, key, image_bytes)
+    if not variants or story_id is None:
+        return
+    
+    db = SessionLocal()
+    try:
+        story = db.query(Story).filter(Story.id == story_id).first()
+        if story and story.image_url == s3_service.get_object_url(key):
+            story.image_variants = variants
+            db.flush()
+            add_story_event(db, STORY_UPDATED, story)
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("파생 이미지 반영 실패 (story_id=%s): %s", story_id, e)
+    finally:
+        db.close()
 
 @router.delete("/image")
-async def delete_image(request: Request, image_url: str):
+async def delete_image(request: Request, image_url: str, background_tasks: BackgroundTasks):
     """이미지 삭제"""
     try:
         # S3 서비스가 있는지 확인
         if not hasattr(request.app.state, 's3_service') or request.app.state.s3_service is None:
             raise HTTPException(status_code=500, detail="S3 서비스가 설정되지 않았습니다.")
         
+        # 같은 내용의 이미지는 여러 이야기가 공유하므로 참조가 없을 때만
+        # 파생 이미지와 함께 응답 후 일괄 삭제
+        image_gc = getattr(request.app.state, 'image_gc', None)
+        if image_gc is not None:
+            background_tasks.add_task(image_gc.release_images, [image_url])
+            return JSONResponse(content={
+                "results": {"message": "이미지 삭제가 요청되었습니다."},
+                "error": None
+            })
+        
         # S3에서 삭제
         success = request.app.state.s3_service.delete_image(image_url)
         
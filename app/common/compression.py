@@ -0,0 +1,215 @@
+import zlib
+from typing import Callable, Iterable, Optional
+
+try:
+    import brotli
+except ImportError:  # brotli가 없으면 gzip만 사용
+    brotli = None
+
+# 압축 대상 Content-Type (이미 압축된 이미지/gzip 파일 등은 제외)
+DEFAULT_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/javascript",
+    "image/svg+xml",
+)
+
+def compression(gzip_level: Optional[int] = None, brotli_quality: Optional[int] = None, enabled: bool = True):
+    """
+    엔드포인트별 압축 설정 데코레이터 (라우터 데코레이터 아래에 적용)
+
+    예) 크기가 큰 스트리밍 응답은 CPU 비용이 낮은 수준으로 압축
+        @router.get("/stream")
+        @compression(gzip_level=1, brotli_quality=1)
+        async def stream(...): ...
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__compression__ = {
+            "gzip_level": gzip_level,
+            "brotli_quality": brotli_quality,
+            "enabled": enabled
+        }
+        return endpoint
+    return decorator
+
+def parse_accept_encoding(header: str) -> dict:
+    """Accept-Encoding 헤더를 {인코딩: q값}으로 변환"""
+    encodings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[name] = quality
+    return encodings
+
+class _GzipEncoder:
+    encoding = "gzip"
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+class _BrotliEncoder:
+    encoding = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality, mode=brotli.MODE_TEXT)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+class CompressionMiddleware:
+    """
+    JSON/텍스트 응답 압축 ASGI 미들웨어 (brotli 우선, gzip 대체)
+
+    - minimum_size보다 작은 단일 응답과 허용 목록 밖의 Content-Type은 압축하지 않습니다.
+    - 이미 Content-Encoding이 있거나 Cache-Control: no-transform인 응답은 그대로 전달합니다.
+    - 스트리밍 응답은 청크마다 압축해 바로 내보내므로 첫 바이트가 지연되지 않습니다.
+    - 엔드포인트에 compression() 데코레이터가 있으면 그 압축 수준을 사용합니다.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4,
+                 compressible_types: Iterable[str] = DEFAULT_COMPRESSIBLE_TYPES):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.compressible_types = tuple(compressible_types)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = {}
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accepted = parse_accept_encoding(value.decode("latin-1"))
+                break
+        use_brotli = brotli is not None and accepted.get("br", 0) > 0
+        use_gzip = accepted.get("gzip", 0) > 0
+        if not (use_brotli or use_gzip):
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, scope, send, use_brotli)
+        await self.app(scope, receive, responder.send)
+
+class _CompressionResponder:
+    """응답 하나의 압축 상태 (시작 메시지를 첫 본문 메시지까지 보류)"""
+
+    def __init__(self, middleware: CompressionMiddleware, scope, send, use_brotli: bool):
+        self.middleware = middleware
+        self.scope = scope
+        self._send = send
+        self.use_brotli = use_brotli
+        self.start_message = None
+        self.encoder = None
+        self.passthrough = False
+
+    def _route_settings(self) -> dict:
+        # 라우팅 이후 scope에 채워진 엔드포인트의 데코레이터 설정
+        endpoint = self.scope.get("endpoint")
+        return getattr(endpoint, "__compression__", None) or {}
+
+    def _should_compress(self, message) -> bool:
+        status = message["status"]
+        if status < 200 or status in (204, 206, 304):
+            return False
+        content_type = ""
+        for name, value in message.get("headers", []):
+            if name == b"content-encoding":
+                return False
+            if name == b"cache-control" and b"no-transform" in value.lower():
+                return False
+            if name == b"content-type":
+                content_type = value.decode("latin-1").split(";")[0].strip().lower()
+        return content_type in self.middleware.compressible_types
+
+    def _create_encoder(self, settings: dict):
+        if self.use_brotli:
+            quality = settings.get("brotli_quality")
+            return _BrotliEncoder(self.middleware.brotli_quality if quality is None else quality)
+        level = settings.get("gzip_level")
+        return _GzipEncoder(self.middleware.gzip_level if level is None else level)
+
+    async def _send_start(self, content_length: Optional[int]):
+        headers = [
+            (name, value) for name, value in self.start_message.get("headers", [])
+            if name not in (b"content-length", b"vary")
+        ]
+        vary = [value for name, value in self.start_message.get("headers", []) if name == b"vary"]
+        vary_values = b", ".join(vary + [b"Accept-Encoding"]) if vary else b"Accept-Encoding"
+        headers.append((b"vary", vary_values))
+        headers.append((b"content-encoding", self.encoder.encoding.encode("latin-1")))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode("latin-1")))
+        await self._send({**self.start_message, "headers": headers})
+
+    async def send(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            settings = self._route_settings()
+            if not settings.get("enabled", True) or not self._should_compress(message):
+                self.passthrough = True
+                await self._send(message)
+            else:
+                self.start_message = message
+            return
+
+        if self.passthrough or message_type != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # 작은 단일 응답은 압축 이득보다 비용이 큼
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            self.encoder = self._create_encoder(self._route_settings())
+            if not more_body:
+                compressed = self.encoder.compress(body) + self.encoder.finish()
+                await self._send_start(len(compressed))
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+            # 스트리밍 응답: 길이를 알 수 없으므로 Content-Length 없이 청크 단위 전송
+            await self._send_start(None)
+
+        if more_body:
+            data = self.encoder.compress(body) + self.encoder.flush()
+        else:
+            data = self.encoder.compress(body) + self.encoder.finish()
+        if data or not more_body:
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
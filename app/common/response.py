@@ -1,8 +1,19 @@
 from fastapi import HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from datetime import date, datetime
+from decimal import Decimal
 from http import HTTPStatus
+import json
 import logging
-from typing import Any, Dict, Optional
+import sys
+import zlib
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json으로 직렬화
+    orjson = None
 
 class ErrorBase(Exception):
     def __init__(self, message="에러가 발생하였습니다.", status_code=HTTPStatus.INTERNAL_SERVER_ERROR):
@@ -17,10 +28,14 @@ class ErrorBase(Exception):
         return self.message
     
     def _get_calling_method(self):
-        import traceback
+        # traceback.extract_stack()은 스택 전체의 소스 줄을 읽으므로 프레임만 거슬러 올라감
+        # 하위 클래스 __init__ 프레임을 건너뛰어 예외를 만든 함수 이름을 반환
         try:
-            return traceback.extract_stack()[-2][2]
-        except:
+            frame = sys._getframe(1)
+            while frame is not None and frame.f_code.co_name == "__init__" and frame.f_locals.get("self") is self:
+                frame = frame.f_back
+            return frame.f_code.co_name if frame is not None else "unknown"
+        except Exception:
             return "unknown"
 
 class NotFoundError(ErrorBase):
@@ -39,8 +54,9 @@ class OpenAIServiceError(ErrorBase):
     def __init__(self, message="AI 서비스 처리 중 오류가 발생했습니다."):
         super().__init__(message, HTTPStatus.INTERNAL_SERVER_ERROR)
 
-def create_response(data: Any = None, error: Optional[str] = None, status: int = 200) -> Dict[str, Any]:
-    """표준화된 응답 형식 생성"""
+def create_response(data: Any = None, error: Optional[str] = None, status: int = 200,
+                    meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """표준화된 응답 형식 생성 (meta는 페이지네이션 커서 등 부가 정보)"""
     if isinstance(data, ErrorBase):
         response_data = {
             'results': None,
@@ -53,12 +69,97 @@ def create_response(data: Any = None, error: Optional[str] = None, status: int =
             'error': str(error) if error else None
         }
 
+    if meta is not None:
+        response_data['meta'] = meta
+
     return response_data
 
+def _json_default(value: Any) -> Any:
+    """JSON 기본 타입이 아닌 값 변환 (pydantic 모델, 날짜, Decimal 등)"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+def dumps_json(content: Any) -> bytes:
+    """응답 본문 직렬화 (orjson 우선, 날짜는 ISO 8601)"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_json_default
+    ).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """
+    jsonable_encoder를 거치지 않고 바로 직렬화하는 JSONResponse
+
+    엔드포인트가 dict를 반환하면 FastAPI가 jsonable_encoder로 모든 값을 재귀 변환하므로,
+    큰 목록 응답은 이 클래스를 직접 반환해 그 비용을 생략합니다.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+def create_json_response(data: Any = None, error: Optional[str] = None, status: int = 200,
+                         meta: Optional[Dict[str, Any]] = None) -> FastJSONResponse:
+    """create_response 형식의 본문을 FastJSONResponse로 반환 (목록 응답용)"""
+    if isinstance(data, ErrorBase):
+        status = data.status_code()
+    return FastJSONResponse(content=create_response(data, error, status, meta), status_code=status)
+
+# 스트리밍 응답 한 번에 전송할 최소 크기 (첫 레코드는 바로 전송)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+def _iter_ndjson_chunks(records: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """레코드를 NDJSON 줄로 직렬화하여 STREAM_CHUNK_SIZE 단위로 묶음"""
+    buffer = []
+    buffered = 0
+    first = True
+    for record in records:
+        line = dumps_json(record) + b"\n"
+        buffer.append(line)
+        buffered += len(line)
+        if first or buffered >= STREAM_CHUNK_SIZE:
+            yield b"".join(buffer)
+            buffer = []
+            buffered = 0
+            first = False
+    if buffer:
+        yield b"".join(buffer)
+
+def _iter_gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """청크를 gzip 스트림으로 압축 (첫 청크는 바로 내보내고 이후는 압축기 버퍼에 맡김)"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    first = True
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if first:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            first = False
+        if data:
+            yield data
+    yield compressor.flush()
+
+def create_ndjson_response(records: Iterable[Dict[str, Any]], headers: Optional[Dict[str, str]] = None,
+                           gzip: bool = False) -> StreamingResponse:
+    """
+    레코드 이터러블을 한 줄에 하나씩 JSON으로 스트리밍 (NDJSON)
+
+    gzip=True면 application/gzip(.ndjson.gz 파일)으로 압축해 전송합니다.
+    동기 이터러블은 Starlette가 스레드 풀에서 순회하므로 DB 커서를 읽어도 이벤트 루프를 막지 않습니다.
+    """
+    chunks = _iter_ndjson_chunks(records)
+    if gzip:
+        return StreamingResponse(_iter_gzip(chunks), media_type="application/gzip", headers=headers)
+    return StreamingResponse(chunks, media_type="application/x-ndjson", headers=headers)
+
 def register_error_handlers(app):
     @app.exception_handler(ErrorBase)
     async def handle_custom_error(request: Request, exc: ErrorBase):
-        logging.error(f"Custom error in {exc.method}: {exc.get_message()}")
+        logging.error("Custom error in %s: %s", exc.method, exc.get_message())
         return JSONResponse(
             status_code=exc.status_code(),
             content=create_response(error=exc.get_message())
@@ -66,7 +167,7 @@ def register_error_handlers(app):
 
     @app.exception_handler(404)
     async def handle_not_found(request: Request, exc: HTTPException):
-        logging.error(f"Not found: {exc}")
+        logging.error("Not found: %s", exc)
         return JSONResponse(
             status_code=404,
             content=create_response(error="요청한 리소스를 찾을 수 없습니다.")
@@ -74,7 +175,7 @@ def register_error_handlers(app):
 
     @app.exception_handler(500)
     async def handle_internal_error(request: Request, exc: HTTPException):
-        logging.error(f"Internal server error: {exc}")
+        logging.error("Internal server error: %s", exc)
         return JSONResponse(
             status_code=500,
             content=create_response(error="내부 서버 오류가 발생했습니다.")
@@ -82,7 +183,7 @@ def register_error_handlers(app):
 
     @app.exception_handler(Exception)
     async def handle_generic_error(request: Request, exc: Exception):
-        logging.error(f"Unhandled exception: {exc}")
+        logging.error("Unhandled exception: %s", exc)
         return JSONResponse(
             status_code=500,
             content=create_response(error="예상치 못한 오류가 발생했습니다.")
@@ -0,0 +1,66 @@
+import mimetypes
+import os
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import NotModifiedResponse
+from app.common.compression import parse_accept_encoding
+
+# build_static.py가 지문(해시) 파일명으로 생성하는 디렉토리 (static/ 기준)
+DIST_DIR = "dist"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# (인코딩, 미리 압축된 파일 확장자) - 선호 순서
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+def get_index_path(static_dir: str, app_name: str) -> str:
+    """빌드된 index.html이 있으면 그 경로, 없으면 원본 경로"""
+    built_index = os.path.join(static_dir, DIST_DIR, app_name, "index.html")
+    if os.path.exists(built_index):
+        return built_index
+    return os.path.join(static_dir, app_name, "index.html")
+
+def create_index_response(index_path: str) -> FileResponse:
+    """index.html 응답 (배포 후 새 해시 파일명을 바로 받도록 항상 재검증)"""
+    return FileResponse(index_path, headers={"Cache-Control": REVALIDATE_CACHE_CONTROL})
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    미리 압축된 .br/.gz 파일을 우선 제공하는 StaticFiles
+
+    - Accept-Encoding에 맞는 압축 파일이 옆에 있으면 Content-Encoding을 붙여 그대로 전송 (요청 시 압축 없음)
+    - dist/ 아래 지문 파일명 자산은 1년 immutable 캐시, 그 외(index.html, 원본 자산)는 재검증
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        relative_path = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+        immutable = relative_path.startswith(f"{DIST_DIR}/") and not relative_path.endswith(".html")
+        headers = {
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+            "Vary": "Accept-Encoding"
+        }
+
+        media_type = mimetypes.guess_type(str(full_path))[0] or "text/plain"
+        accepted = parse_accept_encoding(request_headers.get("accept-encoding", ""))
+        for encoding, extension in PRECOMPRESSED_ENCODINGS:
+            if accepted.get(encoding, 0) <= 0:
+                continue
+            compressed_path = f"{full_path}{extension}"
+            try:
+                compressed_stat = os.stat(compressed_path)
+            except OSError:
+                continue
+            full_path, stat_result = compressed_path, compressed_stat
+            headers["Content-Encoding"] = encoding
+            break
+
+        response = FileResponse(
+            full_path, status_code=status_code, headers=headers, media_type=media_type,
+            stat_result=stat_result, method=scope["method"]
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
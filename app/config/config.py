@@ -14,10 +14,88 @@ class Config(object):
         'DATABASE_URL'
     )
 
+    # User Service 주소 (사용자 검증, 역할/보호자 조회)
+    USER_SERVICE_URL = os.environ.get('USER_SERVICE_URL', 'http://localhost:8000')
+
     # 로깅 설정 - 기본값을 현재 디렉토리 기반으로 설정
     LOG_LEVEL = logging.INFO
     LOG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'logs')
     LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    # JSON 한 줄 로그 (시간, 레벨, 로거, 메시지, 요청 ID, extra 필드)
+    LOG_JSON = os.environ.get('LOG_JSON', 'false').lower() == 'true'
+    # 요청 경로에서는 큐에 넣기만 하고 파일/콘솔 출력은 백그라운드 리스너 스레드가 처리 (큐가 가득 차면 버림)
+    LOG_QUEUE_ENABLED = os.environ.get('LOG_QUEUE_ENABLED', 'true').lower() == 'true'
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+    # 로그 파일 교체 방식 (size: 10MB마다 직접 교체 | external: logrotate 등이 옮기면 다시 열기 | none: 콘솔만)
+    # 여러 워커가 한 파일을 직접 교체하면 서로의 교체를 덮어쓰므로 gunicorn 다중 워커(WEB_CONCURRENCY > 1)면 external
+    LOG_FILE_ROTATION = os.environ.get(
+        'LOG_FILE_ROTATION', 'external' if int(os.environ.get('WEB_CONCURRENCY') or 1) > 1 else 'size'
+    ).lower()
+    # 로거별 초당 INFO/DEBUG 기록 수 제한 (선택, 기본값 0 = 제한 없음, WARNING 이상은 항상 기록), 로거별 지정: 'app.api.game_result=10,httpx=5'
+    LOG_RATE_LIMIT = float(os.environ.get('LOG_RATE_LIMIT', '0'))
+    LOG_RATE_BURST = float(os.environ.get('LOG_RATE_BURST', '0'))  # 0이면 LOG_RATE_LIMIT의 2배
+    LOG_RATE_LIMITS = os.environ.get('LOG_RATE_LIMITS', '')
+
+    # 이벤트 발행 설정 (memory | file | kafka | none)
+    MESSAGE_BROKER = os.environ.get('MESSAGE_BROKER', 'none').lower()
+    MESSAGE_BROKER_FILE_DIR = os.environ.get(
+        'MESSAGE_BROKER_FILE_DIR',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'events')
+    )
+    STORY_EVENTS_TOPIC = os.environ.get('STORY_EVENTS_TOPIC', 'story-events')
+
+    # 변경 피드/이벤트 풀 API 안전 지연 (초, 이보다 최근에 기록된 행은 늦게 커밋되는 트랜잭션을 기다리며 다음 조회로 미룸)
+    CHANGE_FEED_SAFETY_LAG_SECONDS = float(os.environ.get('CHANGE_FEED_SAFETY_LAG_SECONDS', '5'))
+
+    # 아웃박스 릴레이 설정
+    OUTBOX_RELAY_ENABLED = os.environ.get('OUTBOX_RELAY_ENABLED', 'true').lower() == 'true'
+    OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', '100'))
+    OUTBOX_POLL_INTERVAL = float(os.environ.get('OUTBOX_POLL_INTERVAL', '1.0'))
+    OUTBOX_RETENTION_HOURS = int(os.environ.get('OUTBOX_RETENTION_HOURS', '72'))
+
+    # 난이도 설정 갱신 주기 (초, 작업자마다 이 주기로 버전만 확인, 0이면 시작 시에만 읽음)
+    DIFFICULTY_SETTINGS_POLL_INTERVAL = float(os.environ.get('DIFFICULTY_SETTINGS_POLL_INTERVAL', '5.0'))
+
+    # 시작 시 스키마 확인 (true면 새 데이터베이스일 때만 create_all로 테이블 생성, 이전 스키마는 migrate_schema.py 실행 전까지 준비 안 됨)
+    SCHEMA_AUTO_CREATE = os.environ.get('SCHEMA_AUTO_CREATE', 'true').lower() == 'true'
+    # 워밍업 (/health/ready가 200이 되기 전에 미리 여는 DB 연결 수, 0이면 워커당 풀 크기만큼)
+    WARMUP_DB_CONNECTIONS = int(os.environ.get('WARMUP_DB_CONNECTIONS', '0'))
+    # 워밍업 후 OpenAI/S3 클라이언트도 미리 생성 (준비 상태에는 영향 없음)
+    WARMUP_CLIENTS = os.environ.get('WARMUP_CLIENTS', 'true').lower() == 'true'
+
+    # 응답 압축 설정 (brotli 미설치 시 gzip만 사용)
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MINIMUM_SIZE = int(os.environ.get('COMPRESSION_MINIMUM_SIZE', '1024'))
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6'))
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '4'))
+
+    # 메트릭 수집 (/metrics, Prometheus 텍스트 형식)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+
+    # 트레이싱 (요청 ID 전파는 항상 동작, 스팬 기록은 TRACING_ENABLED일 때만)
+    TRACING_ENABLED = os.environ.get('TRACING_ENABLED', 'false').lower() == 'true'
+    TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', '0.1'))
+    TRACE_EXPORTER = os.environ.get('TRACE_EXPORTER', 'file').lower()  # file | console
+    TRACE_EXPORT_PATH = os.environ.get('TRACE_EXPORT_PATH')  # 기본값: LOG_PATH/traces.ndjson
+    TRACE_EXPORT_BATCH_SIZE = int(os.environ.get('TRACE_EXPORT_BATCH_SIZE', '512'))
+    TRACE_EXPORT_INTERVAL = float(os.environ.get('TRACE_EXPORT_INTERVAL', '1.0'))
+    TRACE_QUEUE_SIZE = int(os.environ.get('TRACE_QUEUE_SIZE', '10000'))
+
+    # 느린 쿼리 기록 (/admin/slow-queries, PostgreSQL이면 실행 계획 자동 수집)
+    SLOW_QUERY_ENABLED = os.environ.get('SLOW_QUERY_ENABLED', 'true').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', '200'))
+    SLOW_QUERY_LOG_SIZE = int(os.environ.get('SLOW_QUERY_LOG_SIZE', '200'))
+    SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', 'true').lower() == 'true'
+
+    # 관리자용 온디맨드 프로파일링 (/admin/profile, X-Profile 헤더), 꺼져 있으면 비용 없음
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILE_MAX_SECONDS = float(os.environ.get('PROFILE_MAX_SECONDS', '60'))
+
+    # 랩 환경 User Service 대역이 읽는 사용자/보호자 그래프 (seed_lab_data.py가 생성)
+    LAB_USER_GRAPH_PATH = os.environ.get(
+        'LAB_USER_GRAPH_PATH',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'lab_users.json')
+    )
 
 class ProductionConfig(Config):
     PHASE = 'production'
@@ -25,6 +103,10 @@ class ProductionConfig(Config):
     DEBUG = False
     # 프로덕션에서는 절대 경로 사용
     LOG_PATH = '/var/log/story-api'
+    # 로그 수집기가 읽기 쉽도록 JSON 한 줄 로그
+    LOG_JSON = os.environ.get('LOG_JSON', 'true').lower() == 'true'
+    # 프로덕션 스키마는 migrate_schema.py로만 변경
+    SCHEMA_AUTO_CREATE = os.environ.get('SCHEMA_AUTO_CREATE', 'false').lower() == 'true'
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -1,15 +1,20 @@
 import os
 
-# 환경변수에서 설정을 가져오거나 기본값 사용
-def get_difficulty_thresholds():
-    return {
-        'EASY_TO_MEDIUM': float(os.getenv('EASY_TO_MEDIUM_THRESHOLD', '0.7')),
-        'MEDIUM_TO_HARD': float(os.getenv('MEDIUM_TO_HARD_THRESHOLD', '0.8')),
-        'HARD_TO_EASY': float(os.getenv('HARD_TO_EASY_THRESHOLD', '0.3')),
-        'MIN_GAMES_FOR_ANALYSIS': int(os.getenv('MIN_GAMES_FOR_ANALYSIS', '5')),
-        'CONSECUTIVE_SUCCESS_FOR_INCREASE': int(os.getenv('CONSECUTIVE_SUCCESS_FOR_INCREASE', '5')),
-        'CONSECUTIVE_FAILURE_FOR_DECREASE': int(os.getenv('CONSECUTIVE_FAILURE_FOR_DECREASE', '3'))
-    }
+# 환경변수 이름 → 기준값 키 (설정된 변수만 기본값에 덮어씀)
+ENV_THRESHOLD_VARIABLES = {
+    'EASY_TO_MEDIUM_THRESHOLD': 'EASY_TO_MEDIUM',
+    'MEDIUM_TO_HARD_THRESHOLD': 'MEDIUM_TO_HARD',
+    'HARD_TO_EASY_THRESHOLD': 'HARD_TO_EASY',
+    'MIN_GAMES_FOR_ANALYSIS': 'MIN_GAMES_FOR_ANALYSIS',
+    'CONSECUTIVE_SUCCESS_FOR_INCREASE': 'CONSECUTIVE_SUCCESS_FOR_INCREASE',
+    'CONSECUTIVE_FAILURE_FOR_DECREASE': 'CONSECUTIVE_FAILURE_FOR_DECREASE',
+    'PROMOTE_RATING': 'PROMOTE_RATING',
+    'DEMOTE_RATING': 'DEMOTE_RATING'
+}
+
+# 환경변수로 지정한 기준값 (문자열 그대로, 설정 스냅샷을 만들 때 한 번만 읽음)
+def get_env_threshold_overrides():
+    return {key: os.environ[name] for name, key in ENV_THRESHOLD_VARIABLES.items() if os.environ.get(name)}
 
 # 시니어별 맞춤 설정
 SENIOR_DIFFICULTY_PROFILES = {
@@ -17,18 +22,24 @@ SENIOR_DIFFICULTY_PROFILES = {
         'consecutive_success_for_increase': 3,  # 연속 3번 성공 시 상승
         'consecutive_failure_for_decrease': 2,  # 연속 2번 실패 시 하락
         'easy_to_medium': 0.6,  # 60% 성공률
-        'hard_to_easy': 0.4     # 40% 성공률
+        'hard_to_easy': 0.4,    # 40% 성공률
+        'promote_rating': 1520.0,  # 실력 점수 1520 이상이면 상승
+        'demote_rating': 1480.0    # 실력 점수 1480 이하면 하락
     },
     'INTERMEDIATE': {
         'consecutive_success_for_increase': 5,  # 연속 5번 성공 시 상승
         'consecutive_failure_for_decrease': 3,  # 연속 3번 실패 시 하락
         'easy_to_medium': 0.7,  # 70% 성공률
-        'hard_to_easy': 0.3     # 30% 성공률
+        'hard_to_easy': 0.3,    # 30% 성공률
+        'promote_rating': 1540.0,  # 실력 점수 1540 이상이면 상승
+        'demote_rating': 1470.0    # 실력 점수 1470 이하면 하락
     },
     'ADVANCED': {
         'consecutive_success_for_increase': 7,  # 연속 7번 성공 시 상승
         'consecutive_failure_for_decrease': 4,  # 연속 4번 실패 시 하락
         'easy_to_medium': 0.8,  # 80% 성공률
-        'hard_to_easy': 0.2     # 20% 성공률
+        'hard_to_easy': 0.2,    # 20% 성공률
+        'promote_rating': 1560.0,  # 실력 점수 1560 이상이면 상승
+        'demote_rating': 1460.0    # 실력 점수 1460 이하면 하락
     }
 } 
\ No newline at end of file
@@ -0,0 +1,250 @@
+from itertools import islice
+from typing import Any, Dict, Iterable, NamedTuple, Tuple
+
+# 난이도 판단 규칙 (DB 없이 계산하는 순수 함수)
+# 운영(DifficultyService)과 오프라인 시뮬레이터(app.lab.difficulty_simulator)가 같은 코드를 사용합니다.
+# - 실력 점수: 게임 결과 한 건마다 O(1)로 갱신하고 히스테리시스 기준으로 판단 (운영)
+# - 최근 결과 창: 최신순 결과(is_correct, response_time 속성)로 판단 (이전 방식, 통계/비교용)
+
+EASY_GAME_TYPE = 'SENTENCE_SEQUENCE'
+HARD_GAME_TYPE = 'WORD_SEQUENCE'
+
+# 성공률/난이도 점수 계산에 쓰는 최근 게임 수
+RECENT_WINDOW = 10
+# 최근 성과 조건에 쓰는 게임 수
+RECENT_PERFORMANCE_WINDOW = 5
+# 응답 시간 정규화 최대값 (초)
+MAX_RESPONSE_SECONDS = 60
+# 연속 실패는 이 횟수에서 세기를 멈춤
+CONSECUTIVE_FAILURE_CAP = 3
+
+# 실력/이야기 난이도 점수 (Elo 방식, 불확실성(deviation)이 클수록 크게 움직이는 Glicko 방식 K)
+RATING_INITIAL = 1500.0
+RATING_DEVIATION_INITIAL = 350.0
+RATING_DEVIATION_MIN = 50.0
+# 게임 한 번마다 불확실성 감소 비율 (약 40게임이면 최소값)
+RATING_DEVIATION_DECAY = 0.95
+RATING_K_MIN = 16.0
+RATING_K_MAX = 64.0
+# 게임 유형별 난이도 가산점 (같은 이야기라도 단어 순서 게임이 더 어려움)
+GAME_TYPE_RATING_OFFSETS = {
+    'SENTENCE_SEQUENCE': 0.0,
+    'WORD_SEQUENCE': 150.0,
+}
+# 저장하는 성공률의 지수 이동 평균 비율 (최근 약 10게임 비중)
+SUCCESS_RATE_SMOOTHING = 0.2
+# 퍼즐 난이도(0~1) 선택: 실력 점수 PUZZLE_RATING_MIN이면 0, PUZZLE_RATING_MAX면 1을 목표로 ±PUZZLE_DIFFICULTY_BAND 구간
+PUZZLE_RATING_MIN = 1300.0
+PUZZLE_RATING_MAX = 1800.0
+PUZZLE_DIFFICULTY_BAND = 0.15
+
+# 난이도 조절 기준
+DIFFICULTY_THRESHOLDS = {
+    'EASY_TO_MEDIUM': 0.7,    # 70% 성공률 달성 시 중간 난이도로 상승
+    'MEDIUM_TO_HARD': 0.8,    # 80% 성공률 달성 시 어려운 난이도로 상승
+    'HARD_TO_EASY': 0.3,      # 30% 이하 성공률 시 쉬운 난이도로 하락
+    'MIN_GAMES_FOR_ANALYSIS': 5,  # 분석을 위한 최소 게임 수
+    'CONSECUTIVE_SUCCESS_FOR_INCREASE': 5,  # 연속 5번 성공 시 난이도 상승
+    'CONSECUTIVE_FAILURE_FOR_DECREASE': 3,  # 연속 3번 실패 시 난이도 하락
+    'SCORE_FOR_INCREASE': 0.6,              # 난이도 점수 0.6 이상이어야 상승
+    'SCORE_FOR_DECREASE': 0.3,              # 난이도 점수 0.3 이하 시 하락
+    'RECENT_SUCCESS_FOR_INCREASE': 3,       # 최근 5게임 중 3게임 이상 성공 시 상승
+    'RECENT_SUCCESS_FOR_DECREASE': 1,       # 최근 5게임 중 1게임 이하 성공 시 하락
+    'PROMOTE_RATING': 1540.0,               # 실력 점수 1540 이상이면 상승
+    'DEMOTE_RATING': 1470.0                 # 실력 점수 1470 이하면 하락 (사이 구간은 유지: 히스테리시스)
+}
+
+class GameOutcome(NamedTuple):
+    """시뮬레이터/내보낸 기록용 게임 결과 한 건"""
+    is_correct: bool
+    response_time: float
+
+class Rating(NamedTuple):
+    """실력(사용자) 또는 난이도(이야기) 점수"""
+    rating: float = RATING_INITIAL
+    deviation: float = RATING_DEVIATION_INITIAL
+    games: int = 0
+
+class DifficultyStats(NamedTuple):
+    games: int
+    success_rate: float
+    difficulty_score: float
+    average_response_time: float
+    recent_success_count: int
+    recent_games: int
+    consecutive_success: int
+    consecutive_failure: int
+
+def calculate_stats(recent_results: Iterable[Any]) -> DifficultyStats:
+    """최근 RECENT_WINDOW게임의 성공률, 난이도 점수, 최근 성과, 연속 성공/실패를 한 번에 계산"""
+    games = 0
+    success_count = 0
+    total_response_time = 0.0
+    recent_success_count = 0
+    consecutive_success = 0
+    consecutive_failure = 0
+    counting_streak = True
+
+    for result in islice(recent_results, RECENT_WINDOW):
+        is_correct = result.is_correct
+        games += 1
+        total_response_time += result.response_time
+        if is_correct:
+            success_count += 1
+            if games <= RECENT_PERFORMANCE_WINDOW:
+                recent_success_count += 1
+        # 최신 결과부터 연속 횟수 계산 (연속 실패가 CONSECUTIVE_FAILURE_CAP에 닿으면 더 보지 않음)
+        if counting_streak:
+            if is_correct:
+                consecutive_success += 1
+                consecutive_failure = 0
+            else:
+                consecutive_failure += 1
+                consecutive_success = 0
+                if consecutive_failure >= CONSECUTIVE_FAILURE_CAP:
+                    counting_streak = False
+
+    if games == 0:
+        return DifficultyStats(0, 0.0, 0.0, 0.0, 0, 0, 0, 0)
+
+    success_rate = success_count / games
+    average_response_time = total_response_time / games
+    # 응답 시간이 빠르고 성공률이 높을수록 높은 점수 (응답 시간은 MAX_RESPONSE_SECONDS로 정규화)
+    time_score = max(0, 1 - (average_response_time / MAX_RESPONSE_SECONDS))
+    difficulty_score = (success_rate * 0.7) + (time_score * 0.3)
+    return DifficultyStats(
+        games, success_rate, difficulty_score, average_response_time,
+        recent_success_count, min(games, RECENT_PERFORMANCE_WINDOW),
+        consecutive_success, consecutive_failure
+    )
+
+def should_increase(stats: DifficultyStats, thresholds: Dict[str, Any]) -> bool:
+    """난이도 상승 여부 (성공률과 난이도 점수를 넘고, 최근 성과나 연속 성공 조건 중 하나 충족)"""
+    if stats.games == 0:
+        return False
+    if stats.success_rate < thresholds['EASY_TO_MEDIUM']:
+        return False
+    if stats.difficulty_score < thresholds['SCORE_FOR_INCREASE']:
+        return False
+    if stats.recent_success_count >= thresholds['RECENT_SUCCESS_FOR_INCREASE']:
+        return True
+    return stats.consecutive_success >= thresholds['CONSECUTIVE_SUCCESS_FOR_INCREASE']
+
+def should_decrease(stats: DifficultyStats, thresholds: Dict[str, Any]) -> bool:
+    """난이도 하락 여부 (성공률, 난이도 점수, 최근 성과, 연속 실패 중 하나라도 기준 미달)"""
+    if stats.games == 0:
+        return False
+    return (
+        stats.success_rate <= thresholds['HARD_TO_EASY']
+        or stats.difficulty_score <= thresholds['SCORE_FOR_DECREASE']
+        or stats.recent_success_count <= thresholds['RECENT_SUCCESS_FOR_DECREASE']
+        or stats.consecutive_failure >= thresholds['CONSECUTIVE_FAILURE_FOR_DECREASE']
+    )
+
+def next_game_type(current_game_type: str, stats: DifficultyStats, thresholds: Dict[str, Any]) -> str:
+    """현재 게임 유형의 최근 성과로 다음 게임 유형 결정 (분석할 게임이 부족하면 유지)"""
+    if stats.games < thresholds['MIN_GAMES_FOR_ANALYSIS']:
+        return current_game_type
+    if current_game_type == EASY_GAME_TYPE and should_increase(stats, thresholds):
+        return HARD_GAME_TYPE
+    if current_game_type == HARD_GAME_TYPE and should_decrease(stats, thresholds):
+        return EASY_GAME_TYPE
+    return current_game_type
+
+def apply_profile(thresholds: Dict[str, Any], profile: Dict[str, Any]) -> Dict[str, Any]:
+    """SENIOR_DIFFICULTY_PROFILES 항목(소문자 키)을 기준값에 덮어쓴 사본 반환"""
+    merged = dict(thresholds)
+    for key, value in profile.items():
+        merged[key.upper()] = value
+    return merged
+
+def normalize_thresholds(values: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    설정 입력을 DIFFICULTY_THRESHOLDS 키와 값 타입으로 변환 (알 수 없는 키나 잘못된 값은 ValueError)
+
+    키는 대소문자를 구분하지 않고 이전 API의 *_threshold 이름(easy_to_medium_threshold 등)도 받습니다.
+    """
+    normalized = {}
+    for key, value in (values or {}).items():
+        name = str(key).upper()
+        if name not in DIFFICULTY_THRESHOLDS and name.endswith("_THRESHOLD"):
+            name = name[:-len("_THRESHOLD")]
+        if name not in DIFFICULTY_THRESHOLDS:
+            raise ValueError(f"알 수 없는 설정: {key}")
+        if isinstance(value, bool):
+            raise ValueError(f"잘못된 설정값: {key}")
+        try:
+            normalized[name] = type(DIFFICULTY_THRESHOLDS[name])(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"잘못된 설정값: {key}") from None
+    return normalized
+
+def validate_thresholds(thresholds: Dict[str, Any]) -> None:
+    """합친 기준값이 판단에 쓸 수 있는지 확인 (상승 기준이 하락 기준보다 커야 히스테리시스 구간이 생김)"""
+    if thresholds['PROMOTE_RATING'] <= thresholds['DEMOTE_RATING']:
+        raise ValueError("PROMOTE_RATING은 DEMOTE_RATING보다 커야 합니다.")
+    if thresholds['MIN_GAMES_FOR_ANALYSIS'] < 0:
+        raise ValueError("MIN_GAMES_FOR_ANALYSIS는 0 이상이어야 합니다.")
+
+def game_outcome_score(is_correct: bool, response_time: float) -> float:
+    """게임 결과 점수 (실패 0, 성공은 응답 시간이 빠를수록 0.7~1.0)"""
+    if not is_correct:
+        return 0.0
+    time_score = max(0, 1 - (response_time / MAX_RESPONSE_SECONDS))
+    return 0.7 + (time_score * 0.3)
+
+def expected_score(user_rating: float, item_rating: float) -> float:
+    """실력 점수와 문제 난이도로 예상한 결과 점수"""
+    return 1.0 / (1.0 + 10.0 ** ((item_rating - user_rating) / 400.0))
+
+def _k_factor(deviation: float) -> float:
+    certainty = (deviation - RATING_DEVIATION_MIN) / (RATING_DEVIATION_INITIAL - RATING_DEVIATION_MIN)
+    return RATING_K_MIN + (RATING_K_MAX - RATING_K_MIN) * max(0.0, min(1.0, certainty))
+
+def _next_deviation(deviation: float) -> float:
+    return max(RATING_DEVIATION_MIN, deviation * RATING_DEVIATION_DECAY)
+
+def rate_game(user: Rating, story: Rating, game_type: str, is_correct: bool,
+              response_time: float) -> Tuple[Rating, Rating]:
+    """
+    게임 결과 한 건으로 사용자 실력과 이야기 난이도를 함께 갱신 (O(1))
+
+    사용자가 예상보다 잘하면 실력이 오르고 이야기 난이도는 내려갑니다.
+    """
+    item_rating = story.rating + GAME_TYPE_RATING_OFFSETS.get(game_type, 0.0)
+    surprise = game_outcome_score(is_correct, response_time) - expected_score(user.rating, item_rating)
+    return (
+        Rating(user.rating + _k_factor(user.deviation) * surprise, _next_deviation(user.deviation), user.games + 1),
+        Rating(story.rating - _k_factor(story.deviation) * surprise, _next_deviation(story.deviation), story.games + 1),
+    )
+
+def update_success_rate(success_rate: float, games: int, is_correct: bool) -> float:
+    """성공률 갱신 (처음 몇 게임은 누적 평균, 이후 지수 이동 평균). games는 이번 게임을 포함한 수"""
+    weight = max(SUCCESS_RATE_SMOOTHING, 1.0 / games) if games > 0 else 1.0
+    return success_rate + weight * ((1.0 if is_correct else 0.0) - success_rate)
+
+def update_streaks(consecutive_success: int, consecutive_failure: int, is_correct: bool) -> Tuple[int, int]:
+    """연속 성공/실패 횟수 갱신"""
+    if is_correct:
+        return consecutive_success + 1, 0
+    return 0, consecutive_failure + 1
+
+def next_game_type_by_rating(current_game_type: str, user: Rating, thresholds: Dict[str, Any]) -> str:
+    """
+    실력 점수로 다음 게임 유형 결정
+
+    상승(PROMOTE_RATING)과 하락(DEMOTE_RATING) 기준 사이에서는 현재 유형을 유지해 경계에서 오르내리지 않습니다.
+    """
+    if user.games < thresholds['MIN_GAMES_FOR_ANALYSIS']:
+        return current_game_type
+    if current_game_type == EASY_GAME_TYPE and user.rating >= thresholds['PROMOTE_RATING']:
+        return HARD_GAME_TYPE
+    if current_game_type == HARD_GAME_TYPE and user.rating <= thresholds['DEMOTE_RATING']:
+        return EASY_GAME_TYPE
+    return current_game_type
+
+def puzzle_difficulty_band(rating: float) -> Tuple[float, float]:
+    """실력 점수에 맞는 퍼즐 난이도 구간 (low, high)"""
+    target = (rating - PUZZLE_RATING_MIN) / (PUZZLE_RATING_MAX - PUZZLE_RATING_MIN)
+    target = max(0.0, min(1.0, target))
+    return max(0.0, target - PUZZLE_DIFFICULTY_BAND), min(1.0, target + PUZZLE_DIFFICULTY_BAND)
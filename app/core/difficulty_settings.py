@@ -0,0 +1,200 @@
+from app.database import SessionLocal
+from app.config.difficulty_config import SENIOR_DIFFICULTY_PROFILES, get_env_threshold_overrides
+from app.core.difficulty_rules import DIFFICULTY_THRESHOLDS, apply_profile, normalize_thresholds, validate_thresholds
+from app.helper.game_helper import get_difficulty_settings_version, list_difficulty_settings
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Mapping, NamedTuple, Optional
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = 'global'
+PROFILE_SCOPE = 'profile'
+USER_SCOPE = 'user'
+SCOPES = (GLOBAL_SCOPE, PROFILE_SCOPE, USER_SCOPE)
+
+class DifficultySettingsSnapshot(NamedTuple):
+    """
+    한 버전의 난이도 설정 (읽기 전용, 바꾸지 않고 통째로 교체)
+
+    사용자별 기준값까지 미리 합쳐 두므로 요청 처리 중에는 사전 조회만 합니다.
+    """
+    version: int
+    global_thresholds: Mapping[str, Any]
+    default_profile: Optional[str]
+    default_thresholds: Mapping[str, Any]
+    profiles: Mapping[str, Mapping[str, Any]]
+    users: Mapping[int, Mapping[str, Any]]
+    user_profiles: Mapping[int, Optional[str]]
+    loaded_at: float
+
+    def thresholds_for(self, user_id: Optional[int]) -> Mapping[str, Any]:
+        return self.users.get(user_id, self.default_thresholds)
+
+    def profile_for(self, user_id: Optional[int]) -> Optional[str]:
+        return self.user_profiles.get(user_id, self.default_profile)
+
+def _freeze(thresholds: Dict[str, Any]) -> Mapping[str, Any]:
+    validate_thresholds(thresholds)
+    return MappingProxyType(dict(thresholds))
+
+def build_snapshot(rows: Iterable[Any], version: int = 0,
+                   env_overrides: Optional[Dict[str, Any]] = None) -> DifficultySettingsSnapshot:
+    """
+    기본값(DIFFICULTY_THRESHOLDS) ← 환경변수 ← 전체 덮어쓰기 ← 프로필 ← 사용자 덮어쓰기 순으로 합친 스냅샷 생성
+
+    rows는 difficulty_settings 행(scope, scope_key, profile, overrides 속성)이며,
+    잘못된 행은 건너뛰고 경고만 남깁니다 (나머지 설정은 그대로 적용).
+    """
+    rows_by_scope: Dict[str, list] = {scope: [] for scope in SCOPES}
+    for row in rows:
+        rows_by_scope.setdefault(row.scope, []).append(row)
+
+    base = dict(DIFFICULTY_THRESHOLDS)
+    try:
+        base.update(normalize_thresholds(env_overrides))
+        validate_thresholds(base)
+    except ValueError as e:
+        logger.warning("Ignoring difficulty thresholds from environment: %s", e)
+        base = dict(DIFFICULTY_THRESHOLDS)
+
+    default_profile = None
+    for row in rows_by_scope[GLOBAL_SCOPE]:
+        try:
+            merged = dict(base)
+            merged.update(normalize_thresholds(row.overrides))
+            validate_thresholds(merged)
+            base, default_profile = merged, row.profile
+        except ValueError as e:
+            logger.warning("Ignoring global difficulty setting: %s", e)
+
+    profile_overrides = {row.scope_key.upper(): row.overrides for row in rows_by_scope[PROFILE_SCOPE]}
+    profiles = {}
+    for name in dict.fromkeys([*SENIOR_DIFFICULTY_PROFILES, *profile_overrides]):
+        try:
+            merged = apply_profile(base, SENIOR_DIFFICULTY_PROFILES.get(name, {}))
+            merged.update(normalize_thresholds(profile_overrides.get(name)))
+            profiles[name] = _freeze(merged)
+        except ValueError as e:
+            logger.warning("Ignoring difficulty profile %s: %s", name, e)
+
+    global_thresholds = _freeze(base)
+    if default_profile is not None and default_profile.upper() not in profiles:
+        logger.warning("Unknown default difficulty profile: %s", default_profile)
+        default_profile = None
+    default_profile = default_profile.upper() if default_profile else None
+    default_thresholds = profiles[default_profile] if default_profile else global_thresholds
+
+    users = {}
+    user_profiles = {}
+    for row in rows_by_scope[USER_SCOPE]:
+        try:
+            user_id = int(row.scope_key)
+            profile = row.profile.upper() if row.profile else default_profile
+            if profile is not None and profile not in profiles:
+                raise ValueError(f"알 수 없는 프로필: {row.profile}")
+            merged = dict(profiles[profile] if profile else global_thresholds)
+            merged.update(normalize_thresholds(row.overrides))
+            users[user_id] = _freeze(merged)
+            user_profiles[user_id] = profile
+        except ValueError as e:
+            logger.warning("Ignoring difficulty setting for user %s: %s", row.scope_key, e)
+
+    return DifficultySettingsSnapshot(
+        version=version,
+        global_thresholds=global_thresholds,
+        default_profile=default_profile,
+        default_thresholds=default_thresholds,
+        profiles=MappingProxyType(profiles),
+        users=MappingProxyType(users),
+        user_profiles=MappingProxyType(user_profiles),
+        loaded_at=time.time()
+    )
+
+class DifficultySettings:
+    """
+    작업자 프로세스별 난이도 설정 스냅샷
+
+    - 요청 처리 중에는 현재 스냅샷 참조만 읽음 (설정 파싱/DB 조회 없음)
+    - 백그라운드 스레드가 poll_interval마다 MAX(version)만 확인하고, 바뀌었을 때만 전체를 읽어 새 스냅샷으로 교체
+    - 교체는 참조 한 번 대입이므로 요청은 항상 이전 또는 새 스냅샷 하나를 온전히 봄
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.poll_interval = 5.0
+        self._env_overrides = get_env_threshold_overrides()
+        self._snapshot = build_snapshot([], 0, self._env_overrides)
+        self._refresh_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        """앱 초기화 (워커 프로세스마다 startup 시 갱신 스레드 시작)"""
+        config = app.state.config
+        self.poll_interval = config.DIFFICULTY_SETTINGS_POLL_INTERVAL
+        app.add_event_handler("startup", self.start)
+        app.add_event_handler("shutdown", self.stop)
+        self.logger.info("DifficultySettings initialized")
+        return self
+
+    @property
+    def snapshot(self) -> DifficultySettingsSnapshot:
+        return self._snapshot
+
+    def thresholds_for(self, user_id: Optional[int]) -> Mapping[str, Any]:
+        """사용자에게 적용할 기준값 (읽기 전용)"""
+        return self._snapshot.thresholds_for(user_id)
+
+    def start(self):
+        """
+        갱신 스레드 시작 (poll_interval이 0 이하면 시작하지 않음)
+
+        처음 읽기는 스키마 확인 뒤 워밍업 단계(app/core/warmup.py)에서 warm_up()으로 합니다.
+        """
+        if self.poll_interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="difficulty-settings", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 5)
+
+    def warm_up(self) -> int:
+        """설정을 읽어 스냅샷을 채우고 버전 반환"""
+        self.refresh(force=True)
+        return self._snapshot.version
+
+    def _run(self):
+        failures = 0
+        while not self._stop_event.wait(min(self.poll_interval * (2 ** failures), 60)):
+            try:
+                self.refresh()
+                failures = 0
+            except Exception as e:
+                failures = min(failures + 1, 6)
+                self.logger.error("Difficulty settings refresh error: %s", e)
+
+    def refresh(self, force: bool = False) -> bool:
+        """버전이 바뀌었으면 새 스냅샷으로 교체, 교체했으면 True"""
+        with self._refresh_lock:
+            db = SessionLocal()
+            try:
+                # 버전을 먼저 읽어야 그 사이의 변경이 다음 확인에서 다시 반영됨
+                version = get_difficulty_settings_version(db)
+                if not force and version == self._snapshot.version:
+                    return False
+                snapshot = build_snapshot(list_difficulty_settings(db), version, self._env_overrides)
+            finally:
+                db.close()
+            self._snapshot = snapshot
+        self.logger.info("Difficulty settings loaded (version=%s, users=%s)", version, len(snapshot.users))
+        return True
+
+# 앱 전체에서 공유하는 인스턴스 (DifficultyService가 요청마다 참조)
+difficulty_settings = DifficultySettings()
@@ -0,0 +1,183 @@
+from app.database import SessionLocal
+from app.models.story import Story
+from app.core.image_pipeline import IMAGE_VARIANTS, VARIANT_FORMATS, get_variant_key
+from app.core.s3_service import DELETE_BATCH_SIZE
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
+import logging
+import os
+
+IMAGE_PREFIX = "story-images/"
+DERIVED_PREFIX = "story-images/derived/"
+# 업로드 허용 확장자 (app/api/upload.py의 ALLOWED_IMAGE_EXTENSIONS와 동일)
+IMAGE_EXTENSIONS = ('jpg', 'jpeg', 'png', 'gif', 'webp')
+
+def get_image_stem(key: str) -> Optional[str]:
+    """원본/파생 이미지 키에서 공통 식별자(내용 해시 또는 UUID) 추출"""
+    if key.startswith(DERIVED_PREFIX):
+        return key[len(DERIVED_PREFIX):].split('/', 1)[0]
+    if key.startswith(IMAGE_PREFIX):
+        return key[len(IMAGE_PREFIX):].rsplit('.', 1)[0]
+    return None
+
+class ImageGarbageCollector:
+    """
+    어떤 이야기도 참조하지 않는 story-images/ 객체(원본 + 파생 이미지) 정리
+
+    - release_images: 이야기 삭제/이미지 교체 후 백그라운드에서 이전 이미지만 확인해 삭제
+    - collect: 버킷 전체 목록과 stories.image_url을 비교하는 주기 점검 (드라이런 지원)
+
+    내용 해시 키로 같은 이미지를 여러 이야기가 공유할 수 있으므로 항상 참조 여부를 확인하고,
+    삭제 직전에 배치 단위로 다시 확인해 그 사이 연결된 이미지는 남깁니다.
+    업로드 직후 아직 이야기에 연결되지 않은 객체는 유예 시간(IMAGE_GC_GRACE_HOURS) 동안 보존합니다.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.s3_service = None
+        self.grace_hours = int(os.getenv('IMAGE_GC_GRACE_HOURS', '24'))
+
+    def init_app(self, app):
+        """앱 초기화"""
+        self.s3_service = app.state.s3_service
+        self.logger.info("ImageGarbageCollector initialized")
+        return self
+
+    def _get_related_keys(self, key: str) -> List[str]:
+        """원본 키와 그 파생 이미지 키 목록"""
+        keys = [key]
+        for variant_name in IMAGE_VARIANTS:
+            for format_name in VARIANT_FORMATS:
+                keys.append(get_variant_key(key, variant_name, format_name))
+        return keys
+
+    def _get_referenced_stems(self, db, stems: Optional[Iterable[str]] = None) -> Set[str]:
+        """이야기가 참조 중인 이미지 식별자 집합 (stems 지정 시 해당 식별자만 확인)"""
+        query = db.query(Story.image_url).filter(Story.image_url.isnot(None))
+        if stems is not None:
+            stems = list(stems)
+            if not stems:
+                return set()
+            # 확장자가 달라도 같은 내용이면 파생 이미지를 공유하므로 식별자 기준으로 비교
+            query = query.filter(Story.image_url.in_([
+                self.s3_service.get_object_url(f"{IMAGE_PREFIX}{stem}.{ext}")
+                for stem in stems
+                for ext in IMAGE_EXTENSIONS
+            ]))
+        referenced = set()
+        for (image_url,) in query.yield_per(1000):
+            stem = get_image_stem(self.s3_service.get_key_from_url(image_url))
+            if stem:
+                referenced.add(stem)
+        return referenced
+
+    def _delete_unreferenced(self, db, keys: List[str]) -> Dict[str, Any]:
+        """삭제 직전 참조 여부를 다시 확인한 뒤 남은 키만 일괄 삭제"""
+        stems = {get_image_stem(key) for key in keys}
+        still_referenced = self._get_referenced_stems(db, stems)
+        targets = [key for key in keys if get_image_stem(key) not in still_referenced]
+        deleted, errors = self.s3_service.delete_keys(targets)
+        return {"deleted": deleted, "errors": errors, "kept": len(keys) - len(targets)}
+
+    def release_images(self, image_urls: Iterable[str]) -> int:
+        """
+        더 이상 참조되지 않는 이미지와 파생 이미지 삭제 (BackgroundTasks에서 호출)
+
+        내용 해시 키는 중복 업로드한 다른 사용자에게 그대로 전달되므로(업로드 시 LastModified 갱신),
+        collect와 같이 유예 시간 안에 올라오거나 재사용된 원본은 이야기에 연결되기 전이라도 남깁니다.
+        """
+        if not self.s3_service or not self.s3_service.s3_client:
+            return 0
+
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=self.grace_hours)
+        keys = []
+        for image_url in image_urls:
+            if not image_url:
+                continue
+            key = self.s3_service.get_key_from_url(image_url)
+            if key.startswith(IMAGE_PREFIX) and not key.startswith(DERIVED_PREFIX):
+                info = self.s3_service.get_object_info(key)
+                if info and info['last_modified'] and info['last_modified'] > cutoff:
+                    self.logger.info("최근 업로드/재사용된 이미지 보존: %s", key)
+                    continue
+                keys.extend(self._get_related_keys(key))
+        if not keys:
+            return 0
+
+        db = SessionLocal()
+        try:
+            result = self._delete_unreferenced(db, keys)
+        except Exception as e:
+            self.logger.error("이미지 정리 실패: %s", e)
+            return 0
+        finally:
+            db.close()
+
+        if result["errors"]:
+            self.logger.warning("이미지 삭제 실패 %s건: %s", len(result['errors']), result['errors'][:5])
+        return result["deleted"]
+
+    def collect(self, dry_run: bool = True, grace_hours: Optional[int] = None,
+                sample_size: int = 20) -> Dict[str, Any]:
+        """
+        버킷 목록과 이야기 참조를 비교해 고아 이미지를 찾고, dry_run이 아니면 삭제
+
+        참조 목록을 먼저 읽으므로 DB 조회가 실패하면 아무것도 삭제하지 않습니다.
+        """
+        grace_hours = self.grace_hours if grace_hours is None else grace_hours
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=grace_hours)
+        report = {
+            "dry_run": dry_run,
+            "grace_hours": grace_hours,
+            "scanned": 0,
+            "referenced": 0,
+            "recent": 0,
+            "orphaned": 0,
+            "orphaned_bytes": 0,
+            "deleted": 0,
+            "kept": 0,
+            "errors": [],
+            "sample": []
+        }
+        if not self.s3_service or not self.s3_service.s3_client:
+            report["errors"].append({"key": None, "error": "S3 client unavailable"})
+            return report
+
+        db = SessionLocal()
+        try:
+            referenced_stems = self._get_referenced_stems(db)
+            pending = []
+            for obj in self.s3_service.iter_objects(IMAGE_PREFIX):
+                report["scanned"] += 1
+                key = obj['Key']
+                if get_image_stem(key) in referenced_stems:
+                    report["referenced"] += 1
+                    continue
+                if obj['LastModified'] > cutoff:
+                    report["recent"] += 1
+                    continue
+
+                report["orphaned"] += 1
+                report["orphaned_bytes"] += obj.get('Size', 0)
+                if len(report["sample"]) < sample_size:
+                    report["sample"].append(key)
+                if not dry_run:
+                    pending.append(key)
+                    if len(pending) >= DELETE_BATCH_SIZE:
+                        self._merge_result(report, self._delete_unreferenced(db, pending))
+                        pending = []
+
+            if pending:
+                self._merge_result(report, self._delete_unreferenced(db, pending))
+        finally:
+            db.close()
+
+        self.logger.info(
+            "Image GC %s: scanned=%s, orphaned=%s, deleted=%s", 'dry-run' if dry_run else 'run', report['scanned'], report['orphaned'], report['deleted']
+        )
+        return report
+
+    def _merge_result(self, report: Dict[str, Any], result: Dict[str, Any]):
+        report["deleted"] += result["deleted"]
+        report["kept"] += result["kept"]
+        report["errors"].extend(result["errors"])
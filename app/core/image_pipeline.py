@@ -0,0 +1,128 @@
+import asyncio
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple, Union
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow가 없으면 파생 이미지 생성 비활성화
+    Image = None
+    ImageOps = None
+
+# 파생 이미지 규격 (이름: 최대 가로/세로 픽셀)
+IMAGE_VARIANTS = {
+    'thumbnail': 320,
+    'tablet': 1280,
+}
+
+# 파생 이미지 포맷 (포맷: (확장자, Content-Type, 저장 옵션))
+VARIANT_FORMATS = {
+    'webp': ('webp', 'image/webp', {'format': 'WEBP', 'quality': 80, 'method': 4}),
+    'jpeg': ('jpg', 'image/jpeg', {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+def render_variants(source: Union[bytes, str]) -> Dict[Tuple[str, str], bytes]:
+    """
+    원본 이미지(바이트 또는 파일 경로)에서 크기/포맷별 파생 이미지 생성 (프로세스 풀에서 실행)
+
+    EXIF 방향을 픽셀에 반영한 뒤 메타데이터 없이 다시 인코딩하므로
+    위치 정보 등 EXIF는 파생 이미지에 남지 않습니다.
+    원본이 규격보다 작으면 확대하지 않습니다.
+    """
+    with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as original:
+        original.seek(0)  # 애니메이션 GIF는 첫 프레임 사용
+        image = ImageOps.exif_transpose(original)
+        image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+
+        rendered = {}
+        for variant_name, max_size in IMAGE_VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail((max_size, max_size), Image.LANCZOS)
+            for format_name, (_, _, save_options) in VARIANT_FORMATS.items():
+                target = resized
+                if format_name == 'jpeg' and target.mode != 'RGB':
+                    # JPEG는 투명도를 지원하지 않으므로 흰 배경에 합성
+                    background = Image.new('RGB', target.size, (255, 255, 255))
+                    background.paste(target, mask=target.getchannel('A'))
+                    target = background
+                buffer = io.BytesIO()
+                target.save(buffer, **save_options)
+                rendered[(variant_name, format_name)] = buffer.getvalue()
+        return rendered
+
+def get_variant_key(original_key: str, variant_name: str, format_name: str) -> str:
+    """원본 키(story-images/<stem>.<ext>)에 대응하는 파생 이미지 키"""
+    stem = original_key.rsplit('/', 1)[-1].rsplit('.', 1)[0]
+    extension = VARIANT_FORMATS[format_name][0]
+    return f"story-images/derived/{stem}/{variant_name}.{extension}"
+
+class ImagePipeline:
+    """원본 이미지의 파생 이미지(썸네일, 태블릿 크기)를 생성해 S3에 저장"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.workers = int(os.getenv('IMAGE_PIPELINE_WORKERS', '2'))
+        self.enabled = Image is not None
+        self._executor = None
+
+    def init_app(self, app):
+        """앱 초기화"""
+        if not self.enabled:
+            self.logger.warning("Pillow가 설치되지 않아 파생 이미지 생성을 사용할 수 없습니다.")
+        app.add_event_handler("shutdown", self.shutdown)
+        self.logger.info("ImagePipeline initialized")
+        return self
+
+    def shutdown(self):
+        """프로세스 풀 종료"""
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # 워커 프로세스 fork 이후 첫 사용 시점에 생성
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def create_variants(self, s3_service, original_key: str,
+                              source: Union[bytes, str]) -> Optional[Dict[str, Any]]:
+        """
+        파생 이미지를 생성해 업로드하고 클라이언트용 URL 맵 반환 (비활성화/실패 시 None)
+
+        source가 파일 경로면 프로세스 풀 워커가 파일을 직접 읽으므로 원본 바이트를 프로세스 간에 복사하지 않습니다.
+        """
+        if not self.enabled:
+            return None
+
+        loop = asyncio.get_running_loop()
+        try:
+            rendered = await loop.run_in_executor(self._get_executor(), render_variants, source)
+        except Exception as e:
+            self.logger.error("파생 이미지 생성 실패 (%s): %s", original_key, e)
+            return None
+
+        uploads = []
+        for (variant_name, format_name), data in rendered.items():
+            key = get_variant_key(original_key, variant_name, format_name)
+            content_type = VARIANT_FORMATS[format_name][1]
+            uploads.append(s3_service.upload_bytes_async(data, key, content_type))
+        results = await asyncio.gather(*uploads)
+        if not all(results):
+            self.logger.error("파생 이미지 업로드 실패: %s", original_key)
+            return None
+
+        self.logger.info("파생 이미지 %s개 생성: %s", len(rendered), original_key)
+        return build_variant_urls(s3_service, original_key)
+
+def build_variant_urls(s3_service, original_key: str) -> Dict[str, Any]:
+    """원본 키에 대한 파생 이미지 URL 맵 ({'thumbnail': {'width': 320, 'webp': url, 'jpeg': url}, ...})"""
+    variants = {}
+    for variant_name, max_size in IMAGE_VARIANTS.items():
+        variants[variant_name] = {'width': max_size}
+        for format_name in VARIANT_FORMATS:
+            key = get_variant_key(original_key, variant_name, format_name)
+            variants[variant_name][format_name] = s3_service.get_object_url(key)
+    return variants
@@ -0,0 +1,159 @@
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional
+import json
+import logging
+import os
+import threading
+
+class MessageBroker:
+    """이벤트 발행 브로커 기본 클래스"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def publish_batch(self, topic: str, events: List[Dict[str, Any]]) -> None:
+        """이벤트 묶음 발행 (실패 시 예외를 던져 릴레이가 재시도하도록 함)"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """브로커 연결 정리"""
+        pass
+
+class InMemoryBroker(MessageBroker):
+    """프로세스 내 브로커 (테스트/랩 환경용)"""
+
+    def __init__(self, max_events: int = 10000):
+        super().__init__()
+        self.events = deque(maxlen=max_events)
+        self._subscribers: List[Callable[[str, Dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[str, Dict[str, Any]], None]) -> None:
+        """이벤트 수신 콜백 등록"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def publish_batch(self, topic: str, events: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+            for event in events:
+                self.events.append((topic, event))
+        for event in events:
+            for callback in subscribers:
+                try:
+                    callback(topic, event)
+                except Exception as e:
+                    self.logger.error("Event subscriber error: %s", e)
+
+class FileBroker(MessageBroker):
+    """파일 기반 브로커 (토픽별 NDJSON 파일에 추가, 로컬 테스트용)"""
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def publish_batch(self, topic: str, events: List[Dict[str, Any]]) -> None:
+        path = os.path.join(self.directory, f"{topic}.ndjson")
+        lines = "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in events)
+        with self._lock:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+
+class KafkaBroker(MessageBroker):
+    """
+    Kafka 브로커 (kafka-python 필요)
+
+    프로듀서는 첫 발행 때 연결합니다. 연결에 실패하면 publish_batch가 예외를 던지고
+    릴레이가 백오프 후 다시 시도하므로, 시작 시 Kafka가 잠시 내려가 있어도 릴레이가 꺼지지 않습니다.
+    """
+
+    def __init__(self, bootstrap_servers: str):
+        super().__init__()
+        try:
+            from kafka import KafkaProducer
+        except ImportError as e:
+            raise RuntimeError("MESSAGE_BROKER=kafka에는 kafka-python 패키지가 필요합니다 (pip install -r requirements.txt)") from e
+
+        self._producer_class = KafkaProducer
+        self.bootstrap_servers = bootstrap_servers
+        self.producer = None
+        self._lock = threading.Lock()
+
+    def _get_producer(self):
+        with self._lock:
+            if self.producer is None:
+                self.producer = self._producer_class(
+                    bootstrap_servers=self.bootstrap_servers,
+                    acks="all",
+                    key_serializer=lambda key: str(key).encode("utf-8"),
+                    value_serializer=lambda value: json.dumps(value, ensure_ascii=False).encode("utf-8")
+                )
+                self.logger.info("Kafka producer connected: %s", self.bootstrap_servers)
+            return self.producer
+
+    def publish_batch(self, topic: str, events: List[Dict[str, Any]]) -> None:
+        producer = self._get_producer()
+        # 같은 이야기의 이벤트가 같은 파티션으로 가도록 aggregate_id를 키로 사용
+        futures = [
+            producer.send(topic, key=event["aggregate_id"], value=event)
+            for event in events
+        ]
+        producer.flush()
+        for future in futures:
+            future.get(timeout=10)
+
+    def close(self) -> None:
+        if self.producer is not None:
+            self.producer.close()
+
+class EventDeduplicator:
+    """
+    이벤트 ID 기반 중복 제거 (at-least-once 전달의 소비자 측 처리)
+
+    최근 capacity개의 event_id만 기억하므로 메모리 사용량이 일정합니다.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    def is_duplicate(self, event: Dict[str, Any]) -> bool:
+        """처음 보는 이벤트면 기록하고 False, 이미 처리한 이벤트면 True"""
+        event_id = event["event_id"]
+        with self._lock:
+            if event_id in self._seen:
+                self._seen.move_to_end(event_id)
+                return True
+            self._seen[event_id] = True
+            if len(self._seen) > self.capacity:
+                self._seen.popitem(last=False)
+            return False
+
+def create_message_broker(config, external_config: Optional[Dict[str, Any]] = None) -> Optional[MessageBroker]:
+    """
+    설정(MESSAGE_BROKER)에 따라 브로커 생성, 'none'이면 None
+
+    생성 실패(패키지 누락, 디렉토리 권한 등)는 릴레이가 조용히 꺼지지 않도록 그대로 던져 시작을 멈춥니다.
+    Kafka 연결은 첫 발행 때 맺고 실패하면 릴레이가 다시 시도합니다.
+    """
+    logger = logging.getLogger(__name__)
+    broker_type = config.MESSAGE_BROKER
+
+    if broker_type == "memory":
+        broker = InMemoryBroker()
+    elif broker_type == "file":
+        broker = FileBroker(config.MESSAGE_BROKER_FILE_DIR)
+    elif broker_type == "kafka":
+        bootstrap_servers = (external_config or {}).get("kafka_broker") or "kafka:9092"
+        broker = KafkaBroker(bootstrap_servers)
+    else:
+        logger.info("Message broker disabled")
+        return None
+
+    logger.info("Message broker initialized: %s", broker_type)
+    return broker
@@ -1,28 +1,51 @@
 import os
-import openai
 import json
 import re
 import logging
+import threading
 from typing import List
+from app.utils.metrics import track_dependency
 
 class OpenAIService:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.api_key = os.getenv("OPENAI_API_KEY")
-        self.client = None
-        if self.api_key:
-            try:
-                self.client = openai.OpenAI(api_key=self.api_key)
-                self.logger.info("OpenAI client initialized successfully")
-            except Exception as e:
-                self.logger.error(f"Failed to initialize OpenAI client: {e}")
-                self.client = None
+        # openai 임포트와 클라이언트 생성은 첫 사용(또는 워밍업) 시점으로 미룸 (앱 시작 시간 단축)
+        self._client = None
+        self._client_ready = False
+        self._client_lock = threading.Lock()
 
     def init_app(self, app):
         """앱 초기화"""
         self.logger.info("OpenAIService initialized")
         return self
 
+    @property
+    def client(self):
+        """OpenAI 클라이언트 (처음 접근할 때 생성, API 키가 없거나 생성에 실패하면 None)"""
+        if not self._client_ready:
+            with self._client_lock:
+                if not self._client_ready:
+                    self._client = self._create_client()
+                    self._client_ready = True
+        return self._client
+
+    def _create_client(self):
+        if not self.api_key:
+            return None
+        try:
+            import openai
+            client = openai.OpenAI(api_key=self.api_key)
+            self.logger.info("OpenAI client initialized successfully")
+            return client
+        except Exception as e:
+            self.logger.error("Failed to initialize OpenAI client: %s", e)
+            return None
+
+    def warm_up(self):
+        """워밍업 단계에서 클라이언트를 미리 생성 (첫 요청이 생성 비용을 내지 않도록)"""
+        return self.client is not None
+
     def split_story_into_segments(self, content: str) -> List[str]:
         """AI를 사용하여 이야기를 문장 단위로 분리"""
         try:
@@ -37,15 +60,16 @@ class OpenAIService:
                 f"{content}"
             )
             
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "너는 문장 분리기야. 주어진 텍스트를 문장 단위로 나누어 JSON 배열로 반환해줘."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1024,
-                temperature=0.2,
-            )
+            with track_dependency("openai", "split_story"):
+                response = self.client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=[
+                        {"role": "system", "content": "너는 문장 분리기야. 주어진 텍스트를 문장 단위로 나누어 JSON 배열로 반환해줘."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=1024,
+                    temperature=0.2,
+                )
             
             text = response.choices[0].message.content
             if text:
@@ -55,10 +79,10 @@ class OpenAIService:
                     try:
                         segments = json.loads(match.group(0))
                         if isinstance(segments, list) and len(segments) > 0:
-                            self.logger.info(f"Successfully split story into {len(segments)} segments")
+                            self.logger.info("Successfully split story into %s segments", len(segments))
                             return segments
                     except json.JSONDecodeError as e:
-                        self.logger.error(f"JSON parsing error: {e}")
+                        self.logger.error("JSON parsing error: %s", e)
                 
                 # JSON 파싱 실패 시 쉼표로 분리 시도
                 self.logger.warning("JSON parsing failed, trying comma-based split")
@@ -68,7 +92,7 @@ class OpenAIService:
                 return self._fallback_split(content)
                 
         except Exception as e:
-            self.logger.error(f"OpenAI API error: {e}")
+            self.logger.error("OpenAI API error: %s", e)
             return self._fallback_split(content)
 
     def _extract_sentences_from_text(self, text: str) -> List[str]:
@@ -83,7 +107,7 @@ class OpenAIService:
             sentences = re.split(r'[,.]', text)
             return [s.strip() for s in sentences if s.strip()]
         except Exception as e:
-            self.logger.error(f"Error extracting sentences: {e}")
+            self.logger.error("Error extracting sentences: %s", e)
             return self._fallback_split(text)
 
     def _fallback_split(self, content: str) -> List[str]:
@@ -91,10 +115,10 @@ class OpenAIService:
         try:
             # 마침표로 분리하고 빈 문자열 제거
             sentences = [s.strip() for s in content.split('.') if s.strip()]
-            self.logger.info(f"Using fallback split method, created {len(sentences)} segments")
+            self.logger.info("Using fallback split method, created %s segments", len(sentences))
             return sentences
         except Exception as e:
-            self.logger.error(f"Fallback split error: {e}")
+            self.logger.error("Fallback split error: %s", e)
             return [content]  # 최후의 수단으로 전체 내용을 하나의 세그먼트로
 
     def generate_story_summary(self, content: str) -> str:
@@ -104,16 +128,17 @@ class OpenAIService:
                 return "AI 요약을 사용할 수 없습니다."
             
             prompt = f"다음 이야기를 간단히 요약해주세요:\n\n{content}"
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "너는 이야기 요약 전문가야."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=200,
-                temperature=0.3,
-            )
+            with track_dependency("openai", "summarize_story"):
+                response = self.client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=[
+                        {"role": "system", "content": "너는 이야기 요약 전문가야."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=200,
+                    temperature=0.3,
+                )
             return response.choices[0].message.content
         except Exception as e:
-            self.logger.error(f"Error generating summary: {e}")
+            self.logger.error("Error generating summary: %s", e)
             return "요약을 생성할 수 없습니다." 
\ No newline at end of file
@@ -0,0 +1,142 @@
+from app.database import SessionLocal
+from app.models.outbox import OutboxEvent
+from app.helper.outbox_helper import serialize_outbox_event
+from datetime import datetime, timedelta
+import logging
+import threading
+
+class OutboxRelay:
+    """
+    아웃박스 릴레이: 미발행 이벤트를 배치로 읽어 브로커에 발행한 뒤 published_at을 기록합니다.
+
+    발행 후 published_at 기록 전에 프로세스가 종료되면 같은 이벤트가 다시 발행되므로
+    전달 보장은 at-least-once이며, 소비자는 event_id로 중복을 제거해야 합니다.
+
+    브로커가 없으면(MESSAGE_BROKER=none) 발행하지 않고 보관 기간 정리만 실행합니다.
+    이때는 발행 여부와 관계없이 보관 기간이 지난 이벤트를 삭제하므로 /internal/events 소비자는 그 안에 읽어야 합니다.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.broker = None
+        self.topic = None
+        self.batch_size = 100
+        self.poll_interval = 1.0
+        self.retention = timedelta(hours=72)
+        self.prune_interval = timedelta(minutes=10)
+        self._last_pruned_at = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        """앱 초기화 (워커 프로세스마다 startup 시 릴레이 스레드 시작)"""
+        config = app.state.config
+        self.broker = app.state.message_queue
+        self.topic = config.STORY_EVENTS_TOPIC
+        self.batch_size = config.OUTBOX_BATCH_SIZE
+        self.poll_interval = config.OUTBOX_POLL_INTERVAL
+        self.retention = timedelta(hours=config.OUTBOX_RETENTION_HOURS)
+
+        if config.OUTBOX_RELAY_ENABLED:
+            app.add_event_handler("startup", self.start)
+            app.add_event_handler("shutdown", self.stop)
+        self.logger.info("OutboxRelay initialized")
+        return self
+
+    def start(self):
+        """릴레이 백그라운드 스레드 시작"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="outbox-relay", daemon=True)
+        self._thread.start()
+        if self.broker is None:
+            self.logger.info("Outbox relay started without broker (pruning only, retention=%s)", self.retention)
+        else:
+            self.logger.info("Outbox relay started (topic=%s, batch_size=%s)", self.topic, self.batch_size)
+
+    def stop(self):
+        """릴레이 중지 및 브로커 정리"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 5)
+        if self.broker:
+            self.broker.close()
+        self.logger.info("Outbox relay stopped")
+
+    def _run(self):
+        failures = 0
+        while not self._stop_event.is_set():
+            try:
+                published = self.relay_once()
+                failures = 0
+                if published < self.batch_size:
+                    self._prune_if_due()
+                    self._stop_event.wait(self.poll_interval)
+            except Exception as e:
+                failures += 1
+                backoff = min(self.poll_interval * (2 ** failures), 60)
+                self.logger.error("Outbox relay error (retry in %.1fs): %s", backoff, e)
+                self._stop_event.wait(backoff)
+
+    def relay_once(self) -> int:
+        """미발행 이벤트 한 배치 발행, 발행한 이벤트 수 반환 (브로커가 없으면 0)"""
+        if self.broker is None:
+            return 0
+        db = SessionLocal()
+        try:
+            query = db.query(OutboxEvent).filter(
+                OutboxEvent.published_at.is_(None)
+            ).order_by(OutboxEvent.id).limit(self.batch_size)
+            # 여러 워커의 릴레이가 같은 행을 동시에 잡지 않도록 잠금 (PostgreSQL)
+            if db.get_bind().dialect.name == "postgresql":
+                query = query.with_for_update(skip_locked=True)
+            events = query.all()
+            if not events:
+                db.rollback()
+                return 0
+
+            self.broker.publish_batch(self.topic, [serialize_outbox_event(event) for event in events])
+
+            db.query(OutboxEvent).filter(
+                OutboxEvent.id.in_([event.id for event in events])
+            ).update({OutboxEvent.published_at: datetime.utcnow()}, synchronize_session=False)
+            db.commit()
+            self.logger.debug("Published %s outbox events", len(events))
+            return len(events)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _prune_if_due(self):
+        now = datetime.utcnow()
+        if self._last_pruned_at is None or now - self._last_pruned_at >= self.prune_interval:
+            self._last_pruned_at = now
+            deleted = self.prune_published()
+            if deleted:
+                self.logger.info("Pruned %s outbox events", deleted)
+
+    def prune_published(self) -> int:
+        """
+        보관 기간이 지난 이벤트 삭제
+
+        브로커가 있으면 발행 완료 이벤트만, 없으면 발행할 릴레이가 없으므로 생성 후 보관 기간이 지난 이벤트 모두
+        """
+        db = SessionLocal()
+        try:
+            cutoff = datetime.utcnow() - self.retention
+            query = db.query(OutboxEvent)
+            if self.broker is None:
+                query = query.filter(OutboxEvent.created_at < cutoff)
+            else:
+                query = query.filter(OutboxEvent.published_at.isnot(None), OutboxEvent.published_at < cutoff)
+            deleted = query.delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
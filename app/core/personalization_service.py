@@ -31,7 +31,7 @@ class PersonalizationService:
             return self._get_existing_user_recommendation(db, user_id, user_difficulty)
             
         except Exception as e:
-            self.logger.error(f"Error getting personalized recommendation: {e}")
+            self.logger.error("Error getting personalized recommendation: %s", e)
             return self._get_fallback_recommendation()
 
     def _get_new_user_recommendation(self) -> Dict[str, Any]:
@@ -60,7 +60,7 @@ class PersonalizationService:
             
             # 추천 게임 유형 결정
             recommended_game_type = self.difficulty_service.determine_next_game_type(
-                db, user_id, user_difficulty.current_game_type
+                db, user_id, user_difficulty.current_game_type, user_difficulty
             )
             
             # 개인화된 메시지 생성
@@ -85,7 +85,7 @@ class PersonalizationService:
             }
             
         except Exception as e:
-            self.logger.error(f"Error getting existing user recommendation: {e}")
+            self.logger.error("Error getting existing user recommendation: %s", e)
             return self._get_fallback_recommendation()
 
     def _analyze_recent_patterns(self, db: Session, user_id: int) -> Dict[str, Any]:
@@ -133,7 +133,7 @@ class PersonalizationService:
             }
             
         except Exception as e:
-            self.logger.error(f"Error analyzing recent patterns: {e}")
+            self.logger.error("Error analyzing recent patterns: %s", e)
             return {"trend": "stable", "consistency": "unknown"}
 
     def _analyze_time_based_performance(self, db: Session, user_id: int) -> Dict[str, Any]:
@@ -175,7 +175,7 @@ class PersonalizationService:
             }
             
         except Exception as e:
-            self.logger.error(f"Error analyzing time-based performance: {e}")
+            self.logger.error("Error analyzing time-based performance: %s", e)
             return {"best_time": "오전", "performance_by_time": {}}
 
     def _generate_personalized_message(self, user_difficulty, recent_patterns, time_based_performance) -> tuple[str, List[str]]:
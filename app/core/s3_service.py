@@ -1,91 +1,324 @@
-import boto3
+import io
 import os
+import threading
 import uuid
 from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
 import logging
-from typing import Optional
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from app.utils.metrics import instrument_boto_client
+from app.utils.tracing import trace_boto_client
+from app.utils.request_context import run_in_executor
+
+# DeleteObjects 한 번에 지울 수 있는 최대 키 수
+DELETE_BATCH_SIZE = 1000
 
 class S3Service:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.s3_client = None
         self.bucket_name = os.getenv('S3_BUCKET_NAME', 'memory-garden-images')
         self.region = os.getenv('AWS_REGION', 'ap-southeast-1')
+        # S3 호환 스토리지(MinIO, moto 서버 등) 사용 시 엔드포인트 지정
+        self.endpoint_url = os.getenv('S3_ENDPOINT_URL') or None
+        self.presigned_url_expires = int(os.getenv('S3_PRESIGNED_URL_EXPIRES', '600'))
         
-        # AWS 자격 증명 설정
-        aws_access_key_id = os.getenv('AWS_ACCESS_KEY_ID')
-        aws_secret_access_key = os.getenv('AWS_SECRET_ACCESS_KEY')
+        # 업로드는 이벤트 루프 밖의 전용 스레드 풀에서 실행 (스레드 수 = 동시 업로드 제한)
+        self.upload_concurrency = int(os.getenv('S3_UPLOAD_CONCURRENCY', '4'))
+        self._upload_executor = ThreadPoolExecutor(
+            max_workers=self.upload_concurrency,
+            thread_name_prefix='s3-upload'
+        )
         
-        if aws_access_key_id and aws_secret_access_key:
-            try:
-                self.s3_client = boto3.client(
-                    's3',
-                    aws_access_key_id=aws_access_key_id,
-                    aws_secret_access_key=aws_secret_access_key,
-                    region_name=self.region
-                )
-                self.logger.info(f"S3 client initialized successfully for bucket: {self.bucket_name}")
-            except Exception as e:
-                self.logger.error(f"Failed to initialize S3 client: {e}")
-                self.s3_client = None
-        else:
-            self.logger.warning("AWS 자격 증명이 설정되지 않았습니다. S3 기능을 사용할 수 없습니다.")
+        # boto3 임포트와 클라이언트 생성은 첫 사용(또는 워밍업) 시점으로 미룸 (앱 시작 시간 단축)
+        self._s3_client = None
+        self._transfer_config = None
+        self._client_ready = False
+        self._client_lock = threading.Lock()
 
     def init_app(self, app):
         """앱 초기화"""
         self.logger.info("S3Service initialized")
         return self
 
+    @property
+    def s3_client(self):
+        """S3 클라이언트 (처음 접근할 때 생성, 자격 증명이 없거나 생성에 실패하면 None)"""
+        if not self._client_ready:
+            with self._client_lock:
+                if not self._client_ready:
+                    self._s3_client = self._create_client()
+                    self._client_ready = True
+        return self._s3_client
+
+    @s3_client.setter
+    def s3_client(self, client):
+        self._s3_client = client
+        self._client_ready = True
+
+    @property
+    def transfer_config(self):
+        """업로드 전송 설정 (큰 파일은 멀티파트로 나누어 전송)"""
+        if self._transfer_config is None:
+            from boto3.s3.transfer import TransferConfig
+            self._transfer_config = TransferConfig(
+                multipart_threshold=8 * 1024 * 1024,
+                multipart_chunksize=8 * 1024 * 1024,
+                max_concurrency=4
+            )
+        return self._transfer_config
+
+    def _create_client(self):
+        # AWS 자격 증명 설정
+        aws_access_key_id = os.getenv('AWS_ACCESS_KEY_ID')
+        aws_secret_access_key = os.getenv('AWS_SECRET_ACCESS_KEY')
+        
+        if not (aws_access_key_id and aws_secret_access_key):
+            self.logger.warning("AWS 자격 증명이 설정되지 않았습니다. S3 기능을 사용할 수 없습니다.")
+            return None
+        
+        try:
+            import boto3
+            s3_client = boto3.client(
+                's3',
+                aws_access_key_id=aws_access_key_id,
+                aws_secret_access_key=aws_secret_access_key,
+                region_name=self.region,
+                endpoint_url=self.endpoint_url
+            )
+            # 모든 S3 API 호출의 지연/오류를 메트릭으로 기록
+            instrument_boto_client(s3_client, "s3")
+            trace_boto_client(s3_client)
+            self.logger.info("S3 client initialized successfully for bucket: %s", self.bucket_name)
+            return s3_client
+        except Exception as e:
+            self.logger.error("Failed to initialize S3 client: %s", e)
+            return None
+
+    def warm_up(self):
+        """워밍업 단계에서 클라이언트를 미리 생성 (첫 요청이 생성 비용을 내지 않도록)"""
+        return self.s3_client is not None
+
+    def get_object_url(self, key: str) -> str:
+        """객체 키의 공개 URL"""
+        if self.endpoint_url:
+            return f"{self.endpoint_url.rstrip('/')}/{self.bucket_name}/{key}"
+        return f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{key}"
+
+    def get_key_from_url(self, image_url: str) -> str:
+        """공개 URL에서 객체 키 추출"""
+        if self.endpoint_url:
+            return image_url.split(f"{self.endpoint_url.rstrip('/')}/{self.bucket_name}/")[-1]
+        return image_url.split(f"{self.bucket_name}.s3.{self.region}.amazonaws.com/")[-1]
+
     def upload_image(self, file_content: bytes, file_extension: str) -> Optional[str]:
         """이미지를 S3에 업로드하고 URL을 반환"""
+        return self.upload_fileobj(io.BytesIO(file_content), file_extension)
+
+    def upload_fileobj(self, fileobj: BinaryIO, file_extension: str, key: Optional[str] = None) -> Optional[str]:
+        """파일 객체를 스트리밍으로 S3에 업로드하고 URL을 반환 (블로킹, 스레드 풀에서 호출)"""
         if not self.s3_client:
             self.logger.error("S3 클라이언트가 초기화되지 않았습니다.")
             return None
         
         try:
-            # 고유한 파일명 생성
-            file_name = f"story-images/{uuid.uuid4()}.{file_extension}"
+            # 키가 없으면 고유한 파일명 생성
+            file_name = key or f"story-images/{uuid.uuid4()}.{file_extension}"
             
-            # S3에 업로드 (ACL 제거)
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=file_name,
-                Body=file_content,
-                ContentType=f'image/{file_extension}',
-                # ACL='public-read'  # ACL 제거 - 버킷 정책으로 접근 제어
+            # 전체 내용을 메모리에 올리지 않고 청크 단위(큰 파일은 멀티파트)로 업로드
+            # ACL 없이 업로드 - 버킷 정책으로 접근 제어
+            self.s3_client.upload_fileobj(
+                fileobj,
+                self.bucket_name,
+                file_name,
+                ExtraArgs={'ContentType': f'image/{file_extension}'},
+                Config=self.transfer_config
             )
             
             # S3 URL 생성
-            s3_url = f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{file_name}"
-            self.logger.info(f"이미지 업로드 성공: {s3_url}")
+            s3_url = self.get_object_url(file_name)
+            self.logger.info("이미지 업로드 성공: %s", s3_url)
             
             return s3_url
             
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
-            self.logger.error(f"S3 업로드 실패 - Code: {error_code}, Message: {error_message}")
-            
-            # ACL 오류인 경우 ACL 없이 재시도
-            if error_code == 'AccessControlListNotSupported':
-                self.logger.info("ACL not supported, retrying without ACL...")
-                try:
-                    self.s3_client.put_object(
-                        Bucket=self.bucket_name,
-                        Key=file_name,
-                        Body=file_content,
-                        ContentType=f'image/{file_extension}'
-                    )
-                    s3_url = f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{file_name}"
-                    self.logger.info(f"이미지 업로드 성공 (ACL 없이): {s3_url}")
-                    return s3_url
-                except Exception as retry_error:
-                    self.logger.error(f"Retry upload failed: {retry_error}")
-                    return None
-            
+            self.logger.error("S3 업로드 실패 - Code: %s, Message: %s", error_code, error_message)
+            return None
+        except Exception as e:
+            self.logger.error("이미지 업로드 중 오류 발생: %s", e)
+            return None
+
+    async def upload_fileobj_async(self, fileobj: BinaryIO, file_extension: str, key: Optional[str] = None) -> Optional[str]:
+        """upload_fileobj를 업로드 전용 스레드 풀에서 실행 (이벤트 루프 비차단)"""
+        return await run_in_executor(self._upload_executor, self.upload_fileobj, fileobj, file_extension, key)
+
+    def upload_bytes(self, data: bytes, key: str, content_type: str) -> bool:
+        """작은 객체(파생 이미지 등)를 지정한 키로 업로드"""
+        if not self.s3_client:
+            self.logger.error("S3 클라이언트가 초기화되지 않았습니다.")
+            return False
+        
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=key,
+                Body=data,
+                ContentType=content_type,
+                # 키가 내용 해시에서 파생되므로 내용이 바뀌지 않음
+                CacheControl='public, max-age=31536000, immutable'
+            )
+            return True
+        except Exception as e:
+            self.logger.error("S3 업로드 실패 (%s): %s", key, e)
+            return False
+
+    async def upload_bytes_async(self, data: bytes, key: str, content_type: str) -> bool:
+        """upload_bytes를 업로드 전용 스레드 풀에서 실행"""
+        return await run_in_executor(self._upload_executor, self.upload_bytes, data, key, content_type)
+
+    def get_content_hash_key(self, content_hash: str, file_extension: str) -> str:
+        """내용 해시 기반 원본 키 (같은 바이트는 항상 같은 키)"""
+        return f"story-images/{content_hash}.{file_extension}"
+
+    def get_image_variants(self, image_url: Optional[str]) -> Optional[Dict[str, Any]]:
+        """이미지 URL의 파생 이미지 URL 맵 (파생 이미지가 생성되지 않은 이미지면 None)"""
+        if not image_url or not self.s3_client:
+            return None
+        
+        from app.core.image_pipeline import build_variant_urls, get_variant_key
+        key = self.get_key_from_url(image_url)
+        if not key.startswith('story-images/') or key.startswith('story-images/derived/'):
             return None
+        if not self.get_object_info(get_variant_key(key, 'thumbnail', 'webp')):
+            return None
+        return build_variant_urls(self, key)
+
+    async def get_image_variants_async(self, image_url: Optional[str]) -> Optional[Dict[str, Any]]:
+        """get_image_variants(HEAD 요청 포함)를 스레드 풀에서 실행"""
+        return await run_in_executor(self._upload_executor, self.get_image_variants, image_url)
+
+    def touch_object(self, key: str, content_type: str) -> bool:
+        """
+        객체를 자기 자신으로 복사해 LastModified 갱신 (내용 해시 재사용 시 GC 유예 시간을 다시 시작)
+
+        복사 중 객체가 삭제되었으면 False를 반환하므로 호출자는 다시 업로드해야 합니다.
+        """
+        if not self.s3_client:
+            return False
+        try:
+            self.s3_client.copy_object(
+                Bucket=self.bucket_name,
+                Key=key,
+                CopySource={'Bucket': self.bucket_name, 'Key': key},
+                MetadataDirective='REPLACE',
+                ContentType=content_type
+            )
+            return True
+        except ClientError as e:
+            self.logger.warning("S3 객체 갱신 실패 - Code: %s, Key: %s", e.response['Error']['Code'], key)
+            return False
+
+    async def touch_object_async(self, key: str, content_type: str) -> bool:
+        """touch_object를 업로드 전용 스레드 풀에서 실행"""
+        return await run_in_executor(self._upload_executor, self.touch_object, key, content_type)
+
+    async def get_object_info_async(self, key: str) -> Optional[Dict[str, Any]]:
+        """get_object_info를 스레드 풀에서 실행"""
+        return await run_in_executor(self._upload_executor, self.get_object_info, key)
+
+    def download_bytes(self, key: str) -> Optional[bytes]:
+        """객체 내용 다운로드 (파생 이미지 생성용, 5MB 이하 이미지)"""
+        if not self.s3_client:
+            return None
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+            return response['Body'].read()
+        except Exception as e:
+            self.logger.error("S3 다운로드 실패 (%s): %s", key, e)
+            return None
+
+    def get_user_upload_prefix(self, user_id: int) -> str:
+        """
+        사용자 직접 업로드 키 접두사 (완료 요청 시 발급받은 사용자인지 확인용)
+
+        파생 이미지/GC가 키의 마지막 경로를 식별자로 쓰므로 하위 폴더 대신 파일명 접두사로 구분
+        """
+        return f"story-images/u{user_id}-"
+
+    def create_presigned_upload(self, file_extension: str, content_type: str, max_size: int, user_id: int,
+                                method: str = 'post', content_length: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        클라이언트가 S3에 직접 업로드할 수 있는 presigned URL 발급
+        
+        - post: content-type 고정 + content-length-range(1 ~ max_size) 조건이 걸린 presigned POST
+        - put: content-type과 content-length(정확한 크기)가 서명에 포함된 presigned PUT
+        - 키는 사용자별 접두사(get_user_upload_prefix)로 발급
+        """
+        if not self.s3_client:
+            self.logger.error("S3 클라이언트가 초기화되지 않았습니다.")
+            return None
+        
+        key = f"{self.get_user_upload_prefix(user_id)}{uuid.uuid4()}.{file_extension}"
+        try:
+            if method == 'put':
+                url = self.s3_client.generate_presigned_url(
+                    'put_object',
+                    Params={
+                        'Bucket': self.bucket_name,
+                        'Key': key,
+                        'ContentType': content_type,
+                        'ContentLength': content_length
+                    },
+                    ExpiresIn=self.presigned_url_expires
+                )
+                upload = {
+                    "method": "PUT",
+                    "url": url,
+                    "headers": {"Content-Type": content_type, "Content-Length": str(content_length)}
+                }
+            else:
+                presigned = self.s3_client.generate_presigned_post(
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    Fields={'Content-Type': content_type},
+                    Conditions=[
+                        {'Content-Type': content_type},
+                        ['content-length-range', 1, max_size]
+                    ],
+                    ExpiresIn=self.presigned_url_expires
+                )
+                upload = {"method": "POST", "url": presigned['url'], "fields": presigned['fields']}
+            
+            upload.update({
+                "key": key,
+                "image_url": self.get_object_url(key),
+                "expires_in": self.presigned_url_expires
+            })
+            return upload
         except Exception as e:
-            self.logger.error(f"이미지 업로드 중 오류 발생: {e}")
+            self.logger.error("Presigned URL 발급 실패: %s", e)
+            return None
+
+    def get_object_info(self, key: str) -> Optional[Dict[str, Any]]:
+        """HEAD 요청으로 객체 존재 여부와 크기/타입 확인 (없으면 None)"""
+        if not self.s3_client:
+            self.logger.error("S3 클라이언트가 초기화되지 않았습니다.")
+            return None
+        
+        try:
+            head = self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
+            return {
+                "key": key,
+                "size": head.get('ContentLength', 0),
+                "content_type": head.get('ContentType', ''),
+                "etag": head.get('ETag', '').strip('"'),
+                "last_modified": head.get('LastModified')
+            }
+        except ClientError as e:
+            error_code = e.response['Error']['Code']
+            if error_code not in ('404', 'NoSuchKey', 'NotFound'):
+                self.logger.error("S3 HEAD 실패 - Code: %s, Key: %s", error_code, key)
             return None
 
     def delete_image(self, image_url: str) -> bool:
@@ -96,21 +329,61 @@ class S3Service:
         
         try:
             # URL에서 키 추출
-            key = image_url.split(f"{self.bucket_name}.s3.{self.region}.amazonaws.com/")[-1]
+            key = self.get_key_from_url(image_url)
             
             self.s3_client.delete_object(
                 Bucket=self.bucket_name,
                 Key=key
             )
             
-            self.logger.info(f"이미지 삭제 성공: {key}")
+            self.logger.info("이미지 삭제 성공: %s", key)
             return True
             
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
-            self.logger.error(f"S3 삭제 실패 - Code: {error_code}, Message: {error_message}")
+            self.logger.error("S3 삭제 실패 - Code: %s, Message: %s", error_code, error_message)
             return False
         except Exception as e:
-            self.logger.error(f"이미지 삭제 중 오류 발생: {e}")
-            return False 
\ No newline at end of file
+            self.logger.error("이미지 삭제 중 오류 발생: %s", e)
+            return False 
+
+    def iter_objects(self, prefix: str) -> Iterator[Dict[str, Any]]:
+        """접두사 아래 객체 목록을 페이지 단위(최대 1000개)로 조회하며 하나씩 반환"""
+        if not self.s3_client:
+            self.logger.error("S3 클라이언트가 초기화되지 않았습니다.")
+            return
+        
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                yield obj
+
+    def delete_keys(self, keys: List[str]) -> Tuple[int, List[Dict[str, str]]]:
+        """DeleteObjects로 여러 키를 1000개 단위로 삭제, (삭제 수, 실패 목록) 반환"""
+        if not self.s3_client:
+            self.logger.error("S3 클라이언트가 초기화되지 않았습니다.")
+            return 0, [{"key": key, "error": "S3 client unavailable"} for key in keys]
+        
+        deleted = 0
+        errors = []
+        for start in range(0, len(keys), DELETE_BATCH_SIZE):
+            batch = keys[start:start + DELETE_BATCH_SIZE]
+            try:
+                # Quiet 모드: 응답에는 실패한 키만 포함
+                response = self.s3_client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+                )
+                batch_errors = [
+                    {"key": error.get('Key'), "error": error.get('Code')}
+                    for error in response.get('Errors', [])
+                ]
+            except ClientError as e:
+                batch_errors = [{"key": key, "error": e.response['Error']['Code']} for key in batch]
+            errors.extend(batch_errors)
+            deleted += len(batch) - len(batch_errors)
+        
+        if deleted:
+            self.logger.info("이미지 %s개 일괄 삭제", deleted)
+        return deleted, errors
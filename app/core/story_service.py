@@ -2,7 +2,10 @@ from sqlalchemy.orm import Session
 from app.models.story import Story, StorySegment
 from app.schemas.story import StoryCreate, StoryUpdate, StoryResponse
 from app.common.response import NotFoundError, ValidationError
-from typing import List, Optional
+from app.helper.story_helper import add_story_tombstone
+from app.helper.outbox_helper import add_story_event, STORY_CREATED, STORY_UPDATED, STORY_DELETED
+from app.utils.functions import make_excerpt, segment_difficulty_features, story_difficulty_features
+from typing import Any, Dict, List, Optional
 import logging
 
 class StoryService:
@@ -14,60 +17,90 @@ class StoryService:
         self.logger.info("StoryService initialized")
         return self
 
-    def create_story(self, db: Session, story_create: StoryCreate, app=None, user_id: int = None) -> StoryResponse:
-        """이야기 생성"""
+    def create_story(self, db: Session, story_create: StoryCreate, app=None, user_id: int = None,
+                     image_variants: Optional[Dict[str, Any]] = None) -> StoryResponse:
+        """이야기 생성 (image_variants는 호출자가 get_image_variants로 미리 조회)"""
         try:
             # 유효성 검사
             if not story_create.title or not story_create.content:
                 raise ValidationError("제목과 내용은 필수입니다.")
             
-            # 이야기 생성
-            db_story = Story(
-                user_id=user_id,  # user_id 추가
-                title=story_create.title,
-                content=story_create.content,
-                image_url=story_create.image_url
-            )
-            db.add(db_story)
-            db.commit()
-            db.refresh(db_story)
-            
-            self.logger.info(f"Story created with ID: {db_story.id}")
-            
             # OpenAI로 문장 분리 (app.state.openai_service 사용)
+            # 외부 API 호출 중에 DB 트랜잭션을 잡고 있지 않도록 저장 전에 분리
             segments = []
             if app and hasattr(app, 'state') and hasattr(app.state, 'openai_service'):
                 self.logger.info("Using OpenAI service for sentence splitting")
-                segments = app.state.openai_service.split_story_into_segments(db_story.content)
+                segments = app.state.openai_service.split_story_into_segments(story_create.content)
             else:
                 # fallback: 기본 분리
                 self.logger.warning("OpenAI service not available, using fallback method")
-                segments = [s.strip() for s in db_story.content.split('.') if s.strip()]
+                segments = [s.strip() for s in story_create.content.split('.') if s.strip()]
             
-            self.logger.info(f"Split story into {len(segments)} segments")
+            self.logger.info("Split story into %s segments", len(segments))
             
-            # 세그먼트 저장
-            for idx, segment_text in enumerate(segments, start=1):
+            # 이야기, 세그먼트, 아웃박스 이벤트를 하나의 트랜잭션으로 저장
+            db_story = Story(
+                user_id=user_id,  # user_id 추가
+                title=story_create.title,
+                content=story_create.content,
+                excerpt=make_excerpt(story_create.content),
+                image_url=story_create.image_url,
+                image_variants=image_variants
+            )
+            db.add(db_story)
+            db.flush()
+            
+            self.logger.info("Story created with ID: %s", db_story.id)
+            
+            # 세그먼트 저장 (퍼즐 난이도 특징을 함께 계산)
+            db_segments = []
+            order = 0
+            for segment_text in segments:
                 if segment_text.strip():  # 빈 문자열이 아닌 경우만 저장
+                    order += 1
+                    features = segment_difficulty_features(segment_text.strip())
                     db_segment = StorySegment(
                         story_id=db_story.id,
-                        order=idx,
-                        segment_text=segment_text.strip()
+                        order=order,
+                        segment_text=segment_text.strip(),
+                        word_count=features["word_count"],
+                        char_length=features["char_length"],
+                        difficulty_score=features["difficulty_score"]
                     )
                     db.add(db_segment)
-                    self.logger.debug(f"Added segment {idx}: {segment_text[:50]}...")
+                    db_segments.append(db_segment)
+                    self.logger.debug("Added segment %s: %s...", order, segment_text[:50])
+            db_story.segment_count = order
+            story_features = story_difficulty_features([segment.segment_text for segment in db_segments])
+            db_story.char_length = story_features["char_length"]
+            db_story.avg_segment_words = story_features["avg_segment_words"]
+            db_story.rare_word_ratio = story_features["rare_word_ratio"]
+            db_story.difficulty_score = story_features["difficulty_score"]
+            db.flush()
+            
+            add_story_event(db, STORY_CREATED, db_story, segments=[
+                {"id": segment.id, "order": segment.order, "segment_text": segment.segment_text}
+                for segment in db_segments
+            ])
             
             db.commit()
             db.refresh(db_story)
             
-            self.logger.info(f"Successfully created story with {len(segments)} segments")
+            self.logger.info("Successfully created story with %s segments", len(segments))
             return StoryResponse.model_validate(db_story.__dict__)
             
         except Exception as e:
             db.rollback()
-            self.logger.error(f"Error creating story: {e}")
+            self.logger.error("Error creating story: %s", e)
             raise
 
+    async def get_image_variants(self, app, image_url: Optional[str]) -> Optional[Dict[str, Any]]:
+        """이미지의 파생 이미지 URL 맵 조회 (S3 HEAD는 업로드 스레드 풀에서 실행, S3 서비스가 없으면 None)"""
+        s3_service = getattr(getattr(app, 'state', None), 's3_service', None)
+        if not image_url or s3_service is None:
+            return None
+        return await s3_service.get_image_variants_async(image_url)
+
     def get_story(self, db: Session, story_id: int) -> Optional[StoryResponse]:
         """이야기 조회"""
         story = db.query(Story).filter(Story.id == story_id).first()
@@ -91,13 +124,17 @@ class StoryService:
             update_data = story_update.model_dump(exclude_unset=True)
             for key, value in update_data.items():
                 setattr(story, key, value)
+            if 'content' in update_data:
+                story.excerpt = make_excerpt(story.content)
+            db.flush()
+            add_story_event(db, STORY_UPDATED, story)
             
             db.commit()
             db.refresh(story)
             return StoryResponse.model_validate(story)
         except Exception as e:
             db.rollback()
-            self.logger.error(f"Error updating story: {e}")
+            self.logger.error("Error updating story: %s", e)
             raise
 
     def delete_story(self, db: Session, story_id: int) -> bool:
@@ -107,12 +144,14 @@ class StoryService:
             if not story:
                 return False
             
+            add_story_event(db, STORY_DELETED, story)
             db.delete(story)
+            add_story_tombstone(db, story_id)
             db.commit()
             return True
         except Exception as e:
             db.rollback()
-            self.logger.error(f"Error deleting story: {e}")
+            self.logger.error("Error deleting story: %s", e)
             raise
 
  
\ No newline at end of file
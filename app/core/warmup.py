@@ -0,0 +1,141 @@
+from app.database import engine, check_schema, get_pool_settings
+from sqlalchemy import text
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Tuple
+import logging
+import threading
+import time
+
+class AppWarmup:
+    """
+    워커 시작 후 준비 단계 (/health/ready가 200을 반환하기 전까지)
+
+    1. 스키마 버전 확인 (실패하면 주기적으로 다시 확인, migrate_schema.py 실행 후 재시작 없이 준비됨)
+    2. DB 연결 풀을 미리 채움 (첫 요청들이 연결 생성 비용을 내지 않도록)
+    3. 난이도 설정 스냅샷 적재
+    4. (선택) OpenAI/S3 클라이언트 생성 - 준비 상태에는 영향 없음
+
+    startup 이벤트에서는 스레드만 시작하므로 이벤트 루프와 /health/live는 바로 응답합니다.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.app = None
+        self.auto_create = False
+        self.db_connections = 0
+        self.warm_clients = True
+        self.retry_interval = 5.0
+        self.ready = False
+        self.checks: Dict[str, Any] = {}
+        self.started_at = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        """앱 초기화 (워커 프로세스마다 startup 시 워밍업 스레드 시작)"""
+        config = app.state.config
+        self.app = app
+        self.auto_create = config.SCHEMA_AUTO_CREATE
+        # 풀이 유지하는 연결 수(pool_size)보다 많이 열면 반환 시 닫히므로 그 이하로 제한
+        pool_size = get_pool_settings()[0]
+        self.db_connections = min(config.WARMUP_DB_CONNECTIONS or pool_size, pool_size)
+        self.warm_clients = config.WARMUP_CLIENTS
+        app.add_event_handler("startup", self.start)
+        app.add_event_handler("shutdown", self.stop)
+        self.logger.info("AppWarmup initialized")
+        return self
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self.ready = False
+        self.started_at = time.perf_counter()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="app-warmup", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                if self.run_once():
+                    break
+            except Exception as e:
+                self.checks["error"] = str(e)
+                self.logger.error("Warm-up failed (retry in %.0fs): %s", self.retry_interval, e)
+            self._stop_event.wait(self.retry_interval)
+
+        if self.ready and self.warm_clients:
+            self._warm_clients()
+
+    def run_once(self) -> bool:
+        """워밍업 한 번 실행, 준비되었으면 True"""
+        started = time.perf_counter()
+        schema = check_schema(auto_create=self.auto_create)
+        self.checks["schema"] = schema
+        if not schema["ok"]:
+            self.logger.warning(schema["message"])
+            return False
+
+        self.checks["database"] = {"connections": self.warm_pool(self.db_connections)}
+
+        from app.core.difficulty_settings import difficulty_settings
+        self.checks["difficulty_settings"] = {"version": difficulty_settings.warm_up()}
+
+        self.checks.pop("error", None)
+        self.checks["warmup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        self.checks["ready_after_ms"] = round((time.perf_counter() - self.started_at) * 1000, 1)
+        self.ready = True
+        self.logger.info("Warm-up complete (%sms)", self.checks['warmup_ms'])
+        return True
+
+    @staticmethod
+    def warm_pool(count: int) -> int:
+        """연결 count개를 동시에 열어 SELECT 1 실행 후 풀에 반환 (풀 크기까지 유지됨)"""
+        if count <= 0:
+            return 0
+        barrier = threading.Barrier(count)
+
+        def open_connection(_):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                # 모두 열릴 때까지 반환하지 않아야 같은 연결을 재사용하지 않고 count개가 생김
+                try:
+                    barrier.wait(timeout=10)
+                except threading.BrokenBarrierError:
+                    pass
+
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            list(executor.map(open_connection, range(count)))
+        return count
+
+    def _warm_clients(self):
+        clients = {}
+        for name in ("openai_service", "s3_service"):
+            service = getattr(self.app.state, name, None)
+            # 랩 환경의 대역 서비스는 warm_up이 없음
+            warm_up = getattr(type(service), "warm_up", None)
+            if warm_up is None:
+                continue
+            started = time.perf_counter()
+            try:
+                clients[name] = {"ok": bool(warm_up(service)), "ms": round((time.perf_counter() - started) * 1000, 1)}
+            except Exception as e:
+                clients[name] = {"ok": False, "error": str(e)}
+                self.logger.warning("%s warm-up failed: %s", name, e)
+        self.checks["clients"] = clients
+
+    def readiness(self) -> Tuple[bool, Dict[str, Any]]:
+        """준비 상태와 확인 결과 (워밍업이 끝난 뒤에는 DB ping까지 확인)"""
+        if not self.ready:
+            return False, {"status": "starting", "checks": self.checks}
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception as e:
+            return False, {"status": "unavailable", "checks": {**self.checks, "database": {"error": str(e)}}}
+        return True, {"status": "ready", "checks": self.checks}
@@ -1,6 +1,8 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from app.utils.metrics import InstrumentedQueuePool
+from typing import Any, Dict, Optional
 import os
 from dotenv import load_dotenv
 
@@ -10,13 +12,44 @@ DATABASE_URL = os.getenv(
     "DATABASE_URL"
 )
 
+# DB_CONNECTION_BUDGET이 없을 때 인스턴스 전체 최대 DB 연결 수
+DEFAULT_DB_CONNECTION_BUDGET = 15
+# 워커마다 백그라운드 스레드(아웃박스 릴레이, 난이도 설정 갱신)가 쓰는 연결 수 (요청 몫과 별도로 상시 유지)
+BACKGROUND_DB_CONNECTIONS = 2
+# 워커당 최소 연결 수 (백그라운드 몫 + 요청용 2개), gunicorn.conf.py의 기본 워커 수도 이 값으로 제한
+MIN_WORKER_CONNECTIONS = BACKGROUND_DB_CONNECTIONS + 2
+
+def get_connection_budget() -> int:
+    """인스턴스 전체 DB 연결 예산 (DB_CONNECTION_BUDGET, 기본값: 15)"""
+    return int(os.getenv("DB_CONNECTION_BUDGET") or 0) or DEFAULT_DB_CONNECTION_BUDGET
+
+def get_pool_settings():
+    """
+    워커 프로세스당 연결 풀 크기 (pool_size, max_overflow)
+
+    DB_CONNECTION_BUDGET(이 서비스 인스턴스 전체의 최대 DB 연결 수, 기본값: 15)을 WEB_CONCURRENCY(워커 수)로 나눠
+    워커마다 최대 연결 수의 합이 예산을 넘지 않게 합니다. 백그라운드 스레드 몫(BACKGROUND_DB_CONNECTIONS)과
+    요청 몫의 2/3를 상시 유지하고, 워커당 MIN_WORKER_CONNECTIONS보다 적게 주지는 않습니다
+    (예산이 워커 수에 비해 작으면 합계가 예산을 넘으므로 gunicorn이 시작 시 경고).
+    DB_POOL_SIZE/DB_MAX_OVERFLOW를 지정하면 그 값을 그대로 사용합니다.
+    """
+    workers = max(1, int(os.getenv("WEB_CONCURRENCY") or 1))
+    per_worker = max(MIN_WORKER_CONNECTIONS, get_connection_budget() // workers)
+    request_connections = per_worker - BACKGROUND_DB_CONNECTIONS
+    pool_size = BACKGROUND_DB_CONNECTIONS + max(1, request_connections * 2 // 3)
+    max_overflow = per_worker - pool_size
+    return int(os.getenv("DB_POOL_SIZE", pool_size)), int(os.getenv("DB_MAX_OVERFLOW", max_overflow))
+
+POOL_SIZE, MAX_OVERFLOW = get_pool_settings()
+
 # 연결 풀 설정으로 SSL 연결 문제 해결
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
     pool_recycle=300,
-    pool_size=5,
-    max_overflow=10,
+    poolclass=InstrumentedQueuePool,  # 연결 대기 시간 기록
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
     echo=False
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -29,17 +62,67 @@ def get_db():
     finally:
         db.close()
 
+# 코드가 기대하는 스키마 버전 (스키마를 바꾸면 1 올리고 migrate_schema.py에 변경을 추가)
+SCHEMA_VERSION = 4
+
+def get_schema_version(conn) -> Optional[int]:
+    """기록된 스키마 버전 (버전 테이블이 없으면 None)"""
+    if not inspect(conn).has_table("schema_version"):
+        return None
+    return conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar()
+
+def set_schema_version(conn, version: int = SCHEMA_VERSION):
+    """스키마 버전 기록 (migrate_schema.py 완료 시, 빈 데이터베이스에 테이블을 만든 직후)"""
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL, applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    ))
+    conn.execute(text("DELETE FROM schema_version"))
+    conn.execute(text("INSERT INTO schema_version (version) VALUES (:version)"), {"version": version})
+
+def check_schema(auto_create: bool = False) -> Dict[str, Any]:
+    """
+    시작 시 스키마 확인 (매번 create_all로 모든 테이블을 검사하지 않고 버전 한 번 조회)
+
+    - 버전이 SCHEMA_VERSION 이상이면 ok
+    - auto_create이고 새 데이터베이스(stories 테이블 없음)면 create_all 후 현재 버전 기록, 개발/랩 환경용
+    - 그 외에는 ok=False (migrate_schema.py 실행 필요)
+      create_all은 기존 테이블에 새 컬럼을 추가하지 못하므로 이전 스키마의 데이터베이스는 auto_create여도 준비되지 않음
+    """
+    with engine.connect() as conn:
+        version = get_schema_version(conn)
+        fresh = not inspect(conn).has_table("stories")
+    if version is not None and version >= SCHEMA_VERSION:
+        return {"ok": True, "version": version, "expected": SCHEMA_VERSION}
+    if auto_create and fresh:
+        init_db()
+        with engine.begin() as conn:
+            set_schema_version(conn)
+        return {"ok": True, "version": SCHEMA_VERSION, "expected": SCHEMA_VERSION, "auto_created": True}
+    return {
+        "ok": False,
+        "version": version,
+        "expected": SCHEMA_VERSION,
+        "message": "스키마가 최신이 아닙니다. python migrate_schema.py를 실행하세요."
+    }
+
 def init_db():
-    """데이터베이스 테이블 초기화"""
+    """데이터베이스 테이블 초기화 (빈 데이터베이스면 현재 스키마 버전도 기록)"""
     try:
         # 모든 모델을 import하여 테이블 생성
-        from app.models.game_result import GameResult, UserDifficulty
+        from app.models.game_result import GameResult, UserDifficulty, DifficultySetting, DifficultySettingsVersion
         from app.models.story import Story
+        from app.models.outbox import OutboxEvent
+        
+        with engine.connect() as conn:
+            empty = not inspect(conn).get_table_names()
         
         print("데이터베이스 테이블 생성 중...")
         Base.metadata.create_all(bind=engine)
+        if empty:
+            with engine.begin() as conn:
+                set_schema_version(conn)
         print("데이터베이스 테이블 생성 완료!")
         
     except Exception as e:
         print(f"데이터베이스 초기화 오류: {e}")
-        raise 
\ No newline at end of file
+        raise
@@ -1,32 +1,26 @@
+from sqlalchemy import func, text, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from app.models.game_result import GameResult, UserDifficulty
+from app.core.difficulty_rules import Rating, rate_game, update_streaks, update_success_rate
+from app.models.game_result import GameResult, UserDifficulty, DifficultySetting, DifficultySettingsVersion
+from app.models.story import Story
 from app.schemas.game_result import GameResultCreate, UserDifficultyResponse
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
-def save_game_result(db: Session, game_result: GameResultCreate) -> GameResult:
-    """게임 결과 저장"""
-    try:
-        db_result = GameResult(
-            user_id=game_result.user_id,
-            game_type=game_result.game_type,
-            story_id=game_result.story_id,
-            is_correct=game_result.is_correct,
-            response_time=game_result.response_time,
-            score=game_result.score
-        )
-        db.add(db_result)
-        db.commit()
-        db.refresh(db_result)
-        
-        logger.info(f"Game result saved for user {game_result.user_id}, type: {game_result.game_type}")
-        return db_result
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Error saving game result: {e}")
-        raise
+def build_game_result(game_result: GameResultCreate) -> GameResult:
+    """게임 결과 행 생성 (save_rated_game에서 난이도 갱신과 함께 커밋)"""
+    return GameResult(
+        user_id=game_result.user_id,
+        game_type=game_result.game_type,
+        story_id=game_result.story_id,
+        is_correct=game_result.is_correct,
+        response_time=game_result.response_time,
+        score=game_result.score
+    )
 
 def get_recent_game_results(db: Session, user_id: int, game_type: str, limit: int = 10) -> List[GameResult]:
     """최근 게임 결과 조회"""
@@ -38,16 +32,19 @@ def get_recent_game_results(db: Session, user_id: int, game_type: str, limit: in
         
         return results
     except Exception as e:
-        logger.error(f"Error getting recent game results: {e}")
+        logger.error("Error getting recent game results: %s", e)
         return []
 
-def get_user_difficulty(db: Session, user_id: int) -> Optional[UserDifficulty]:
-    """사용자 난이도 정보 조회"""
+def get_user_difficulty(db: Session, user_id: int, for_update: bool = False) -> Optional[UserDifficulty]:
+    """사용자 난이도 정보 조회 (for_update면 같은 사용자의 동시 갱신을 막도록 행 잠금)"""
     try:
-        difficulty = db.query(UserDifficulty).filter(UserDifficulty.user_id == user_id).first()
+        query = db.query(UserDifficulty).filter(UserDifficulty.user_id == user_id)
+        if for_update:
+            query = query.with_for_update()
+        difficulty = query.first()
         return difficulty
     except Exception as e:
-        logger.error(f"Error getting user difficulty: {e}")
+        logger.error("Error getting user difficulty: %s", e)
         return None
 
 def create_or_update_user_difficulty(db: Session, user_id: int, game_type: str, 
@@ -77,9 +74,196 @@ def create_or_update_user_difficulty(db: Session, user_id: int, game_type: str,
         db.commit()
         db.refresh(difficulty)
         
-        logger.info(f"User difficulty updated for user {user_id}: {game_type}")
+        logger.info("User difficulty updated for user %s: %s", user_id, game_type)
         return difficulty
     except Exception as e:
         db.rollback()
-        logger.error(f"Error updating user difficulty: {e}")
-        raise 
\ No newline at end of file
+        logger.error("Error updating user difficulty: %s", e)
+        raise 
+
+def get_story_rating(db: Session, story_id: Optional[int]) -> Rating:
+    """이야기 난이도 점수 조회 (없는 이야기는 초기값)"""
+    if story_id is None:
+        return Rating()
+    row = db.query(Story.difficulty_rating, Story.rating_deviation).filter(Story.id == story_id).first()
+    if row is None:
+        return Rating()
+    return Rating(row.difficulty_rating, row.rating_deviation)
+
+def save_rated_game(db: Session, difficulty: Optional[UserDifficulty], user_id: int, game_type: str,
+                    success_rate: float, consecutive_success: int, consecutive_failure: int,
+                    user_rating: Rating, story_id: Optional[int], story_rating: Rating,
+                    story_rating_delta: float, db_result: Optional[GameResult] = None) -> UserDifficulty:
+    """
+    게임 한 건으로 갱신한 사용자 난이도와 이야기 난이도 점수를 한 트랜잭션으로 저장
+
+    db_result(build_game_result)를 넘기면 게임 결과 행도 같은 커밋에 포함되므로
+    결과만 저장되고 점수 갱신이 빠지는 경우가 없습니다.
+    이야기 점수는 여러 사용자가 동시에 갱신하므로 읽은 값을 덮어쓰지 않고 변화량만 더합니다.
+    """
+    try:
+        if db_result is not None:
+            db.add(db_result)
+        if difficulty is None:
+            difficulty = UserDifficulty(user_id=user_id)
+            db.add(difficulty)
+        difficulty.current_game_type = game_type
+        difficulty.success_rate = success_rate
+        difficulty.consecutive_success = consecutive_success
+        difficulty.consecutive_failure = consecutive_failure
+        difficulty.skill_rating = user_rating.rating
+        difficulty.rating_deviation = user_rating.deviation
+        difficulty.rated_games = user_rating.games
+
+        if story_id is not None:
+            db.query(Story).filter(Story.id == story_id).update({
+                Story.difficulty_rating: Story.difficulty_rating + story_rating_delta,
+                Story.rating_deviation: story_rating.deviation,
+            }, synchronize_session=False)
+
+        db.commit()
+        db.refresh(difficulty)
+        if db_result is not None:
+            db.refresh(db_result)
+            logger.debug("Game result saved for user %s, type: %s", user_id, game_type)
+        return difficulty
+    except Exception as e:
+        db.rollback()
+        logger.error("Error saving rated game: %s", e)
+        raise
+
+def backfill_skill_ratings(engine, batch_size: int = 50000) -> Dict[str, Any]:
+    """
+    기존 game_results를 시간순으로 한 번 읽어 실력/이야기 난이도 점수, 성공률, 연속 성공/실패를 다시 계산
+
+    - 서버 측 커서로 스트리밍하므로 메모리는 사용자/이야기 수에 비례 (게임 결과 수와 무관)
+    - 두 제출 API(/game/submit-result, /difficulty/submit-result-with-difficulty) 모두 결과 저장과 같은
+      트랜잭션에서 같은 규칙(rate_game)으로 점수를 갱신하므로, 모든 행을 같은 순서로 재생한 결과가 운영 값과 같음
+      (점수 갱신 없이 결과만 저장하던 이전 /game/submit-result 행도 이번 재생으로 점수에 반영됨)
+    - 난이도 행이 없는 사용자는 마지막으로 플레이한 게임 유형으로 새로 만듦
+    """
+    started = time.perf_counter()
+    users: Dict[int, List[Any]] = {}
+    stories: Dict[int, Rating] = {}
+    games = 0
+
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(text(
+            "SELECT user_id, game_type, story_id, is_correct, response_time FROM game_results "
+            "ORDER BY created_at, id"
+        ))
+        for user_id, game_type, story_id, is_correct, response_time in result:
+            # [실력 점수, 성공률, 연속 성공, 연속 실패, 마지막 게임 유형]
+            state = users.get(user_id)
+            if state is None:
+                state = users[user_id] = [Rating(), 0.0, 0, 0, game_type]
+            story = stories.get(story_id) or Rating()
+            user_rating, stories[story_id] = rate_game(state[0], story, game_type, bool(is_correct), response_time)
+            state[0] = user_rating
+            state[1] = update_success_rate(state[1], user_rating.games, bool(is_correct))
+            state[2], state[3] = update_streaks(state[2], state[3], bool(is_correct))
+            state[4] = game_type
+            games += 1
+
+    with engine.begin() as conn:
+        existing = {row[0] for row in conn.execute(text("SELECT user_id FROM user_difficulties"))}
+        rows = [
+            {
+                "user_id": user_id, "game_type": state[4], "success_rate": state[1],
+                "consecutive_success": state[2], "consecutive_failure": state[3],
+                "skill_rating": state[0].rating, "rating_deviation": state[0].deviation, "rated_games": state[0].games,
+            }
+            for user_id, state in users.items()
+        ]
+        updates = [row for row in rows if row["user_id"] in existing]
+        inserts = [row for row in rows if row["user_id"] not in existing]
+        for start in range(0, len(updates), batch_size):
+            conn.execute(text(
+                "UPDATE user_difficulties SET success_rate = :success_rate, "
+                "consecutive_success = :consecutive_success, consecutive_failure = :consecutive_failure, "
+                "skill_rating = :skill_rating, rating_deviation = :rating_deviation, rated_games = :rated_games "
+                "WHERE user_id = :user_id"
+            ), updates[start:start + batch_size])
+        for start in range(0, len(inserts), batch_size):
+            conn.execute(text(
+                "INSERT INTO user_difficulties (user_id, current_game_type, success_rate, consecutive_success, "
+                "consecutive_failure, skill_rating, rating_deviation, rated_games) VALUES (:user_id, :game_type, "
+                ":success_rate, :consecutive_success, :consecutive_failure, :skill_rating, :rating_deviation, :rated_games)"
+            ), inserts[start:start + batch_size])
+
+        story_rows = [
+            {"id": story_id, "difficulty_rating": rating.rating, "rating_deviation": rating.deviation}
+            for story_id, rating in stories.items() if story_id is not None
+        ]
+        for start in range(0, len(story_rows), batch_size):
+            conn.execute(text(
+                "UPDATE stories SET difficulty_rating = :difficulty_rating, rating_deviation = :rating_deviation "
+                "WHERE id = :id"
+            ), story_rows[start:start + batch_size])
+
+    return {
+        "games": games,
+        "users": len(users),
+        "created_users": len(inserts),
+        "stories": len(story_rows),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+def get_difficulty_settings_version(db: Session) -> int:
+    """난이도 설정의 현재 버전 (설정이 없으면 0, version 유일 인덱스로 조회)"""
+    return db.query(func.max(DifficultySetting.version)).scalar() or 0
+
+def next_difficulty_settings_version(db: Session) -> int:
+    """버전 카운터 행을 1 올리고 새 버전 반환 (행이 없으면 현재 최대 버전 + 1로 생성)"""
+    version = db.execute(
+        update(DifficultySettingsVersion)
+        .where(DifficultySettingsVersion.id == 1)
+        .values(version=DifficultySettingsVersion.version + 1)
+        .returning(DifficultySettingsVersion.version)
+    ).scalar()
+    if version is None:
+        version = get_difficulty_settings_version(db) + 1
+        db.add(DifficultySettingsVersion(id=1, version=version))
+        db.flush()
+    return version
+
+def list_difficulty_settings(db: Session) -> List[DifficultySetting]:
+    """모든 난이도 설정 덮어쓰기 조회"""
+    return db.query(DifficultySetting).order_by(DifficultySetting.scope, DifficultySetting.scope_key).all()
+
+def save_difficulty_setting(db: Session, scope: str, scope_key: str, profile: Optional[str],
+                            overrides: Dict[str, Any], updated_by: Optional[int] = None,
+                            retries: int = 3) -> DifficultySetting:
+    """
+    난이도 설정 덮어쓰기 저장 (같은 scope/scope_key면 교체)
+
+    새 버전은 같은 트랜잭션에서 버전 카운터 행을 올려 받으므로 커밋 순서대로 증가합니다
+    (카운터 행이 커밋까지 잠겨 있어 늦게 커밋된 저장이 더 작은 버전을 갖지 않음).
+    카운터 행이 아직 없어 동시에 만들다 충돌하면 다시 시도합니다.
+    """
+    for attempt in range(retries):
+        try:
+            version = next_difficulty_settings_version(db)
+            setting = db.query(DifficultySetting).filter(
+                DifficultySetting.scope == scope,
+                DifficultySetting.scope_key == scope_key
+            ).first()
+            if setting is None:
+                setting = DifficultySetting(scope=scope, scope_key=scope_key)
+                db.add(setting)
+            setting.profile = profile
+            setting.overrides = overrides
+            setting.version = version
+            setting.updated_by = updated_by
+            db.commit()
+            db.refresh(setting)
+            logger.info("Difficulty setting saved: scope=%s, key=%s, version=%s", scope, scope_key, version)
+            return setting
+        except IntegrityError:
+            db.rollback()
+            if attempt == retries - 1:
+                raise
+        except Exception as e:
+            db.rollback()
+            logger.error("Error saving difficulty setting: %s", e)
+            raise
@@ -0,0 +1,70 @@
+from sqlalchemy.orm import Session
+from app.models.outbox import OutboxEvent
+from app.models.story import Story
+from app.schemas.story import StoryResponse
+from datetime import datetime, timedelta
+from itertools import takewhile
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+STORY_CREATED = "story.created"
+STORY_UPDATED = "story.updated"
+STORY_DELETED = "story.deleted"
+
+def add_outbox_event(db: Session, event_type: str, aggregate_type: str, aggregate_id: int,
+                     payload: Dict[str, Any]) -> OutboxEvent:
+    """아웃박스 이벤트 추가 (호출자의 트랜잭션에서 함께 커밋)"""
+    event = OutboxEvent(
+        event_id=str(uuid.uuid4()),
+        event_type=event_type,
+        aggregate_type=aggregate_type,
+        aggregate_id=aggregate_id,
+        payload=json.dumps(payload, ensure_ascii=False, default=str)
+    )
+    db.add(event)
+    return event
+
+def add_story_event(db: Session, event_type: str, story: Story,
+                    segments: Optional[List[Dict[str, Any]]] = None) -> OutboxEvent:
+    """이야기 변경 이벤트 추가 (flush 이후 호출해야 id/타임스탬프가 채워짐)"""
+    if event_type == STORY_DELETED:
+        payload = {"story_id": story.id, "user_id": story.user_id, "image_url": story.image_url}
+    else:
+        # flush 후 만료된 서버 생성 컬럼(updated_at 등)은 속성 접근으로 다시 로드
+        payload = StoryResponse.model_validate({
+            column.key: getattr(story, column.key) for column in Story.__table__.columns
+        }).model_dump(mode="json")
+        if segments is not None:
+            payload["segments"] = segments
+    return add_outbox_event(db, event_type, "story", story.id, payload)
+
+def serialize_outbox_event(event: OutboxEvent) -> Dict[str, Any]:
+    """브로커/API로 전달할 이벤트 형식"""
+    return {
+        "event_id": event.event_id,
+        "event_type": event.event_type,
+        "aggregate_type": event.aggregate_type,
+        "aggregate_id": event.aggregate_id,
+        "sequence": event.id,
+        "occurred_at": event.created_at.isoformat() if event.created_at else None,
+        "payload": json.loads(event.payload)
+    }
+
+def get_outbox_events_after(db: Session, after_id: int = 0, limit: int = 100,
+                            safety_lag: float = 0) -> List[OutboxEvent]:
+    """
+    sequence(id) 이후의 이벤트 조회 (발행 여부와 무관, 풀 방식 소비자용)
+
+    id는 커밋이 아니라 삽입 시점에 발급되므로, 작은 id가 늦게 커밋되면 이미 지나간 커서 뒤에 나타날 수 있습니다.
+    safety_lag(초)보다 최근에 기록된 첫 이벤트에서 멈춰 그 뒤의 이벤트도 다음 조회로 미룹니다
+    (중간 이벤트만 거르면 커서가 아직 커밋되지 않은 id를 건너뜀).
+    """
+    events = db.query(OutboxEvent).filter(
+        OutboxEvent.id > after_id
+    ).order_by(OutboxEvent.id).limit(limit).all()
+    cutoff = datetime.utcnow() - timedelta(seconds=safety_lag)
+    return list(takewhile(lambda event: event.created_at <= cutoff, events))
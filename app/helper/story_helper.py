@@ -1,14 +1,86 @@
-from app.schemas.story import StoryCreate, StoryUpdate
-from app.utils.functions import validate_story_content, validate_story_title
-from app.common.response import ValidationError
+from app.schemas.story import StoryCreate, StoryUpdate, StoryResponse
+from app.utils.functions import (
+    validate_story_content, validate_story_title, encode_cursor, decode_cursor,
+    segment_difficulty_features, story_difficulty_features
+)
+from app.common.response import ValidationError, BadRequest
 from fastapi import Request
+import json
 import logging
+import random
+import time
+from itertools import groupby
+from sqlalchemy import DateTime, and_, bindparam, or_, select, text, tuple_, union_all
 from sqlalchemy.orm import Session
-from datetime import datetime
-from app.models.story import Story # Story 모델 임포트
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from app.models.story import Story, StorySegment, StoryTombstone # Story 모델 임포트
 
 logger = logging.getLogger(__name__)
 
+# StoryResponse 필드 중 stories 테이블 컬럼 (segments는 관계이므로 제외)
+STORY_RESPONSE_COLUMNS = [name for name in StoryResponse.model_fields if name in Story.__table__.columns]
+
+# 목록 조회에서 fields=로 요청할 수 있는 필드
+STORY_LIST_FIELDS = (
+    "id", "user_id", "title", "content", "excerpt", "segment_count",
+    "image_url", "image_variants", "created_at", "updated_at"
+)
+# view=summary 필드 (content 제외)
+STORY_SUMMARY_FIELDS = (
+    "id", "user_id", "title", "excerpt", "segment_count",
+    "image_url", "image_variants", "created_at", "updated_at"
+)
+
+def parse_story_fields(fields: Optional[str] = None, view: Optional[str] = None) -> Optional[List[str]]:
+    """
+    목록 조회의 fields=/view= 파라미터를 조회할 컬럼 목록으로 변환
+
+    fields가 view보다 우선하며, id는 항상 포함합니다.
+    None을 반환하면 기존과 같은 전체 응답입니다.
+    """
+    if view not in (None, "full", "summary"):
+        raise BadRequest(f"지원하지 않는 view입니다: {view} (full, summary)")
+    
+    if fields:
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in STORY_LIST_FIELDS]
+        if unknown:
+            raise BadRequest(f"지원하지 않는 필드입니다: {', '.join(unknown)}")
+        return ["id"] + [name for name in dict.fromkeys(requested) if name != "id"]
+    
+    if view == "summary":
+        return list(STORY_SUMMARY_FIELDS)
+    return None
+
+def query_story_list(db: Session, fields: Optional[List[str]] = None):
+    """목록 조회 쿼리 (fields가 있으면 해당 컬럼만 SELECT 하므로 content 등은 읽지 않음)"""
+    if fields is None:
+        return db.query(Story)
+    return db.query(*[getattr(Story, name) for name in fields])
+
+def serialize_story_list(rows, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """query_story_list 결과를 응답 dict 목록으로 변환"""
+    if fields is None:
+        return [serialize_story(story) for story in rows]
+    return [dict(zip(fields, row)) for row in rows]
+
+def serialize_story(story: Story, segments: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    ORM 행을 StoryResponse와 같은 모양의 dict로 변환 (목록 응답용)
+
+    DB에서 읽은 값이므로 행마다 pydantic 검증을 거치지 않고,
+    segments 관계는 접근하지 않아 지연 로딩 쿼리가 발생하지 않습니다.
+    """
+    # 로드된 값은 인스턴스 __dict__에서 바로 읽고, 만료된 컬럼만 속성 접근으로 다시 로드
+    loaded = story.__dict__
+    data = {
+        name: loaded[name] if name in loaded else getattr(story, name)
+        for name in STORY_RESPONSE_COLUMNS
+    }
+    data["segments"] = segments
+    return data
+
 def create_story_helper(request: Request, data):
     """이야기 생성 헬퍼"""
     try:
@@ -33,7 +105,7 @@ def create_story_helper(request: Request, data):
         return request.app.state.story_service.create_story(request.app.state.db, story_create, request.app)
         
     except Exception as e:
-        logger.error(f"Error in create_story_helper: {e}")
+        logger.error("Error in create_story_helper: %s", e)
         raise
 
 def get_stories_helper(request: Request, args):
@@ -45,7 +117,7 @@ def get_stories_helper(request: Request, args):
         return request.app.state.story_service.get_stories(request.app.state.db, skip=skip, limit=limit)
         
     except Exception as e:
-        logger.error(f"Error in get_stories_helper: {e}")
+        logger.error("Error in get_stories_helper: %s", e)
         raise
 
 def get_story_helper(request: Request, story_id):
@@ -54,7 +126,7 @@ def get_story_helper(request: Request, story_id):
         return request.app.state.story_service.get_story(request.app.state.db, story_id)
         
     except Exception as e:
-        logger.error(f"Error in get_story_helper: {e}")
+        logger.error("Error in get_story_helper: %s", e)
         raise
 
 def update_story_helper(request: Request, story_id, data):
@@ -78,7 +150,7 @@ def update_story_helper(request: Request, story_id, data):
         return request.app.state.story_service.update_story(request.app.state.db, story_id, story_update)
         
     except Exception as e:
-        logger.error(f"Error in update_story_helper: {e}")
+        logger.error("Error in update_story_helper: %s", e)
         raise
 
 def delete_story_helper(request: Request, story_id):
@@ -87,13 +159,14 @@ def delete_story_helper(request: Request, story_id):
         return request.app.state.story_service.delete_story(request.app.state.db, story_id)
         
     except Exception as e:
-        logger.error(f"Error in delete_story_helper: {e}")
+        logger.error("Error in delete_story_helper: %s", e)
         raise
 
-def get_internal_stories_helper(db: Session, skip: int = 0, limit: int = 100, updated_after: str = None):
+def get_internal_stories_helper(db: Session, skip: int = 0, limit: int = 100, updated_after: str = None,
+                                fields: Optional[List[str]] = None):
     """내부 서비스용 이야기 목록 조회 헬퍼 (updated_after 필터링 포함)"""
     try:
-        query = db.query(Story)
+        query = query_story_list(db, fields)
         if updated_after:
             updated_after_dt = datetime.fromisoformat(updated_after)
             query = query.filter(Story.updated_at >= updated_after_dt)
@@ -101,5 +174,345 @@ def get_internal_stories_helper(db: Session, skip: int = 0, limit: int = 100, up
         return query.offset(skip).limit(limit).all()
         
     except Exception as e:
-        logger.error(f"Error in get_internal_stories_helper: {e}")
-        raise
\ No newline at end of file
+        logger.error("Error in get_internal_stories_helper: %s", e)
+        raise
+
+def add_story_tombstone(db: Session, story_id: int) -> StoryTombstone:
+    """이야기 삭제 기록 추가 (호출자의 트랜잭션에서 함께 커밋)"""
+    tombstone = StoryTombstone(story_id=story_id)
+    db.add(tombstone)
+    return tombstone
+
+def _after_keyset(timestamp_column, id_column, position: Optional[Tuple[datetime, int]]):
+    """(timestamp, id) 키셋 위치 이후 조건"""
+    if position is None:
+        return None
+    timestamp, row_id = position
+    return or_(
+        timestamp_column > timestamp,
+        and_(timestamp_column == timestamp, id_column > row_id)
+    )
+
+def _before_keyset(timestamp_column, id_column, position: Optional[Tuple[datetime, int]]):
+    """(timestamp, id) 키셋 위치 이전 조건 (내림차순 페이지용)"""
+    if position is None:
+        return None
+    timestamp, row_id = position
+    return or_(
+        timestamp_column < timestamp,
+        and_(timestamp_column == timestamp, id_column < row_id)
+    )
+
+def _estimate_count(db: Session, query) -> Tuple[int, bool]:
+    """
+    쿼리 결과 행 수 (행 수, 추정치 여부)
+
+    PostgreSQL은 EXPLAIN의 플래너 추정치를 사용해 실제로 행을 세지 않고,
+    그 외 DB는 정확한 COUNT를 사용합니다.
+    """
+    query = query.order_by(None)
+    if db.get_bind().dialect.name == "postgresql":
+        compiled = query.statement.compile(
+            dialect=db.get_bind().dialect, compile_kwargs={"render_postcompile": True}
+        )
+        plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"]), True
+    return query.count(), False
+
+def get_story_page_helper(db: Session, user_ids: List[int], cursor: Optional[str] = None, limit: int = 100,
+                          fields: Optional[List[str]] = None,
+                          include_total: bool = False) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    사용자들의 이야기를 최신순((created_at, id) 내림차순) 키셋 페이지로 조회
+
+    OFFSET 없이 커서 위치부터 인덱스(user_id, created_at, id)를 읽으므로 깊은 페이지도 첫 페이지와 비용이 같습니다.
+    cursor가 잘못되면 ValueError를 던집니다.
+    """
+    position = decode_cursor(cursor)
+    
+    # 커서 생성을 위해 created_at은 항상 조회하고, 요청하지 않았으면 응답에서 제외
+    select_fields = fields
+    if fields is not None and "created_at" not in fields:
+        select_fields = fields + ["created_at"]
+    
+    base_query = query_story_list(db, select_fields).filter(Story.user_id.in_(user_ids))
+    query = base_query
+    condition = _before_keyset(Story.created_at, Story.id, position)
+    if condition is not None:
+        query = query.filter(condition)
+    rows = query.order_by(Story.created_at.desc(), Story.id.desc()).limit(limit + 1).all()
+    
+    has_more = len(rows) > limit
+    records = serialize_story_list(rows[:limit], select_fields)
+    next_cursor = None
+    if has_more and records:
+        last = records[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+    if select_fields is not fields:
+        for record in records:
+            del record["created_at"]
+    
+    meta = {"next_cursor": next_cursor, "has_more": has_more}
+    if include_total:
+        meta["total"], meta["total_is_estimate"] = _estimate_count(db, base_query)
+    return records, meta
+
+def _get_segments_by_story(db: Session, story_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """여러 이야기의 세그먼트를 한 번의 쿼리로 조회하여 이야기별로 묶음"""
+    segments_by_story = {story_id: [] for story_id in story_ids}
+    if not story_ids:
+        return segments_by_story
+    
+    segments = db.query(StorySegment).filter(
+        StorySegment.story_id.in_(story_ids)
+    ).order_by(StorySegment.story_id, StorySegment.order).all()
+    
+    for segment in segments:
+        segments_by_story[segment.story_id].append({
+            "id": segment.id,
+            "order": segment.order,
+            "segment_text": segment.segment_text
+        })
+    return segments_by_story
+
+def get_story_changes_helper(db: Session, cursor: Optional[str] = None, limit: int = 100,
+                             include_segments: bool = False,
+                             safety_lag: float = 0) -> Tuple[List[Dict[str, Any]], Optional[str], bool]:
+    """
+    (updated_at, id) 순서의 이야기 변경 피드 한 페이지 조회
+    
+    수정/생성된 이야기는 upsert, 삭제된 이야기는 delete(tombstone) 레코드로 반환합니다.
+    각 레코드의 cursor로 해당 레코드 이후부터 이어서 조회할 수 있습니다.
+    
+    updated_at은 커밋이 아니라 flush 시점에 기록되므로, 먼저 시작해 늦게 커밋한 트랜잭션의 행이
+    이미 지나간 커서 뒤에 나타날 수 있습니다. safety_lag(초)보다 최근에 기록된 행은 다음 조회로 미뤄
+    그 사이에 커밋된 행을 건너뛰지 않습니다.
+    
+    Returns:
+        (변경 레코드 목록, 다음 커서, 추가 데이터 존재 여부)
+    """
+    try:
+        position = decode_cursor(cursor)
+    except ValueError as e:
+        raise BadRequest(str(e))
+    
+    cutoff = datetime.utcnow() - timedelta(seconds=safety_lag)
+    story_query = db.query(Story).filter(Story.updated_at <= cutoff)
+    story_condition = _after_keyset(Story.updated_at, Story.id, position)
+    if story_condition is not None:
+        story_query = story_query.filter(story_condition)
+    stories = story_query.order_by(Story.updated_at, Story.id).limit(limit + 1).all()
+    
+    tombstone_query = db.query(StoryTombstone).filter(StoryTombstone.deleted_at <= cutoff)
+    tombstone_condition = _after_keyset(StoryTombstone.deleted_at, StoryTombstone.story_id, position)
+    if tombstone_condition is not None:
+        tombstone_query = tombstone_query.filter(tombstone_condition)
+    tombstones = tombstone_query.order_by(StoryTombstone.deleted_at, StoryTombstone.story_id).limit(limit + 1).all()
+    
+    # 두 키셋 결과를 (timestamp, id) 순으로 병합
+    merged = [(story.updated_at, story.id, story) for story in stories]
+    merged.extend((tombstone.deleted_at, tombstone.story_id, tombstone) for tombstone in tombstones)
+    merged.sort(key=lambda item: (item[0], item[1]))
+    has_more = len(merged) > limit
+    page = merged[:limit]
+    
+    segments_by_story = {}
+    if include_segments:
+        story_ids = [row_id for _, row_id, row in page if isinstance(row, Story)]
+        segments_by_story = _get_segments_by_story(db, story_ids)
+    
+    changes = []
+    for timestamp, row_id, row in page:
+        change_cursor = encode_cursor(timestamp, row_id)
+        if isinstance(row, Story):
+            story_data = serialize_story(row, segments_by_story.get(row_id, []) if include_segments else None)
+            changes.append({"op": "upsert", "story": story_data, "cursor": change_cursor})
+        else:
+            changes.append({
+                "op": "delete",
+                "story_id": row_id,
+                "deleted_at": timestamp.isoformat(),
+                "cursor": change_cursor
+            })
+    
+    next_cursor = changes[-1]["cursor"] if changes else cursor
+    return changes, next_cursor, has_more
+
+def iter_story_records(db: Session, query, fields: Optional[List[str]] = None, batch_size: int = 500,
+                       include_segments: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    목록 쿼리 결과를 서버 측 커서로 batch_size행씩 읽으며 응답 dict를 하나씩 반환
+
+    PostgreSQL은 stream_results로 이름 있는 커서를 사용하므로 전체 결과를 한 번에 가져오지 않고,
+    세그먼트는 배치마다 한 번의 쿼리로 조회합니다. 메모리 사용량은 결과 크기와 무관하게 배치 크기로 제한됩니다.
+    """
+    statement = query.statement.execution_options(stream_results=True, yield_per=batch_size)
+    result = db.execute(statement)
+    if fields is None:
+        result = result.scalars()
+    
+    for partition in result.partitions():
+        records = serialize_story_list(partition, fields)
+        if include_segments:
+            segments_by_story = _get_segments_by_story(db, [record["id"] for record in records])
+            for record in records:
+                record["segments"] = segments_by_story.get(record["id"], [])
+        # 세션의 identity map은 약한 참조이므로 dict로 변환한 배치의 ORM 객체는 바로 해제됨
+        yield from records
+
+def get_export_headers(name: str, gzip: bool = False) -> Dict[str, str]:
+    """내보내기 파일 다운로드 헤더 (stories-20240101T090000.ndjson[.gz])"""
+    filename = f"{name}-{datetime.utcnow():%Y%m%dT%H%M%S}.ndjson" + (".gz" if gzip else "")
+    return {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+def iter_story_changes(db: Session, cursor: Optional[str] = None, page_size: int = 500,
+                       include_segments: bool = False, safety_lag: float = 0) -> Iterator[Dict[str, Any]]:
+    """커서부터 끝까지 변경 피드를 페이지 단위로 순회 (전체 재동기화용, 메모리 사용량 일정)"""
+    while True:
+        changes, cursor, has_more = get_story_changes_helper(
+            db, cursor=cursor, limit=page_size, include_segments=include_segments, safety_lag=safety_lag
+        )
+        yield from changes
+        if not has_more:
+            break
+        # 이미 전달한 페이지의 ORM 객체가 세션에 쌓이지 않도록 정리
+        db.expunge_all()
+
+def _seek_by_score(db: Session, scopes, score_column, key_column, score: float, ascending: bool,
+                   key: Optional[float] = None):
+    """
+    범위(scopes)마다 score 이상(또는 미만)에서 가장 가까운 행 하나를 인덱스 탐색으로 찾아 한 쿼리로 합침
+
+    scopes는 (id, 난이도, rand_key) 컬럼을 고르는 select 목록이며, 각각 (범위 컬럼, difficulty_score, rand_key)
+    인덱스를 탐색합니다. key를 주면 (score, key) 위치 이상(또는 미만)에서 찾습니다.
+    """
+    if key is None:
+        condition = score_column >= score if ascending else score_column < score
+    else:
+        position = tuple_(score_column, key_column)
+        condition = position >= (score, key) if ascending else position < (score, key)
+    if ascending:
+        order = (score_column.asc(), key_column.asc())
+    else:
+        order = (score_column.desc(), key_column.desc())
+    statements = [scope.where(condition).order_by(*order).limit(1).subquery() for scope in scopes]
+    selects = [select(subquery.c[0], subquery.c[1], subquery.c[2]) for subquery in statements]
+    rows = db.execute(selects[0] if len(selects) == 1 else union_all(*selects)).all()
+    if not rows:
+        return None
+    sort_key = lambda row: (row[1], row[2])
+    return min(rows, key=sort_key) if ascending else max(rows, key=sort_key)
+
+def _seek_in_ties(db: Session, scopes, score_column, key_column, row, ascending: bool):
+    """
+    row와 같은 점수의 행들 중 무작위 rand_key 위치에서 가장 가까운 행 (없으면 row로 순환)
+
+    동점 행이 많아도 항상 같은 행(rand_key가 가장 작은/큰 행)만 고르지 않도록 한 번 더 탐색합니다.
+    """
+    picked = _seek_by_score(db, scopes, score_column, key_column, row[1], ascending, key=random.random())
+    if picked is not None and picked[1] == row[1]:
+        return picked
+    return row
+
+def _pick_by_score(db: Session, scopes, score_column, key_column, low: float, high: float):
+    """
+    난이도 구간 [low, high]에서 무작위 점수 하나를 골라 가장 가까운 행을 선택 (전체 조회 없이 O(log n) 탐색)
+
+    구간 안에 행이 없으면 전체 구간(0~1)에서 같은 방식으로 고릅니다.
+    같은 점수의 행들 사이에서는 rand_key로 균등하게 고르며,
+    서로 다른 점수 사이의 선택 확률은 점수 간격에 비례하는 근사 균등입니다.
+    """
+    score = random.uniform(low, high)
+    above = _seek_by_score(db, scopes, score_column, key_column, score, ascending=True)
+    if above is not None and above[1] <= high:
+        return _seek_in_ties(db, scopes, score_column, key_column, above, ascending=True)
+    below = _seek_by_score(db, scopes, score_column, key_column, score, ascending=False)
+    if below is not None and below[1] >= low:
+        return _seek_in_ties(db, scopes, score_column, key_column, below, ascending=False)
+    if above is None and below is None:
+        return None
+
+    score = random.random()
+    above = _seek_by_score(db, scopes, score_column, key_column, score, ascending=True)
+    if above is not None:
+        return _seek_in_ties(db, scopes, score_column, key_column, above, ascending=True)
+    below = _seek_by_score(db, scopes, score_column, key_column, score, ascending=False)
+    return _seek_in_ties(db, scopes, score_column, key_column, below, ascending=False)
+
+def pick_story_for_level(db: Session, user_ids: List[int], low: float, high: float) -> Optional[Tuple[int, float, float]]:
+    """사용자들의 이야기 중 난이도 구간에 맞는 이야기 (id, difficulty_score, rand_key), 세그먼트가 없는 이야기는 제외"""
+    scopes = [
+        select(Story.id, Story.difficulty_score, Story.rand_key).where(Story.user_id == user_id, Story.segment_count > 0)
+        for user_id in dict.fromkeys(user_ids)
+    ]
+    if not scopes:
+        return None
+    return _pick_by_score(db, scopes, Story.difficulty_score, Story.rand_key, low, high)
+
+def pick_segment_for_level(db: Session, story_id: int, low: float, high: float) -> Optional[StorySegment]:
+    """이야기 안에서 난이도 구간에 맞는 세그먼트"""
+    scope = select(StorySegment.id, StorySegment.difficulty_score, StorySegment.rand_key).where(
+        StorySegment.story_id == story_id
+    )
+    picked = _pick_by_score(db, [scope], StorySegment.difficulty_score, StorySegment.rand_key, low, high)
+    if picked is None:
+        return None
+    return db.query(StorySegment).filter(StorySegment.id == picked[0]).first()
+
+def backfill_story_difficulty(engine, batch_size: int = 1000) -> Dict[str, Any]:
+    """
+    난이도 특징이 없는 이야기(char_length = 0)와 세그먼트의 특징/난이도 점수 계산
+
+    이야기 ID 순으로 batch_size개씩 나눠 처리하고 배치마다 커밋하므로 중간에 멈춰도 다시 실행하면 이어서 진행합니다.
+    """
+    started = time.perf_counter()
+    stories = 0
+    segments = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            story_ids = [row[0] for row in conn.execute(text(
+                "SELECT id FROM stories WHERE char_length = 0 AND id > :last_id ORDER BY id LIMIT :limit"
+            ), {"last_id": last_id, "limit": batch_size})]
+            if not story_ids:
+                break
+            last_id = story_ids[-1]
+
+            rows = conn.execute(
+                select(StorySegment.story_id, StorySegment.id, StorySegment.segment_text)
+                .where(StorySegment.story_id.in_(story_ids))
+                .order_by(StorySegment.story_id, StorySegment.order)
+            ).all()
+            story_updates = []
+            segment_updates = []
+            texts_by_story = {story_id: [] for story_id in story_ids}
+            for story_id, group in groupby(rows, key=lambda row: row[0]):
+                for _, segment_id, segment_text in group:
+                    features = segment_difficulty_features(segment_text)
+                    segment_updates.append({"id": segment_id, **{
+                        key: features[key] for key in ("word_count", "char_length", "difficulty_score")
+                    }})
+                    texts_by_story[story_id].append(segment_text)
+            for story_id, texts in texts_by_story.items():
+                features = story_difficulty_features(texts)
+                # 세그먼트가 없는 이야기도 다시 처리하지 않도록 char_length를 최소 1로 기록
+                features["char_length"] = max(1, features["char_length"])
+                # 세그먼트 특징이 바뀌었으므로 변경 피드에 다시 전달되도록 updated_at 갱신
+                story_updates.append({"id": story_id, "updated_at": datetime.utcnow(), **features})
+
+            if segment_updates:
+                conn.execute(text(
+                    "UPDATE story_segments SET word_count = :word_count, char_length = :char_length, "
+                    "difficulty_score = :difficulty_score WHERE id = :id"
+                ), segment_updates)
+            conn.execute(text(
+                "UPDATE stories SET segment_count = :segment_count, char_length = :char_length, "
+                "avg_segment_words = :avg_segment_words, rare_word_ratio = :rare_word_ratio, "
+                "difficulty_score = :difficulty_score, updated_at = :updated_at WHERE id = :id"
+            ).bindparams(bindparam("updated_at", type_=DateTime)), story_updates)
+            stories += len(story_updates)
+            segments += len(segment_updates)
+
+    return {"stories": stories, "segments": segments, "seconds": round(time.perf_counter() - started, 2)}
@@ -1,4 +1,9 @@
+import re
 from app.lab.mock_base import DynamicMock
+from app.utils.functions import make_excerpt
+
+# 마침표/물음표/느낌표로 끝나는 문장 (마지막 문장은 부호가 없어도 포함)
+SENTENCE_PATTERN = re.compile(r"[^.!?]+[.!?]*")
 
 class MockStoryService(DynamicMock):
     def __init__(self):
@@ -44,4 +49,12 @@ class MockOpenAIService(DynamicMock):
         super().__init__("MockOpenAIService")
         self._method_responses = {
             'split_story': ['This is a mock story content.']
-        } 
\ No newline at end of file
+        }
+
+    def split_story_into_segments(self, content: str):
+        """OpenAI 호출 없이 문장 부호 기준으로 분리 (랩 DB에 실제 세그먼트가 저장되도록)"""
+        sentences = [sentence.strip() for sentence in SENTENCE_PATTERN.findall(content) if sentence.strip()]
+        return sentences or [content.strip()]
+
+    def generate_story_summary(self, content: str) -> str:
+        return make_excerpt(content) or "" 
\ No newline at end of file
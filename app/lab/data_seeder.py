@@ -0,0 +1,381 @@
+import csv
+import io
+import json
+import math
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import text
+from app.helper.game_helper import backfill_skill_ratings
+from app.utils.functions import make_excerpt, segment_difficulty_features, story_difficulty_features
+
+GAME_TYPES = ("SENTENCE_SEQUENCE", "WORD_SEQUENCE")
+# 시간대별 게임 비중 (0~23시, 오전/오후 활동 위주, 새벽은 거의 없음)
+HOUR_WEIGHTS = (
+    0.2, 0.1, 0.05, 0.05, 0.1, 0.4, 1.2, 2.5, 4.0, 5.5, 6.0, 5.0,
+    3.5, 3.8, 5.0, 5.5, 5.0, 4.0, 3.0, 3.2, 3.0, 2.0, 1.0, 0.5,
+)
+# 시드 데이터가 쓰는 테이블 (초기화 순서 = 외래키 역순)
+SEEDED_TABLES = ("game_results", "user_difficulties", "story_segments", "stories")
+
+# 한국어 문장 조각 (시간 + 장소 + 주어 + 서술)
+TIMES = (
+    "어릴 적", "그해 여름", "추석 무렵", "장날이면", "겨울 방학에", "결혼하던 해에", "첫아이를 낳던 해",
+    "군대에 있을 때", "비가 많이 오던 날", "설날 아침에", "중학교에 다니던 시절", "눈이 펑펑 오던 밤",
+)
+PLACES = (
+    "고향 마을에서", "시장 골목에서", "학교 운동장에서", "바닷가에서", "논두렁에서", "외갓집 마당에서",
+    "읍내 극장 앞에서", "기차역 대합실에서", "뒷산 중턱에서", "동네 우물가에서", "부엌 아궁이 앞에서",
+)
+SUBJECTS = (
+    "어머니는", "아버지는", "우리 형은", "옆집 할머니는", "나는", "동생과 나는", "친구들은",
+    "할아버지께서는", "막내 이모는", "담임 선생님은", "우리 식구는", "동네 어른들은",
+)
+ACTIONS = (
+    "감을 따서 처마 밑에 매달았다", "국수를 삶아 주셨다", "연을 날리며 하루를 보냈다",
+    "고구마를 구워 나누어 먹었다", "밤늦도록 이야기를 나누었다", "사진을 한 장 찍어 두었다",
+    "손을 꼭 잡고 걸었다", "노래를 부르며 빨래를 하셨다", "자전거 타는 법을 가르쳐 주셨다",
+    "편지를 써서 부쳤다", "김장을 하느라 온종일 바빴다", "소를 몰고 집으로 돌아왔다",
+    "처음으로 바다를 보았다", "눈사람을 만들며 웃었다", "떡을 빚어 이웃과 나누었다",
+)
+TITLE_TOPICS = (
+    "감나무", "장날", "첫 월급", "외갓집", "기차 여행", "운동회", "김장", "결혼식", "고향 바다", "눈 오는 밤",
+)
+FAMILY_NAMES = ("김", "이", "박", "최", "정", "강", "조", "윤", "장", "임")
+GIVEN_NAMES = ("영숙", "순자", "정희", "영수", "철수", "말순", "옥자", "상철", "미경", "진호", "지은", "민준")
+
+def make_sentence(rng: random.Random) -> str:
+    return f"{rng.choice(TIMES)} {rng.choice(PLACES)} {rng.choice(SUBJECTS)} {rng.choice(ACTIONS)}."
+
+def make_story_text(rng: random.Random, min_sentences: int = 3, max_sentences: int = 12) -> Tuple[str, List[str]]:
+    """이야기 본문과 문장(세그먼트) 목록"""
+    sentences = [make_sentence(rng) for _ in range(rng.randint(min_sentences, max_sentences))]
+    return " ".join(sentences), sentences
+
+def correct_probability(skill: float, progress: float, is_word: bool) -> float:
+    """실력(0~1), 기간 중 진행도(0~1, 학습 효과), 게임 난이도(단어 > 문장)로 정한 정답 확률"""
+    return 0.25 + 0.65 * skill + 0.1 * progress - (0.15 if is_word else 0.0)
+
+def median_response_seconds(skill: float, is_word: bool) -> float:
+    """응답 시간 중앙값 (실력이 낮을수록, 단어 순서 게임일수록 길어짐)"""
+    return (6.0 + 24.0 * (1.0 - skill)) * (1.4 if is_word else 1.0)
+
+def _format_datetime(value: datetime) -> str:
+    # SQLite(SQLAlchemy 저장 형식, 마이크로초까지)와 PostgreSQL 모두 읽을 수 있는 형식
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+class LabDataSeeder:
+    """
+    랩 환경용 합성 데이터 생성기
+
+    - 사용자/보호자 그래프 (랩 User Service 대역이 읽는 JSON 파일)
+    - 한국어 문장으로 된 이야기와 세그먼트
+    - 시간대/실력 분포를 반영한 게임 결과와 사용자 난이도
+
+    PostgreSQL은 COPY, 그 외 DB는 DBAPI executemany로 배치 삽입하며,
+    행을 제너레이터로 만들어 배치 단위로 보내므로 수천만 행도 메모리를 일정하게 유지합니다.
+    """
+
+    def __init__(self, engine, seed: int = 42, batch_size: int = 50000):
+        self.engine = engine
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.is_postgresql = engine.dialect.name == "postgresql"
+
+    # ------------------------------------------------------------------
+    # 사용자 그래프
+    # ------------------------------------------------------------------
+
+    def build_user_graph(self, users: int, senior_ratio: float = 0.6, max_guardians: int = 3,
+                         first_user_id: int = 1) -> Dict[str, Dict[str, Any]]:
+        """
+        사용자 N명과 시니어-보호자 관계 생성
+
+        각 사용자에게 실력(skill, 0~1)과 활동량(activity, 파레토 분포)을 부여해 게임 결과 생성에 사용합니다.
+        """
+        rng = self.rng
+        user_ids = list(range(first_user_id, first_user_id + users))
+        senior_count = max(1, int(users * senior_ratio))
+        seniors = user_ids[:senior_count]
+        guardians = user_ids[senior_count:]
+
+        graph = {}
+        for user_id in user_ids:
+            graph[str(user_id)] = {
+                "role": "senior" if user_id < first_user_id + senior_count else "guardian",
+                "name": f"{rng.choice(FAMILY_NAMES)}{rng.choice(GIVEN_NAMES)}",
+                "guardians": [],
+                "skill": round(rng.betavariate(4, 3), 3),
+                "activity": round(min(rng.paretovariate(1.5), 50.0), 3),
+            }
+        if guardians:
+            for senior_id in seniors:
+                count = min(len(guardians), max_guardians, rng.choice((0, 1, 1, 2, 2, 3)))
+                graph[str(senior_id)]["guardians"] = rng.sample(guardians, count)
+        return graph
+
+    def write_user_graph(self, graph: Dict[str, Dict[str, Any]], path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"generated_at": datetime.now().isoformat(), "users": graph}, f, ensure_ascii=False)
+
+    # ------------------------------------------------------------------
+    # 테이블 준비
+    # ------------------------------------------------------------------
+
+    def reset_tables(self):
+        """시드 대상 테이블 비우기"""
+        with self.engine.begin() as conn:
+            if self.is_postgresql:
+                conn.execute(text(f"TRUNCATE {', '.join(SEEDED_TABLES)} RESTART IDENTITY CASCADE"))
+            else:
+                for table_name in SEEDED_TABLES:
+                    conn.execute(text(f"DELETE FROM {table_name}"))
+
+    def _next_id(self, table_name: str) -> int:
+        with self.engine.connect() as conn:
+            return (conn.execute(text(f"SELECT COALESCE(MAX(id), 0) FROM {table_name}")).scalar() or 0) + 1
+
+    def _sync_sequence(self, table_name: str):
+        """명시적 ID로 넣은 뒤 PostgreSQL 시퀀스를 최대값에 맞춤"""
+        if not self.is_postgresql:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), "
+                f"(SELECT COALESCE(MAX(id), 1) FROM {table_name}))"
+            ))
+
+    # ------------------------------------------------------------------
+    # 배치 삽입
+    # ------------------------------------------------------------------
+
+    def _batches(self, rows: Iterable[Sequence[Any]]) -> Iterator[List[Sequence[Any]]]:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def bulk_insert(self, table_name: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+        """행 이터러블을 배치로 삽입 (PostgreSQL: COPY, 그 외: executemany), 삽입한 행 수 반환"""
+        # order 같은 예약어 컬럼이 있으므로 컬럼명은 항상 따옴표로 감쌈
+        quoted_columns = ", ".join(f'"{column}"' for column in columns)
+        connection = self.engine.raw_connection()
+        inserted = 0
+        try:
+            cursor = connection.cursor()
+            if self.is_postgresql:
+                copy_sql = f"COPY {table_name} ({quoted_columns}) FROM STDIN WITH (FORMAT csv)"
+                for batch in self._batches(rows):
+                    buffer = io.StringIO()
+                    csv.writer(buffer).writerows(batch)
+                    buffer.seek(0)
+                    cursor.copy_expert(copy_sql, buffer)
+                    inserted += len(batch)
+            else:
+                placeholder = "?" if self.engine.dialect.paramstyle == "qmark" else "%s"
+                insert_sql = (
+                    f"INSERT INTO {table_name} ({quoted_columns}) "
+                    f"VALUES ({', '.join([placeholder] * len(columns))})"
+                )
+                for batch in self._batches(rows):
+                    cursor.executemany(insert_sql, batch)
+                    inserted += len(batch)
+            connection.commit()
+            cursor.close()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+        return inserted
+
+    # ------------------------------------------------------------------
+    # 이야기
+    # ------------------------------------------------------------------
+
+    def seed_stories(self, graph: Dict[str, Dict[str, Any]], stories: int, days: int) -> Dict[int, List[int]]:
+        """
+        이야기 M개와 세그먼트 생성, 사용자별 이야기 ID 목록 반환
+
+        이야기 작성자는 활동량에 비례해 고르므로 소수의 사용자가 많은 이야기를 가집니다.
+        """
+        rng = self.rng
+        user_ids = [int(user_id) for user_id in graph]
+        weights = [graph[str(user_id)]["activity"] for user_id in user_ids]
+        owners = rng.choices(user_ids, weights=weights, k=stories)
+        first_story_id = self._next_id("stories")
+        segment_id = self._next_id("story_segments")
+        now = datetime.utcnow()
+        story_ids_by_user: Dict[int, List[int]] = {}
+
+        # 세그먼트가 이야기를 참조하므로 배치마다 이야기를 먼저 커밋한 뒤 세그먼트 삽입
+        for chunk_start in range(0, stories, self.batch_size):
+            story_rows = []
+            segment_rows = []
+            for offset in range(chunk_start, min(chunk_start + self.batch_size, stories)):
+                owner_id = owners[offset]
+                story_id = first_story_id + offset
+                content, sentences = make_story_text(rng)
+                created_at = _format_datetime(now - timedelta(seconds=rng.randint(0, days * 86400)))
+                story_ids_by_user.setdefault(owner_id, []).append(story_id)
+                features = story_difficulty_features(sentences)
+                story_rows.append((
+                    story_id, owner_id, f"{rng.choice(TIMES)} {rng.choice(TITLE_TOPICS)}", content,
+                    len(sentences), make_excerpt(content), features["char_length"], features["avg_segment_words"],
+                    features["rare_word_ratio"], features["difficulty_score"], rng.random(), created_at, created_at
+                ))
+                for order, sentence in enumerate(sentences, start=1):
+                    segment_features = segment_difficulty_features(sentence)
+                    segment_rows.append((
+                        segment_id, story_id, order, sentence, segment_features["word_count"],
+                        segment_features["char_length"], segment_features["difficulty_score"], rng.random()
+                    ))
+                    segment_id += 1
+            self.bulk_insert(
+                "stories",
+                ("id", "user_id", "title", "content", "segment_count", "excerpt", "char_length", "avg_segment_words",
+                 "rare_word_ratio", "difficulty_score", "rand_key", "created_at", "updated_at"),
+                story_rows
+            )
+            self.bulk_insert(
+                "story_segments",
+                ("id", "story_id", "order", "segment_text", "word_count", "char_length", "difficulty_score",
+                 "rand_key"),
+                segment_rows
+            )
+
+        self._sync_sequence("stories")
+        self._sync_sequence("story_segments")
+        return story_ids_by_user
+
+    # ------------------------------------------------------------------
+    # 게임 결과
+    # ------------------------------------------------------------------
+
+    def _visible_story_ids(self, graph, story_ids_by_user) -> Dict[int, List[int]]:
+        """사용자가 게임에 쓸 수 있는 이야기 (시니어: 자신 + 보호자, 보호자: 자신)"""
+        visible = {}
+        for user_id, user in graph.items():
+            ids = list(story_ids_by_user.get(int(user_id), []))
+            if user["role"] == "senior":
+                for guardian_id in user["guardians"]:
+                    ids.extend(story_ids_by_user.get(guardian_id, []))
+            visible[int(user_id)] = ids
+        return visible
+
+    def seed_game_results(self, graph: Dict[str, Dict[str, Any]], story_ids_by_user: Dict[int, List[int]],
+                          game_results: int, days: int) -> int:
+        """
+        게임 결과 생성
+
+        - 게임하는 사람은 시니어만, 활동량(파레토 분포)에 비례해 결과 수가 나뉨
+        - 정답 확률은 실력, 게임 난이도(단어 > 문장), 기간 중 학습 효과로 결정
+        - 응답 시간은 로그정규 분포 (실력이 낮을수록, 단어 순서 게임일수록 길어짐)
+        - 시각은 HOUR_WEIGHTS 시간대 분포를 따름
+        """
+        rng = self.rng
+        seniors = [int(user_id) for user_id, user in graph.items() if user["role"] == "senior"]
+        if not seniors:
+            return 0
+        visible = self._visible_story_ids(graph, story_ids_by_user)
+        all_story_ids = [story_id for ids in story_ids_by_user.values() for story_id in ids]
+        if not all_story_ids:
+            raise ValueError("게임 결과를 만들 이야기가 없습니다. 이야기를 먼저 생성하세요.")
+
+        weights = [graph[str(user_id)]["activity"] for user_id in seniors]
+        start = time.time() - days * 86400
+        hours = list(range(24))
+
+        def result_rows():
+            remaining = game_results
+            while remaining > 0:
+                chunk = min(remaining, self.batch_size)
+                remaining -= chunk
+                players = rng.choices(seniors, weights=weights, k=chunk)
+                day_offsets = [rng.random() * days for _ in range(chunk)]
+                result_hours = rng.choices(hours, weights=HOUR_WEIGHTS, k=chunk)
+                for user_id, day_offset, hour in zip(players, day_offsets, result_hours):
+                    skill = graph[str(user_id)]["skill"]
+                    progress = day_offset / days
+                    # 실력이 높을수록 어려운 단어 순서 게임 비중이 큼
+                    is_word = rng.random() < 0.15 + 0.6 * skill * (0.5 + 0.5 * progress)
+                    is_correct = rng.random() < correct_probability(skill, progress, is_word)
+                    median_seconds = median_response_seconds(skill, is_word)
+                    response_time = round(rng.lognormvariate(math.log(median_seconds), 0.45), 2)
+                    timestamp = start + int(day_offset) * 86400 + hour * 3600 + rng.randint(0, 3599)
+                    candidates = visible.get(user_id) or all_story_ids
+                    yield (
+                        user_id, GAME_TYPES[1] if is_word else GAME_TYPES[0], rng.choice(candidates),
+                        is_correct, response_time, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+                    )
+
+        return self.bulk_insert(
+            "game_results",
+            ("user_id", "game_type", "story_id", "is_correct", "response_time", "created_at"),
+            result_rows()
+        )
+
+    def seed_user_difficulties(self, graph: Dict[str, Dict[str, Any]]) -> int:
+        """
+        시니어별 현재 난이도 (실력에서 기대 정답률을 계산해 단계 결정)
+
+        게임 결과가 없는 시니어도 행을 갖도록 만드는 근사치이며,
+        게임 결과가 있는 시니어는 seed()의 마지막 단계(backfill_skill_ratings)가 실제 기록으로 덮어씁니다.
+        """
+        now = _format_datetime(datetime.now())
+
+        def difficulty_rows():
+            for user_id, user in graph.items():
+                if user["role"] != "senior":
+                    continue
+                success_rate = round(min(0.99, 0.25 + 0.65 * user["skill"]), 3)
+                game_type = GAME_TYPES[1] if success_rate >= 0.7 else GAME_TYPES[0]
+                yield (int(user_id), game_type, success_rate, 0, 0, now)
+
+        with self.engine.begin() as conn:
+            conn.execute(text("DELETE FROM user_difficulties"))
+        return self.bulk_insert(
+            "user_difficulties",
+            ("user_id", "current_game_type", "success_rate", "consecutive_success", "consecutive_failure", "last_updated"),
+            difficulty_rows()
+        )
+
+    # ------------------------------------------------------------------
+
+    def seed(self, users: int, stories: int, game_results: int, days: int = 180,
+             graph_path: Optional[str] = None, reset: bool = False) -> Dict[str, Any]:
+        """전체 데이터 생성, 단계별 행 수와 소요 시간 반환"""
+        summary = {}
+        if reset:
+            self.reset_tables()
+
+        started = time.perf_counter()
+        graph = self.build_user_graph(users)
+        if graph_path:
+            self.write_user_graph(graph, graph_path)
+        summary["users"] = {"rows": len(graph), "seconds": round(time.perf_counter() - started, 2)}
+
+        started = time.perf_counter()
+        story_ids_by_user = self.seed_stories(graph, stories, days)
+        summary["stories"] = {"rows": stories, "seconds": round(time.perf_counter() - started, 2)}
+
+        started = time.perf_counter()
+        inserted = self.seed_game_results(graph, story_ids_by_user, game_results, days)
+        summary["game_results"] = {"rows": inserted, "seconds": round(time.perf_counter() - started, 2)}
+
+        started = time.perf_counter()
+        inserted = self.seed_user_difficulties(graph)
+        summary["user_difficulties"] = {"rows": inserted, "seconds": round(time.perf_counter() - started, 2)}
+
+        # 생성한 게임 결과를 재생해 실력/이야기 난이도 점수와 연속 성공/실패 채우기
+        backfill = backfill_skill_ratings(self.engine, self.batch_size)
+        summary["skill_ratings"] = {"rows": backfill["games"], "seconds": backfill["seconds"]}
+        return summary
@@ -0,0 +1,297 @@
+import csv
+import math
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import text
+from app.core.difficulty_rules import (
+    EASY_GAME_TYPE, HARD_GAME_TYPE, RECENT_WINDOW, GameOutcome, Rating, calculate_stats, next_game_type,
+    next_game_type_by_rating, rate_game
+)
+from app.lab.data_seeder import correct_probability, median_response_seconds
+
+# 난이도 변경 후 이 게임 수 안에 반대로 되돌아가면 진동(oscillation)으로 봄
+DEFAULT_OSCILLATION_WINDOW = 10
+# rating: 실력 점수 + 히스테리시스 (운영), window: 최근 10게임 기록 기준 (이전 방식, 비교용)
+POLICIES = ("rating", "window")
+
+class WindowPolicy:
+    """게임 유형별 최근 결과 창으로 판단 (이전 방식)"""
+
+    __slots__ = ("histories", "min_games")
+
+    def __init__(self, thresholds: Dict[str, Any]):
+        self.histories = {EASY_GAME_TYPE: deque(maxlen=RECENT_WINDOW), HARD_GAME_TYPE: deque(maxlen=RECENT_WINDOW)}
+        self.min_games = thresholds['MIN_GAMES_FOR_ANALYSIS']
+
+    def play(self, game_type: str, story_id: Any, outcome: GameOutcome, thresholds: Dict[str, Any],
+             current_game_type: str) -> Tuple[bool, str]:
+        self.histories[game_type].appendleft(outcome)
+        stats = calculate_stats(self.histories[current_game_type])
+        return stats.games >= self.min_games, next_game_type(current_game_type, stats, thresholds)
+
+class RatingPolicy:
+    """사용자 실력 점수와 이야기 난이도 점수를 게임마다 갱신하고 히스테리시스로 판단 (운영 방식)"""
+
+    __slots__ = ("user", "stories", "min_games")
+
+    def __init__(self, thresholds: Dict[str, Any], stories: Dict[Any, Rating]):
+        self.user = Rating()
+        self.stories = stories
+        self.min_games = thresholds['MIN_GAMES_FOR_ANALYSIS']
+
+    def play(self, game_type: str, story_id: Any, outcome: GameOutcome, thresholds: Dict[str, Any],
+             current_game_type: str) -> Tuple[bool, str]:
+        self.user, self.stories[story_id] = rate_game(
+            self.user, self.stories.get(story_id) or Rating(), game_type, outcome.is_correct, outcome.response_time
+        )
+        return self.user.games >= self.min_games, next_game_type_by_rating(current_game_type, self.user, thresholds)
+
+def _make_policy(policy: str, thresholds: Dict[str, Any], stories: Dict[Any, Rating]):
+    if policy == "window":
+        return WindowPolicy(thresholds)
+    if policy == "rating":
+        return RatingPolicy(thresholds, stories)
+    raise ValueError(f"알 수 없는 정책: {policy}")
+
+class PlayerTrack:
+    """한 사용자의 추천 난이도 변화 기록 (게임마다 정책이 낸 추천 유형을 받음)"""
+
+    __slots__ = ("level", "started_easy", "games", "decisions", "level_ups", "level_downs",
+                 "oscillations", "first_level_up", "last_change", "hard_games", "oscillation_window")
+
+    def __init__(self, level: str, oscillation_window: int):
+        self.level = level
+        self.started_easy = level == EASY_GAME_TYPE
+        self.games = 0
+        self.decisions = 0
+        self.level_ups = 0
+        self.level_downs = 0
+        self.oscillations = 0
+        self.first_level_up: Optional[int] = None
+        self.last_change: Optional[int] = None
+        self.hard_games = 0
+        self.oscillation_window = oscillation_window
+
+    def record(self, played_type: str, analyzed: bool, recommended: str):
+        self.games += 1
+        if played_type == HARD_GAME_TYPE:
+            self.hard_games += 1
+        if analyzed:
+            self.decisions += 1
+        if recommended == self.level:
+            return
+        if recommended == HARD_GAME_TYPE:
+            self.level_ups += 1
+            if self.first_level_up is None:
+                self.first_level_up = self.games
+        else:
+            self.level_downs += 1
+        if self.last_change is not None and self.games - self.last_change <= self.oscillation_window:
+            self.oscillations += 1
+        self.last_change = self.games
+        self.level = recommended
+
+class SimulationMetrics:
+    """사용자별 기록을 합친 정책 지표"""
+
+    def __init__(self):
+        self.players = 0
+        self.games = 0
+        self.decisions = 0
+        self.level_ups = 0
+        self.level_downs = 0
+        self.oscillations = 0
+        self.hard_games = 0
+        self.easy_starters = 0
+        self.time_to_level_up: List[int] = []
+        self.elapsed = 0.0
+
+    def add(self, track: PlayerTrack):
+        self.players += 1
+        self.games += track.games
+        self.decisions += track.decisions
+        self.level_ups += track.level_ups
+        self.level_downs += track.level_downs
+        self.oscillations += track.oscillations
+        self.hard_games += track.hard_games
+        if track.started_easy:
+            self.easy_starters += 1
+            if track.first_level_up is not None:
+                self.time_to_level_up.append(track.first_level_up)
+
+    def merge(self, other: "SimulationMetrics"):
+        self.players += other.players
+        self.games += other.games
+        self.decisions += other.decisions
+        self.level_ups += other.level_ups
+        self.level_downs += other.level_downs
+        self.oscillations += other.oscillations
+        self.hard_games += other.hard_games
+        self.easy_starters += other.easy_starters
+        self.time_to_level_up.extend(other.time_to_level_up)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        주요 지표
+
+        - oscillation_rate: 난이도 변경 중 oscillation_window 게임 안에 되돌아간 비율
+        - changes_per_100_games: 100게임당 난이도 변경 횟수
+        - time_to_level_up: 쉬운 단계에서 시작한 사용자가 처음 상승하기까지의 게임 수 (p50/p90)
+        - never_leveled_up: 쉬운 단계에서 시작해 끝까지 상승하지 못한 사용자 비율
+        - decisions_per_second: 시뮬레이션을 포함한 초당 난이도 판단 수
+        """
+        changes = self.level_ups + self.level_downs
+        waits = sorted(self.time_to_level_up)
+        return {
+            "players": self.players,
+            "games": self.games,
+            "decisions": self.decisions,
+            "level_ups": self.level_ups,
+            "level_downs": self.level_downs,
+            "oscillation_rate": round(self.oscillations / changes, 4) if changes else 0.0,
+            "changes_per_100_games": round(changes * 100 / self.games, 3) if self.games else 0.0,
+            "hard_game_share": round(self.hard_games / self.games, 4) if self.games else 0.0,
+            "time_to_level_up_p50": _percentile(waits, 0.5),
+            "time_to_level_up_p90": _percentile(waits, 0.9),
+            "never_leveled_up": round(1 - len(waits) / self.easy_starters, 4) if self.easy_starters else 0.0,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "decisions_per_second": round(self.decisions / self.elapsed) if self.elapsed else 0,
+        }
+
+def _percentile(sorted_values: Sequence[int], ratio: float) -> Optional[int]:
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * ratio))]
+
+def simulate_player(skill: float, games: int, thresholds: Dict[str, Any], rng: random.Random,
+                    oscillation_window: int = DEFAULT_OSCILLATION_WINDOW, policy: str = "rating",
+                    stories: Optional[Dict[Any, Rating]] = None, story_count: int = 500) -> PlayerTrack:
+    """
+    합성 사용자 한 명이 정책이 추천한 게임을 games번 플레이
+
+    정답 확률/응답 시간은 랩 시드 데이터와 같은 모델(실력, 난이도, 학습 효과)을 사용합니다.
+    stories(이야기 난이도 점수)는 같은 프로세스의 사용자끼리 공유합니다.
+    """
+    state = _make_policy(policy, thresholds, stories if stories is not None else {})
+    track = PlayerTrack(EASY_GAME_TYPE, oscillation_window)
+    log_medians = {
+        EASY_GAME_TYPE: math.log(median_response_seconds(skill, False)),
+        HARD_GAME_TYPE: math.log(median_response_seconds(skill, True)),
+    }
+    game_type = EASY_GAME_TYPE
+    for index in range(games):
+        is_word = game_type == HARD_GAME_TYPE
+        outcome = GameOutcome(
+            rng.random() < correct_probability(skill, index / games, is_word),
+            rng.lognormvariate(log_medians[game_type], 0.45)
+        )
+        analyzed, recommended = state.play(game_type, rng.randrange(story_count), outcome, thresholds, game_type)
+        track.record(game_type, analyzed, recommended)
+        game_type = recommended
+    return track
+
+def _simulate_chunk(skills: Sequence[float], games_per_player: int, thresholds: Dict[str, Any],
+                    seed: int, oscillation_window: int, policy: str, story_count: int) -> SimulationMetrics:
+    rng = random.Random(seed)
+    metrics = SimulationMetrics()
+    stories: Dict[Any, Rating] = {}
+    for skill in skills:
+        metrics.add(simulate_player(skill, games_per_player, thresholds, rng, oscillation_window,
+                                    policy, stories, story_count))
+    return metrics
+
+def simulate_synthetic(players: int, games_per_player: int, thresholds: Dict[str, Any], seed: int = 42,
+                       workers: int = 1, oscillation_window: int = DEFAULT_OSCILLATION_WINDOW,
+                       policy: str = "rating", story_count: int = 500) -> SimulationMetrics:
+    """
+    합성 사용자 players명 x games_per_player게임 시뮬레이션
+
+    실력은 시드 데이터와 같이 beta(4, 3) 분포이고, 사용자끼리는 독립이므로 workers개 프로세스로 나눠 실행합니다.
+    같은 seed/workers면 같은 결과가 나옵니다.
+    """
+    rng = random.Random(seed)
+    skills = [rng.betavariate(4, 3) for _ in range(players)]
+    workers = max(1, min(workers, players))
+    chunk_size = math.ceil(players / workers)
+    chunks = [skills[start:start + chunk_size] for start in range(0, players, chunk_size)]
+
+    started = time.perf_counter()
+    metrics = SimulationMetrics()
+    if workers == 1:
+        metrics.merge(_simulate_chunk(skills, games_per_player, thresholds, seed, oscillation_window, policy, story_count))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_simulate_chunk, chunk, games_per_player, thresholds, seed + index,
+                                oscillation_window, policy, story_count)
+                for index, chunk in enumerate(chunks)
+            ]
+            for future in futures:
+                metrics.merge(future.result())
+    metrics.elapsed = time.perf_counter() - started
+    return metrics
+
+def replay_histories(histories: Iterable[Tuple[Any, Iterable[Tuple[str, Any, GameOutcome]]]], thresholds: Dict[str, Any],
+                     oscillation_window: int = DEFAULT_OSCILLATION_WINDOW, policy: str = "rating") -> SimulationMetrics:
+    """
+    실제(내보낸) 게임 기록을 사용자별 시간순으로 재생하며 정책이 냈을 추천을 평가
+
+    기록된 게임 유형은 바꿀 수 없으므로 결과는 플레이한 유형으로 반영하고,
+    판단은 정책이 직전에 추천한 유형을 현재 유형으로 보고 내린 추천의 변화를 지표로 봅니다.
+    histories는 (user_id, [(game_type, story_id, GameOutcome), ...]) 형태입니다.
+    """
+    started = time.perf_counter()
+    metrics = SimulationMetrics()
+    stories: Dict[Any, Rating] = {}
+    for _, records in histories:
+        state = _make_policy(policy, thresholds, stories)
+        track = None
+        for game_type, story_id, outcome in records:
+            if game_type not in (EASY_GAME_TYPE, HARD_GAME_TYPE):
+                continue
+            if track is None:
+                track = PlayerTrack(game_type, oscillation_window)
+            analyzed, recommended = state.play(game_type, story_id, outcome, thresholds, track.level)
+            track.record(game_type, analyzed, recommended)
+        if track is not None:
+            metrics.add(track)
+    metrics.elapsed = time.perf_counter() - started
+    return metrics
+
+def _parse_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "t", "true", "y", "yes")
+    return bool(value)
+
+def _group_rows(rows: Iterable[Sequence[Any]]) -> Iterator[Tuple[Any, Iterator[Tuple[str, Any, GameOutcome]]]]:
+    """(user_id, game_type, story_id, is_correct, response_time) 행을 사용자별로 묶음 (user_id 순으로 정렬돼 있어야 함)"""
+    for user_id, group in groupby(rows, key=lambda row: row[0]):
+        yield user_id, ((row[1], row[2], GameOutcome(_parse_bool(row[3]), float(row[4]))) for row in group)
+
+def load_csv_histories(path: str) -> Iterator[Tuple[Any, Iterator[Tuple[str, Any, GameOutcome]]]]:
+    """
+    내보낸 CSV(user_id, game_type, story_id, is_correct, response_time, created_at 헤더) 읽기
+
+    행 순서와 상관없이 사용자/시각 순으로 정렬한 뒤 재생합니다. story_id가 없으면 모든 게임을 한 이야기로 봅니다.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        rows = [
+            (row["user_id"], row["game_type"], row.get("story_id") or "0", row["is_correct"], row["response_time"],
+             row.get("created_at") or "")
+            for row in csv.DictReader(f)
+        ]
+    rows.sort(key=lambda row: (row[0], row[5]))
+    return _group_rows(rows)
+
+def load_database_histories(engine, batch_size: int = 50000) -> Iterator[Tuple[Any, Iterator[Tuple[str, Any, GameOutcome]]]]:
+    """game_results 테이블을 사용자/시각 순으로 스트리밍 (서버 측 커서, 메모리는 배치 크기만큼)"""
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(text(
+            "SELECT user_id, game_type, story_id, is_correct, response_time FROM game_results "
+            "ORDER BY user_id, created_at, id"
+        ))
+        yield from _group_rows(result)
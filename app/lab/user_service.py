@@ -0,0 +1,39 @@
+import json
+import os
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, HTTPException, Request
+
+# 랩 환경용 User Service 대역 (seed_lab_data.py가 만든 사용자/보호자 그래프 파일 제공)
+router = APIRouter()
+
+_graph_cache: Dict[str, Any] = {"path": None, "mtime": None, "users": {}}
+
+def load_user_graph(path: str) -> Dict[str, Dict[str, Any]]:
+    """사용자 그래프 파일 로드 (파일이 바뀌면 다시 읽음, 없으면 빈 그래프)"""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+    if _graph_cache["path"] != path or _graph_cache["mtime"] != mtime:
+        with open(path, "r", encoding="utf-8") as f:
+            _graph_cache["users"] = json.load(f)["users"]
+        _graph_cache["path"] = path
+        _graph_cache["mtime"] = mtime
+    return _graph_cache["users"]
+
+def _get_user(request: Request, user_id: int) -> Optional[Dict[str, Any]]:
+    return load_user_graph(request.app.state.config.LAB_USER_GRAPH_PATH).get(str(user_id))
+
+@router.get("/users/{user_id}")
+async def get_user(request: Request, user_id: int):
+    user = _get_user(request, user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+    return {"id": user_id, "role": user["role"], "name": user["name"]}
+
+@router.get("/users/{user_id}/guardians")
+async def get_guardians(request: Request, user_id: int):
+    user = _get_user(request, user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+    return [{"id": guardian_id} for guardian_id in user.get("guardians", [])]
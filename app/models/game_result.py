@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, ForeignKey, func
+from sqlalchemy import JSON, Column, Integer, String, Boolean, Float, DateTime, ForeignKey, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -25,4 +25,37 @@ class UserDifficulty(Base):
     success_rate = Column(Float, default=0.0)
     consecutive_success = Column(Integer, default=0)
     consecutive_failure = Column(Integer, default=0)
-    last_updated = Column(DateTime, server_default=func.now(), onupdate=func.now()) 
\ No newline at end of file
+    # 실력 점수 (게임 결과마다 O(1) 갱신, app/core/difficulty_rules.py)
+    skill_rating = Column(Float, nullable=False, default=1500.0, server_default="1500")
+    rating_deviation = Column(Float, nullable=False, default=350.0, server_default="350")
+    rated_games = Column(Integer, nullable=False, default=0, server_default="0")
+    last_updated = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class DifficultySetting(Base):
+    """난이도 설정 덮어쓰기 (전체/프로필/사용자별), 변경할 때마다 전체에서 유일한 version 증가"""
+    __tablename__ = "difficulty_settings"
+
+    id = Column(Integer, primary_key=True, index=True)
+    scope = Column(String(20), nullable=False)  # 'global', 'profile', 'user'
+    scope_key = Column(String(50), nullable=False, default='')  # 프로필 이름 또는 사용자 ID (global은 빈 문자열)
+    profile = Column(String(50), nullable=True)  # global/user: 적용할 프로필 (SENIOR_DIFFICULTY_PROFILES 이름)
+    overrides = Column(JSON, nullable=True)  # DIFFICULTY_THRESHOLDS 키 → 값
+    # 작업자들이 MAX(version)만 읽어 변경 여부를 확인 (difficulty_settings_version 행에서 받으므로 커밋 순서와 같음)
+    version = Column(Integer, nullable=False, unique=True)
+    updated_by = Column(Integer, nullable=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("scope", "scope_key", name="uq_difficulty_settings_scope"),
+    )
+
+class DifficultySettingsVersion(Base):
+    """
+    난이도 설정 버전 카운터 (행 하나)
+
+    저장 트랜잭션이 이 행을 UPDATE로 올리면서 잠그므로, 다음 저장은 앞선 저장이 커밋된 뒤에 더 큰 버전을 받습니다.
+    """
+    __tablename__ = "difficulty_settings_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, func, Index
+from app.database import Base
+
+class OutboxEvent(Base):
+    """트랜잭션 아웃박스 이벤트 (도메인 변경과 같은 트랜잭션에서 기록 후 릴레이가 발행)"""
+    __tablename__ = "outbox_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(String(36), nullable=False, unique=True)  # 소비자 중복 제거용 UUID
+    event_type = Column(String(100), nullable=False)  # 'story.created', 'story.updated', 'story.deleted'
+    aggregate_type = Column(String(50), nullable=False)
+    aggregate_id = Column(Integer, nullable=False)
+    payload = Column(Text, nullable=False)  # JSON 문자열
+    # 풀 API 안전 지연 비교용으로 앱 시각(UTC)으로 기록 (server_default는 직접 SQL 삽입용)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now(), nullable=False)
+    published_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_outbox_events_published_at_id", "published_at", "id"),
+    )
@@ -1,5 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, func, ForeignKey
-from sqlalchemy.orm import relationship
+import random
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, func, ForeignKey, Index, JSON, event
+from sqlalchemy.orm import Session, relationship
 from app.database import Base
 # from app.models.user import User  # 실제 User 모델 import 필요 (user-service와 통합 시)
 
@@ -11,11 +13,36 @@ class Story(Base):
     title = Column(String(255), nullable=False)
     content = Column(Text, nullable=False)
     image_url = Column(String(512), nullable=True)
-    created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    image_variants = Column(JSON, nullable=True)  # 파생 이미지 URL (썸네일, 태블릿 크기)
+    # 목록 요약 보기용 (content를 읽지 않도록 저장 시 미리 계산)
+    segment_count = Column(Integer, nullable=False, default=0, server_default="0")
+    excerpt = Column(String(100), nullable=True)
+    # 퍼즐 난이도 특징 (세그먼트 저장 시 계산, app/utils/functions.py story_difficulty_features)
+    char_length = Column(Integer, nullable=False, default=0, server_default="0")
+    avg_segment_words = Column(Float, nullable=False, default=0.0, server_default="0")
+    rare_word_ratio = Column(Float, nullable=False, default=0.0, server_default="0")
+    difficulty_score = Column(Float, nullable=False, default=0.0, server_default="0")
+    # 같은 난이도 점수끼리 무작위로 고르기 위한 키 (0~1, 저장 시 한 번 정함)
+    rand_key = Column(Float, nullable=False, default=random.random, server_default="0")
+    # 이야기 난이도 점수 (게임 결과마다 사용자 실력 점수와 함께 갱신)
+    difficulty_rating = Column(Float, nullable=False, default=1500.0, server_default="1500")
+    rating_deviation = Column(Float, nullable=False, default=350.0, server_default="350")
+    # 키셋 비교가 인덱스를 그대로 쓰도록 시각은 앱에서 UTC 마이크로초까지 기록
+    # (SQLite의 CURRENT_TIMESTAMP는 초 단위 문자열이라 파이썬 값과 문자열 비교가 어긋남, server_default는 직접 SQL 삽입용)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=func.now(), onupdate=datetime.utcnow)
     segments = relationship("StorySegment", back_populates="story", cascade="all, delete-orphan")
     # user = relationship("User")  # 실제 User 모델과 연결 (user-service와 통합 시)
 
+    __table_args__ = (
+        # 변경 피드 키셋 페이지네이션용 (updated_at, id) 인덱스
+        Index("ix_stories_updated_at_id", "updated_at", "id"),
+        # 사용자별 목록 최신순 키셋 페이지네이션용 (user_id, created_at, id) 인덱스
+        Index("ix_stories_user_id_created_at_id", "user_id", "created_at", "id"),
+        # 사용자 수준에 맞는 이야기 선택용 (user_id, difficulty_score, rand_key) 인덱스 (rand_key는 동점 무작위 선택용)
+        Index("ix_stories_user_id_difficulty_score_rand_key", "user_id", "difficulty_score", "rand_key"),
+    )
+
 class StorySegment(Base):
     __tablename__ = "story_segments"
 
@@ -23,5 +50,48 @@ class StorySegment(Base):
     story_id = Column(Integer, ForeignKey("stories.id", ondelete="CASCADE"), nullable=False)
     order = Column(Integer, nullable=False)
     segment_text = Column(Text, nullable=False)
+    # 퍼즐 난이도 특징 (저장 시 계산, app/utils/functions.py segment_difficulty_features)
+    word_count = Column(Integer, nullable=False, default=0, server_default="0")
+    char_length = Column(Integer, nullable=False, default=0, server_default="0")
+    difficulty_score = Column(Float, nullable=False, default=0.0, server_default="0")
+    rand_key = Column(Float, nullable=False, default=random.random, server_default="0")
+
+    story = relationship("Story", back_populates="segments")
+
+    __table_args__ = (
+        # 이야기 안에서 사용자 수준에 맞는 세그먼트 선택용 (story_id, difficulty_score, rand_key) 인덱스
+        Index("ix_story_segments_story_id_difficulty_score_rand_key", "story_id", "difficulty_score", "rand_key"),
+    )
+
+class StoryTombstone(Base):
+    """삭제된 이야기 기록 (변경 피드에서 삭제 이벤트로 전달)"""
+    __tablename__ = "story_tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    story_id = Column(Integer, nullable=False, index=True)
+    deleted_at = Column(DateTime, default=datetime.utcnow, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_story_tombstones_deleted_at_story_id", "deleted_at", "story_id"),
+    )
 
-    story = relationship("Story", back_populates="segments") 
\ No newline at end of file
+@event.listens_for(Session, "before_flush")
+def _touch_story_on_segment_change(session, flush_context, instances):
+    """세그먼트가 추가/수정/삭제되면 소속 이야기의 updated_at도 갱신 (변경 피드에 세그먼트 변경이 전달되도록)"""
+    story_ids = {
+        segment.story_id for segment in session.dirty
+        if isinstance(segment, StorySegment) and session.is_modified(segment)
+    }
+    story_ids.update(
+        segment.story_id for segment in (*session.new, *session.deleted) if isinstance(segment, StorySegment)
+    )
+    story_ids.discard(None)
+    if not story_ids:
+        return
+    now = datetime.utcnow()
+    with session.no_autoflush:
+        for story_id in story_ids:
+            story = session.get(Story, story_id)
+            # 같은 flush에서 새로 만든 이야기는 default로 기록되므로 제외
+            if story is not None and story not in session.new and story not in session.deleted:
+                story.updated_at = now
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 
 class StoryBase(BaseModel):
@@ -32,9 +32,12 @@ class StorySegmentResponse(StorySegmentBase):
 class StoryResponse(StoryBase):
     id: int
     user_id: int
+    image_variants: Optional[Dict[str, Any]] = None
+    segment_count: Optional[int] = None
+    excerpt: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
     segments: Optional[List] = None
 
     class Config:
-        orm_mode = True 
\ No newline at end of file
+        from_attributes = True 
\ No newline at end of file
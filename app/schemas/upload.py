@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class PresignedUploadRequest(BaseModel):
+    filename: str
+    content_type: str
+    method: str = 'post'  # 'post' 또는 'put'
+    size: Optional[int] = None  # PUT 방식에서는 필수 (서명에 포함)
+
+class UploadCompleteRequest(BaseModel):
+    key: str
+    story_id: Optional[int] = None  # 지정 시 업로드한 이미지를 이야기에 연결
@@ -1,4 +1,7 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+import base64
+import json
 
 def validate_story_content(content: str) -> bool:
     """
@@ -37,4 +40,132 @@ def validate_story_title(title: str) -> bool:
     if len(title.strip()) > 255:
         return False
     
-    return True 
\ No newline at end of file
+    return True
+
+# 목록 요약 보기에 사용하는 본문 앞부분 길이
+EXCERPT_LENGTH = 100
+
+def make_excerpt(content: Optional[str]) -> Optional[str]:
+    """
+    목록 요약 보기용 본문 발췌를 만듭니다.
+    
+    migrate_schema.py의 백필(SUBSTR)과 같은 결과가 되도록 앞부분을 그대로 자릅니다.
+    
+    Args:
+        content: 이야기 내용
+        
+    Returns:
+        Optional[str]: 앞 EXCERPT_LENGTH자
+    """
+    if content is None:
+        return None
+    return content[:EXCERPT_LENGTH]
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """
+    키셋 페이지네이션 위치 (timestamp, id)를 불투명한 커서 문자열로 인코딩합니다.
+    
+    Args:
+        timestamp: 마지막으로 전달한 행의 정렬 기준 시각
+        row_id: 마지막으로 전달한 행의 ID
+        
+    Returns:
+        str: URL-safe base64 커서
+    """
+    payload = json.dumps({"t": timestamp.isoformat(), "i": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """
+    encode_cursor로 만든 커서를 (timestamp, id)로 복원합니다.
+    
+    Args:
+        cursor: 커서 문자열 (없으면 처음부터)
+        
+    Returns:
+        Optional[Tuple[datetime, int]]: 커서 위치, 커서가 없으면 None
+        
+    Raises:
+        ValueError: 커서 형식이 올바르지 않은 경우
+    """
+    if not cursor:
+        return None
+    
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["t"]), int(payload["i"])
+    except Exception as e:
+        raise ValueError(f"잘못된 커서입니다: {cursor}") from e
+
+# 퍼즐 난이도 특징 기준 (이 값 이상이면 해당 항목은 가장 어려운 것으로 봄)
+DIFFICULTY_MAX_SEGMENTS = 12
+DIFFICULTY_MAX_WORDS = 12
+DIFFICULTY_MAX_STORY_CHARS = 600
+DIFFICULTY_MAX_SEGMENT_CHARS = 60
+# 이 글자 수 이상인 단어를 드문(어려운) 단어로 봄
+RARE_WORD_LENGTH = 5
+
+def _ratio(value: float, maximum: float) -> float:
+    return min(1.0, value / maximum) if maximum else 0.0
+
+def _words(text: str) -> List[str]:
+    return [word.strip(".,!?\"'()") for word in text.split() if word.strip(".,!?\"'()")]
+
+def segment_difficulty_features(segment_text: str) -> Dict[str, Any]:
+    """
+    세그먼트(단어 순서 맞추기 문제 하나)의 난이도 특징을 계산합니다.
+    
+    Args:
+        segment_text: 세그먼트 문장
+        
+    Returns:
+        Dict[str, Any]: word_count, char_length, rare_word_ratio, difficulty_score(0~1, 클수록 어려움)
+    """
+    words = _words(segment_text)
+    word_count = len(words)
+    char_length = len(segment_text)
+    rare_word_ratio = sum(1 for word in words if len(word) >= RARE_WORD_LENGTH) / word_count if word_count else 0.0
+    difficulty_score = (
+        0.6 * _ratio(word_count, DIFFICULTY_MAX_WORDS)
+        + 0.2 * _ratio(char_length, DIFFICULTY_MAX_SEGMENT_CHARS)
+        + 0.2 * rare_word_ratio
+    )
+    return {
+        "word_count": word_count,
+        "char_length": char_length,
+        "rare_word_ratio": round(rare_word_ratio, 4),
+        "difficulty_score": round(difficulty_score, 4),
+    }
+
+def story_difficulty_features(segment_texts: List[str]) -> Dict[str, Any]:
+    """
+    이야기(문장 순서 맞추기 문제 하나)의 난이도 특징을 세그먼트 목록으로 계산합니다.
+    
+    migrate_schema.py의 백필과 랩 시드 데이터도 같은 함수를 사용합니다.
+    
+    Args:
+        segment_texts: 순서대로 나열한 세그먼트 문장
+        
+    Returns:
+        Dict[str, Any]: segment_count, avg_segment_words, char_length, rare_word_ratio,
+            difficulty_score(0~1, 클수록 어려움)
+    """
+    words = [word for text in segment_texts for word in _words(text)]
+    segment_count = len(segment_texts)
+    avg_segment_words = len(words) / segment_count if segment_count else 0.0
+    char_length = sum(len(text) for text in segment_texts)
+    rare_word_ratio = sum(1 for word in words if len(word) >= RARE_WORD_LENGTH) / len(words) if words else 0.0
+    difficulty_score = (
+        0.4 * _ratio(segment_count, DIFFICULTY_MAX_SEGMENTS)
+        + 0.2 * _ratio(avg_segment_words, DIFFICULTY_MAX_WORDS)
+        + 0.2 * _ratio(char_length, DIFFICULTY_MAX_STORY_CHARS)
+        + 0.2 * rare_word_ratio
+    )
+    return {
+        "segment_count": segment_count,
+        "avg_segment_words": round(avg_segment_words, 4),
+        "char_length": char_length,
+        "rare_word_ratio": round(rare_word_ratio, 4),
+        "difficulty_score": round(difficulty_score, 4),
+    }
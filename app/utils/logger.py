@@ -1,67 +1,220 @@
+import atexit
+import copy
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, WatchedFileHandler
+from typing import Dict, Optional
+from app.utils.metrics import LOG_RECORDS_DROPPED
+from app.utils.request_context import get_request_context
+
+# LogRecord 기본 속성 (이외의 속성은 extra로 넘긴 값이므로 JSON에 그대로 기록)
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+class JsonFormatter(logging.Formatter):
+    """한 줄에 JSON 객체 하나 (시간, 레벨, 로거, 메시지, 요청 ID, extra 필드, 예외)"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class RateLimitFilter(logging.Filter):
+    """
+    로거별 초당 기록 수 제한 (토큰 버킷, WARNING 이상은 항상 통과)
+
+    - rate: 로거마다 초당 허용 기록 수 (0 이하면 제한 없음), 순간적으로는 burst개까지 허용
+    - overrides: {"로거 이름 접두사": 초당 기록 수} (가장 긴 접두사 우선)
+    - 버려진 기록 수는 다음으로 통과하는 기록의 suppressed 필드에 남김
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, overrides: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.overrides = dict(overrides or {})
+        self._limits: Dict[str, tuple] = {}
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def _limit_for(self, name: str) -> tuple:
+        limit = self._limits.get(name)
+        if limit is None:
+            prefixes = [prefix for prefix in self.overrides if name == prefix or name.startswith(prefix + ".")]
+            rate = self.overrides[max(prefixes, key=len)] if prefixes else self.rate
+            burst = self.burst if self.burst and not prefixes else max(rate * 2, 1)
+            limit = self._limits[name] = (rate, burst)
+        return limit
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate, burst = self._limit_for(record.name)
+        if rate <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(record.name)
+            if bucket is None:
+                bucket = self._buckets[record.name] = [burst, now, 0]
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                bucket[2] += 1
+                LOG_RECORDS_DROPPED.labels("rate_limited").inc()
+                return False
+            bucket[0] = tokens - 1
+            if bucket[2]:
+                record.suppressed = bucket[2]
+                bucket[2] = 0
+        return True
+
+def parse_rate_limits(value: Optional[str]) -> Dict[str, float]:
+    """'app.api.game_result=10,httpx=0' 형식의 로거별 제한 파싱"""
+    limits = {}
+    for item in (value or "").split(","):
+        if "=" in item:
+            name, rate = item.split("=", 1)
+            limits[name.strip()] = float(rate)
+    return limits
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    호출 스레드(이벤트 루프)에서는 메시지를 만들어 큐에 넣기만 하고, 포맷/파일 출력은 리스너 스레드에서 처리
+
+    큐가 가득 차면 기다리지 않고 버림 (log_records_dropped_total{reason="queue_full"})
+    """
+
+    def prepare(self, record):
+        # 인자는 호출 시점의 값으로 고정해야 하므로 메시지만 여기서 만듦 (레벨/제한으로 걸러진 기록은 여기까지 오지 않음)
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        context = get_request_context()
+        if context is not None and context.request_id:
+            record.request_id = context.request_id
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.labels("queue_full").inc()
 
 class Logger:
+    _listener: Optional[QueueListener] = None
+    _queue_handler: Optional[NonBlockingQueueHandler] = None
+
     @staticmethod
     def init_app(app):
+        config = app.state.config
+        log_path = config.LOG_PATH
+        log_level = config.LOG_LEVEL
+        formatter = JsonFormatter() if config.LOG_JSON else logging.Formatter(config.LOG_FORMAT)
+
+        # 콘솔 핸들러 설정
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        console_handler.setLevel(log_level)
+        handlers = [console_handler]
+
         try:
-            # 로그 디렉토리 생성
-            log_path = app.state.config.LOG_PATH
-            os.makedirs(log_path, exist_ok=True)
-            
-            # 로그 레벨 설정
-            log_level = app.state.config.LOG_LEVEL
-            
-            # 로그 포맷 설정
-            log_format = app.state.config.LOG_FORMAT
-            formatter = logging.Formatter(log_format)
-            
-            # 파일 핸들러 설정
-            file_handler = RotatingFileHandler(
-                os.path.join(log_path, 'story-api.log'),
-                maxBytes=10485760,  # 10MB
-                backupCount=10
-            )
-            file_handler.setFormatter(formatter)
-            file_handler.setLevel(log_level)
-            
-            # 콘솔 핸들러 설정
-            console_handler = logging.StreamHandler()
-            console_handler.setFormatter(formatter)
-            console_handler.setLevel(log_level)
-            
-            # 루트 로거 설정
-            root_logger = logging.getLogger()
-            root_logger.setLevel(log_level)
-            
-            # 기존 핸들러 제거 (중복 방지)
-            for handler in root_logger.handlers[:]:
-                root_logger.removeHandler(handler)
-            
-            root_logger.addHandler(file_handler)
-            root_logger.addHandler(console_handler)
-            
-            logging.info(f"Logger initialized for {app.state.config.PHASE} environment")
-            
+            if config.LOG_FILE_ROTATION != 'none':
+                # 로그 디렉토리 생성
+                os.makedirs(log_path, exist_ok=True)
+
+                # 파일 핸들러 설정
+                log_file = os.path.join(log_path, 'story-api.log')
+                if config.LOG_FILE_ROTATION == 'external':
+                    # 여러 프로세스가 같은 파일에 추가만 하고, 외부(logrotate)에서 옮기면 각자 다시 열기
+                    file_handler = WatchedFileHandler(log_file)
+                else:
+                    file_handler = RotatingFileHandler(
+                        log_file,
+                        maxBytes=10485760,  # 10MB
+                        backupCount=10
+                    )
+                file_handler.setFormatter(formatter)
+                file_handler.setLevel(log_level)
+                handlers.insert(0, file_handler)
         except PermissionError:
             print(f"Warning: Permission denied creating log directory: {log_path}")
             print("Logging to console only")
-            # 콘솔 로깅만 설정
-            console_handler = logging.StreamHandler()
-            console_handler.setLevel(logging.INFO)
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            console_handler.setFormatter(formatter)
-            
-            root_logger = logging.getLogger()
-            root_logger.setLevel(logging.INFO)
-            root_logger.addHandler(console_handler)
-            
-        except Exception as e:
-            print(f"Error initializing logger: {e}")
-            print("Using basic console logging")
-            # 기본 콘솔 로깅 설정
-            logging.basicConfig(
-                level=logging.INFO,
-                format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            ) 
\ No newline at end of file
+        except OSError as e:
+            print(f"Error initializing file logging: {e}")
+            print("Logging to console only")
+
+        def rate_limit():
+            return RateLimitFilter(config.LOG_RATE_LIMIT, config.LOG_RATE_BURST, parse_rate_limits(config.LOG_RATE_LIMITS))
+
+        # 루트 로거 설정
+        root_logger = logging.getLogger()
+        root_logger.setLevel(log_level)
+
+        # 기존 핸들러 제거 (중복 방지, 앱을 다시 만들면 이전 리스너도 정리)
+        Logger.stop()
+        for handler in root_logger.handlers[:]:
+            root_logger.removeHandler(handler)
+
+        if config.LOG_QUEUE_ENABLED:
+            # 요청 경로에서는 큐에 넣기만 하고 파일/콘솔 출력은 리스너 스레드가 처리
+            queue_handler = NonBlockingQueueHandler(queue.Queue(config.LOG_QUEUE_SIZE))
+            queue_handler.addFilter(rate_limit())
+            Logger._queue_handler = queue_handler
+            Logger._listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+            Logger._listener.start()
+            root_logger.addHandler(queue_handler)
+        else:
+            for handler in handlers:
+                handler.addFilter(rate_limit())
+                root_logger.addHandler(handler)
+
+        logging.info("Logger initialized for %s environment (queue=%s, json=%s, file_rotation=%s)",
+                     config.PHASE, config.LOG_QUEUE_ENABLED, config.LOG_JSON, config.LOG_FILE_ROTATION)
+
+    @staticmethod
+    def after_fork():
+        """포크한 워커 프로세스에서 리스너 스레드를 새 큐로 다시 시작 (스레드는 포크 시 복사되지 않음)"""
+        listener = Logger._listener
+        if listener is None:
+            return
+        maxsize = Logger._queue_handler.queue.maxsize
+        Logger._queue_handler.queue = queue.Queue(maxsize)
+        Logger._listener = QueueListener(
+            Logger._queue_handler.queue, *listener.handlers, respect_handler_level=True
+        )
+        Logger._listener.start()
+
+    @staticmethod
+    def stop():
+        """남은 기록을 모두 출력하고 리스너 중지"""
+        listener, Logger._listener = Logger._listener, None
+        if listener is not None:
+            listener.stop()
+
+atexit.register(Logger.stop)
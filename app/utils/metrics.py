@@ -0,0 +1,357 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+from app.utils.request_context import (
+    RequestContext, get_request_context, set_request_context, reset_request_context
+)
+from app.utils.tracing import SPAN_KIND_CLIENT, tracer
+
+# 요청/외부 호출 지연 버킷 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 쿼리 단위 지연 버킷 (초)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+# 요청당 쿼리 수 버킷
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    """레이블별 자식 값을 가진 메트릭 기본 클래스"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """레이블 값에 해당하는 자식 (처음 보는 조합이면 생성)"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key, child) -> List[str]:
+        raise NotImplementedError
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def _render_child(self, key, child):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"]
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # 마지막 칸은 +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def _render_child(self, key, child):
+        with child._lock:
+            counts = list(child.counts)
+            total = child.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, f'le="{_format_value(float(bound))}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """메트릭 목록과 수집 시점에 값을 읽는 게이지 콜백을 Prometheus 텍스트 형식으로 출력"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._gauge_callbacks: List[Tuple[str, str, Callable[[], Dict[Tuple[Tuple[str, str], ...], float]]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_gauge_callback(self, name: str, documentation: str,
+                                callback: Callable[[], Dict[Tuple[Tuple[str, str], ...], float]]):
+        """callback은 {((레이블, 값), ...): 값} 반환"""
+        self._gauge_callbacks.append((name, documentation, callback))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for name, documentation, callback in self._gauge_callbacks:
+            try:
+                samples = callback()
+            except Exception:
+                continue
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples.items():
+                lines.append(f"{name}{_format_labels([k for k, _ in labels], [v for _, v in labels])} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency until the last body chunk is sent",
+    ("method", "route", "status")
+))
+HTTP_REQUEST_DB_QUERIES = REGISTRY.register(Histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request",
+    ("route",), buckets=QUERY_COUNT_BUCKETS
+))
+HTTP_REQUEST_DB_DURATION = REGISTRY.register(Histogram(
+    "http_request_db_duration_seconds", "Total SQL execution time per HTTP request",
+    ("route",)
+))
+DB_QUERY_DURATION = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "SQL statement execution time",
+    ("operation",), buckets=QUERY_BUCKETS
+))
+DB_POOL_CHECKOUT_WAIT = REGISTRY.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection",
+    buckets=QUERY_BUCKETS
+))
+DEPENDENCY_DURATION = REGISTRY.register(Histogram(
+    "dependency_call_duration_seconds", "External dependency call latency",
+    ("dependency", "operation")
+))
+DEPENDENCY_ERRORS = REGISTRY.register(Counter(
+    "dependency_errors_total", "External dependency call failures",
+    ("dependency", "operation")
+))
+LOG_RECORDS_DROPPED = REGISTRY.register(Counter(
+    "log_records_dropped_total", "Log records dropped by the rate limit filter or a full log queue",
+    ("reason",)
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "cache_requests_total", "Cache lookups by result (hit ratio = hit / (hit + miss))",
+    ("cache", "result")
+))
+
+@contextmanager
+def track_dependency(dependency: str, operation: str):
+    """외부 호출 지연 기록과 트레이스 스팬, 예외가 전파되면 오류 카운터 증가 (동기/비동기 코드 모두 사용)"""
+    started = time.perf_counter()
+    try:
+        with tracer.start_span(f"{dependency}.{operation}", SPAN_KIND_CLIENT):
+            yield
+    except BaseException:
+        DEPENDENCY_ERRORS.labels(dependency, operation).inc()
+        raise
+    finally:
+        DEPENDENCY_DURATION.labels(dependency, operation).observe(time.perf_counter() - started)
+
+def record_dependency_error(dependency: str, operation: str):
+    """예외 없이 실패로 끝난 호출(5xx 응답 등) 기록"""
+    DEPENDENCY_ERRORS.labels(dependency, operation).inc()
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+def instrument_boto_client(client, dependency: str = "s3"):
+    """boto3 클라이언트의 모든 API 호출 지연/오류 기록 (botocore 이벤트 훅)"""
+    def before_call(context, **kwargs):
+        context["metrics_started"] = time.perf_counter()
+
+    def after_call(http_response, model, context, **kwargs):
+        started = context.pop("metrics_started", None)
+        if started is not None:
+            DEPENDENCY_DURATION.labels(dependency, model.name).observe(time.perf_counter() - started)
+        if http_response.status_code >= 500:
+            DEPENDENCY_ERRORS.labels(dependency, model.name).inc()
+
+    def after_call_error(model, context, **kwargs):
+        started = context.pop("metrics_started", None)
+        if started is not None:
+            DEPENDENCY_DURATION.labels(dependency, model.name).observe(time.perf_counter() - started)
+        DEPENDENCY_ERRORS.labels(dependency, model.name).inc()
+
+    service = client.meta.service_model.endpoint_prefix
+    client.meta.events.register(f"before-call.{service}", before_call)
+    client.meta.events.register(f"after-call.{service}", after_call)
+    client.meta.events.register(f"after-call-error.{service}", after_call_error)
+    return client
+
+class InstrumentedQueuePool(QueuePool):
+    """연결 대기 시간(풀이 가득 찼을 때의 대기 포함)을 기록하는 QueuePool"""
+
+    # 하위 클래스는 로거 이름이 모듈 경로로 바뀌어 sqlalchemy 로거 설정(기본 WARNING)을 벗어나고
+    # 앱 루트 로거 레벨(DEBUG)로 체크아웃/반환마다 기록되므로 원래 QueuePool 로거 이름을 유지
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.QueuePool"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+def _get_operation(statement: str) -> str:
+    parts = statement.lstrip().split(None, 1)
+    return parts[0].upper()[:16] if parts else "UNKNOWN"
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # 실행 컨텍스트는 쿼리마다 새로 생성되므로 시작 시각을 그대로 붙여 둠
+    context._metrics_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    DB_QUERY_DURATION.labels(_get_operation(statement)).observe(elapsed)
+    request_context = get_request_context()
+    if request_context is not None:
+        request_context.db_queries += 1
+        request_context.db_time += elapsed
+
+def instrument_engine(engine):
+    """엔진의 쿼리 실행 시간과 요청당 쿼리 수 기록 (중복 등록 방지), 풀 상태 게이지 등록"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return engine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    def pool_status():
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            return {}
+        return {
+            (("state", "checked_out"),): pool.checkedout(),
+            (("state", "checked_in"),): pool.checkedin(),
+            (("state", "overflow"),): max(pool.overflow(), 0),
+        }
+    REGISTRY.register_gauge_callback("db_pool_connections", "DB connection pool state", pool_status)
+    return engine
+
+def get_route_label(scope) -> str:
+    """라우팅 후 scope의 경로 템플릿 (예: /api/v0/stories/{story_id}), 매칭되지 않으면 unmatched"""
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path_format", None) or route.path
+    # Mount(정적 파일)는 route 대신 root_path에 마운트 경로가 들어감
+    if scope.get("root_path"):
+        return scope["root_path"]
+    return "unmatched"
+
+class MetricsMiddleware:
+    """
+    요청별 지연(라우트/상태 코드별)과 요청당 DB 쿼리 수/시간을 기록하는 ASGI 미들웨어
+
+    라우트 레이블은 경로 템플릿을 쓰므로 ID가 달라도 시계열이 늘어나지 않습니다.
+    지연은 마지막 본문 청크 전송 시점까지이며 BackgroundTasks 실행 시간은 포함하지 않습니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        request_context = RequestContext(scope["method"], scope["path"], scope=scope)
+        token = set_request_context(request_context)
+        status_code = 500
+        recorded = False
+
+        def record():
+            nonlocal recorded
+            recorded = True
+            route = get_route_label(scope)
+            HTTP_REQUEST_DURATION.labels(scope["method"], route, status_code).observe(time.perf_counter() - started)
+            HTTP_REQUEST_DB_QUERIES.labels(route).observe(request_context.db_queries)
+            HTTP_REQUEST_DB_DURATION.labels(route).observe(request_context.db_time)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False) and not recorded:
+                record()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not recorded:
+                record()
+            reset_request_context(token)
+
+def render_metrics() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,199 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional, Tuple
+from app.utils.security import is_admin_token
+
+PROFILE_HEADER = b"x-profile"
+ADMIN_TOKEN_HEADER = b"x-admin-token"
+PROFILE_FORMATS = ("collapsed", "pstats")
+
+# 대기 중인 스레드의 최상단 프레임 (기본적으로 샘플에서 제외)
+IDLE_LEAF_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+}
+
+# 프로파일은 프로세스 전체에 영향을 주므로 한 번에 하나만 실행
+_profile_lock = threading.Lock()
+
+class ProfilerBusyError(RuntimeError):
+    pass
+
+def _short_path(filename: str) -> str:
+    """site-packages/프로젝트 루트 이후 경로만 남김"""
+    for marker in ("site-packages" + os.sep, "dist-packages" + os.sep):
+        index = filename.rfind(marker)
+        if index >= 0:
+            return filename[index + len(marker):]
+    cwd = os.getcwd() + os.sep
+    if filename.startswith(cwd):
+        return filename[len(cwd):]
+    return filename
+
+class SamplingProfiler:
+    """
+    sys._current_frames()로 모든 스레드의 스택을 주기적으로 수집하는 샘플링 프로파일러
+
+    대상 코드에 훅을 걸지 않으므로 측정 중에도 요청 처리 속도가 거의 변하지 않습니다.
+    결과는 flamegraph.pl/speedscope가 읽는 collapsed 스택 형식입니다.
+    """
+
+    def __init__(self, interval: float = 0.005, include_idle: bool = False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._labels: Dict[object, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.samples
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self._sample(own_ident)
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _sample(self, own_ident: int):
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            code = frame.f_code
+            if not self.include_idle and (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAF_FRAMES:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(thread_names.get(ident, f"thread-{ident}"))
+            self.samples[";".join(reversed(stack))] += 1
+        self.sample_count += 1
+
+def format_collapsed(samples: Counter) -> str:
+    """collapsed 스택 문자열 ("프레임;프레임;... 횟수" 한 줄씩)"""
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+def format_pstats(profile: cProfile.Profile, sort: str = "cumulative", limit: int = 80) -> str:
+    stream = io.StringIO()
+    pstats.Stats(profile, stream=stream).sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+def acquire_profiler():
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("이미 실행 중인 프로파일이 있습니다.")
+
+def release_profiler():
+    _profile_lock.release()
+
+def sample_for(seconds: float, interval: float = 0.005, include_idle: bool = False) -> Tuple[str, int]:
+    """
+    seconds 동안 샘플링한 collapsed 스택과 샘플 수 반환 (블로킹, 스레드 풀에서 호출)
+
+    호출 전에 acquire_profiler()로 잠금을 잡아야 합니다.
+    """
+    profiler = SamplingProfiler(interval, include_idle).start()
+    time.sleep(seconds)
+    samples = profiler.stop()
+    return format_collapsed(samples), profiler.sample_count
+
+class ProfilingMiddleware:
+    """
+    X-Profile 헤더(collapsed | pstats)와 유효한 X-Admin-Token이 있는 요청 하나를 프로파일링
+
+    원래 응답 본문 대신 프로파일 결과(text/plain)를 반환하고 원래 상태 코드는 X-Profiled-Status 헤더로 알려줍니다.
+    헤더가 없는 요청은 헤더 확인 외의 비용이 없습니다.
+    pstats(cProfile)는 이벤트 루프 스레드만 측정하므로 동시에 처리 중인 다른 요청도 결과에 섞일 수 있습니다.
+    """
+
+    def __init__(self, app, interval: float = 0.001):
+        self.app = app
+        self.interval = interval
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile_format = None
+        admin_token = None
+        for key, value in scope.get("headers", []):
+            if key == PROFILE_HEADER:
+                profile_format = value.decode("latin-1").strip().lower()
+            elif key == ADMIN_TOKEN_HEADER:
+                admin_token = value.decode("latin-1")
+        # 토큰이 틀리면 프로파일 요청을 무시하고 평소대로 처리 (프로파일 기능 존재를 노출하지 않음)
+        if profile_format not in PROFILE_FORMATS or not is_admin_token(admin_token):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            acquire_profiler()
+        except ProfilerBusyError:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def discard(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        started = time.perf_counter()
+        try:
+            if profile_format == "pstats":
+                profile = cProfile.Profile()
+                profile.enable()
+                try:
+                    await self.app(scope, receive, discard)
+                finally:
+                    profile.disable()
+                body = format_pstats(profile)
+            else:
+                profiler = SamplingProfiler(self.interval).start()
+                try:
+                    await self.app(scope, receive, discard)
+                finally:
+                    samples = profiler.stop()
+                body = format_collapsed(samples)
+        finally:
+            release_profiler()
+
+        elapsed = time.perf_counter() - started
+        content = body.encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(content)).encode()),
+                (b"cache-control", b"no-store"),
+                (b"x-profiled-status", str(status_code).encode()),
+                (b"x-profile-duration", f"{elapsed:.6f}".encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": content})
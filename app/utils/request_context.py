@@ -0,0 +1,47 @@
+import asyncio
+import contextvars
+import functools
+from contextvars import ContextVar
+from typing import Optional
+
+class RequestContext:
+    """
+    요청 하나 동안 공유되는 상태 (요청 ID, DB 쿼리 수/시간)
+
+    contextvars로 전달되므로 run_in_threadpool로 실행되는 동기 엔드포인트와
+    스트리밍 응답의 이터레이터에서도 같은 객체를 봅니다.
+    """
+
+    __slots__ = ("method", "path", "request_id", "db_queries", "db_time", "scope")
+
+    def __init__(self, method: str, path: str, request_id: Optional[str] = None, scope: Optional[dict] = None):
+        self.method = method
+        self.path = path
+        self.request_id = request_id
+        self.db_queries = 0
+        self.db_time = 0.0
+        # 라우팅 후 scope["route"]에서 경로 템플릿을 얻기 위해 ASGI scope 보관
+        self.scope = scope
+
+_current_request: ContextVar[Optional[RequestContext]] = ContextVar("current_request", default=None)
+
+def get_request_context() -> Optional[RequestContext]:
+    """현재 요청의 컨텍스트 (요청 밖에서는 None)"""
+    return _current_request.get()
+
+def set_request_context(context: Optional[RequestContext]):
+    """컨텍스트 설정, reset_request_context에 넘길 토큰 반환"""
+    return _current_request.set(context)
+
+def reset_request_context(token):
+    _current_request.reset(token)
+
+def run_in_executor(executor, func, *args):
+    """
+    현재 contextvars(요청 컨텍스트, 트레이스 스팬)를 유지한 채 executor에서 실행
+
+    loop.run_in_executor는 컨텍스트를 복사하지 않으므로 스레드 안의 DB/S3 호출이 요청과 연결되지 않음
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return loop.run_in_executor(executor, functools.partial(context.run, func, *args))
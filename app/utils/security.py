@@ -1,29 +1,42 @@
 import jwt
 from fastapi import Depends, HTTPException, status, Request
+from app.config.config import Config
 from app.database import get_db
 from sqlalchemy.orm import Session
 from app.models.story import Story  # 실제 User 모델 import 필요
+import hmac
+import logging
 import os
 import httpx
 from typing import Optional
+from app.utils.metrics import track_dependency, record_dependency_error
+from app.utils.tracing import get_trace_headers
 from jwt.exceptions import ExpiredSignatureError, InvalidTokenError, DecodeError
 
 SECRET_KEY = os.environ.get("SECRET_KEY")
 ALGORITHM = "HS256"
 
-# User Service 설정
-USER_SERVICE_URL = os.environ.get("USER_SERVICE_URL", "http://localhost:8000")
+logger = logging.getLogger(__name__)
+
+# 관리자 API 토큰 (설정되지 않으면 관리자 API 비활성화)
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+# User Service 설정 (app/api/story.py와 같은 설정)
+USER_SERVICE_URL = Config.USER_SERVICE_URL
 
 # ... (기존 JWT/해시 함수 생략)
 
 async def validate_user_exists(user_id: int) -> bool:
     """User Service API를 호출하여 사용자 존재 여부 확인"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{USER_SERVICE_URL}/users/{user_id}")
-            return response.status_code == 200
+        with track_dependency("user_service", "validate_user"):
+            async with httpx.AsyncClient(headers=get_trace_headers()) as client:
+                response = await client.get(f"{USER_SERVICE_URL}/users/{user_id}")
+        if response.status_code >= 500:
+            record_dependency_error("user_service", "validate_user")
+        return response.status_code == 200
     except Exception as e:
-        print(f"User Service 호출 실패: {e}")
+        logger.warning("User Service 호출 실패: %s", e)
         return False
 
 def get_current_user(request: Request, db: Session = Depends(get_db)):
@@ -93,4 +106,24 @@ async def get_current_user_validated(request: Request, db: Session = Depends(get
             detail="사용자를 찾을 수 없습니다."
         )
     
-    return user_id 
\ No newline at end of file
+    return user_id 
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """관리자 토큰 일치 여부 (ADMIN_TOKEN 미설정 시 항상 False)"""
+    if not ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+def require_admin_token(request: Request):
+    """관리자 API 인증 (X-Admin-Token 헤더)"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="관리자 API가 비활성화되어 있습니다."
+        )
+    
+    if not is_admin_token(request.headers.get("X-Admin-Token")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="관리자 토큰이 유효하지 않습니다."
+        )
@@ -0,0 +1,225 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import NullPool
+from app.utils.metrics import get_route_label
+from app.utils.request_context import get_request_context
+
+# 기록하는 SQL 최대 길이
+MAX_STATEMENT_LENGTH = 2000
+# 집계하는 지문 최대 개수 (넘으면 가장 오래 보지 못한 지문부터 제거)
+MAX_FINGERPRINTS = 500
+# 실행 계획을 수집할 문장 (DDL/트랜잭션 제어 문은 제외)
+EXPLAINABLE_OPERATIONS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\?|(?<!:):\w+")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_statement(statement: str) -> str:
+    """리터럴과 바인딩 자리를 ?로 바꾸고 IN 목록 길이 차이를 없앤 SQL"""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(?+)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+def fingerprint_statement(statement: str) -> str:
+    return hashlib.sha1(normalize_statement(statement).encode("utf-8")).hexdigest()[:16]
+
+def _value_shape(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+def describe_parameters(parameters: Any, executemany: bool) -> Any:
+    """바인딩 값 대신 타입(모양)만 반환 ({"user_id_1": "int"}, ["int", "str"] 등)"""
+    if executemany:
+        rows = list(parameters) if parameters else []
+        return {"rows": len(rows), "shape": describe_parameters(rows[0], False) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: _value_shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_value_shape(value) for value in parameters]
+    return None
+
+class SlowQueryLog:
+    """
+    임계값을 넘은 SQL을 메모리 링 버퍼에 기록 (관리자 API로 조회)
+
+    - 바인딩 값은 남기지 않고 타입만 기록
+    - 요청 안에서 실행된 쿼리는 라우트(경로 템플릿)와 요청 ID를 함께 기록
+    - PostgreSQL이면 지문별로 처음 느렸을 때 EXPLAIN(ANALYZE 없이) 실행 계획을 백그라운드에서 수집
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.enabled = False
+        self.threshold = 0.2
+        self.explain_enabled = True
+        self._entries: deque = deque(maxlen=200)
+        self._fingerprints: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._explain_executor: Optional[ThreadPoolExecutor] = None
+        self._plan_engines: Dict[Any, Any] = {}
+
+    def init_app(self, app):
+        """앱 초기화"""
+        config = app.state.config
+        self.enabled = config.SLOW_QUERY_ENABLED
+        self.threshold = config.SLOW_QUERY_THRESHOLD_MS / 1000
+        self.explain_enabled = config.SLOW_QUERY_EXPLAIN
+        if self._entries.maxlen != config.SLOW_QUERY_LOG_SIZE:
+            self._entries = deque(self._entries, maxlen=config.SLOW_QUERY_LOG_SIZE)
+        self.logger.info("Slow query log initialized (enabled=%s, threshold=%sms)", self.enabled, config.SLOW_QUERY_THRESHOLD_MS)
+        return self
+
+    def instrument(self, engine):
+        """엔진에 쿼리 시간 측정 훅 등록 (중복 등록 방지)"""
+        if event.contains(engine, "before_cursor_execute", self._before_cursor_execute):
+            return engine
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        return engine
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_slow_query_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if elapsed < self.threshold:
+            return
+        self.record(conn.engine, statement, parameters, executemany, elapsed)
+
+    def record(self, engine, statement: str, parameters: Any, executemany: bool, elapsed: float):
+        """느린 쿼리 한 건 기록"""
+        request_context = get_request_context()
+        route = None
+        request_id = None
+        if request_context is not None:
+            route = get_route_label(request_context.scope) if request_context.scope is not None else request_context.path
+            request_id = request_context.request_id
+
+        fingerprint = fingerprint_statement(statement)
+        duration_ms = round(elapsed * 1000, 3)
+        entry = {
+            "fingerprint": fingerprint,
+            "statement": statement[:MAX_STATEMENT_LENGTH],
+            "parameters": describe_parameters(parameters, executemany),
+            "duration_ms": duration_ms,
+            "route": route,
+            "request_id": request_id,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+        with self._lock:
+            self._entries.append(entry)
+            summary = self._fingerprints.get(fingerprint)
+            first_seen = summary is None
+            if first_seen:
+                summary = {
+                    "fingerprint": fingerprint,
+                    "statement": normalize_statement(statement)[:MAX_STATEMENT_LENGTH],
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "routes": [],
+                    "first_seen": entry["recorded_at"],
+                    "plan": None,
+                }
+                self._fingerprints[fingerprint] = summary
+                if len(self._fingerprints) > MAX_FINGERPRINTS:
+                    self._fingerprints.popitem(last=False)
+            else:
+                self._fingerprints.move_to_end(fingerprint)
+            summary["count"] += 1
+            summary["total_ms"] = round(summary["total_ms"] + duration_ms, 3)
+            summary["max_ms"] = max(summary["max_ms"], duration_ms)
+            summary["last_seen"] = entry["recorded_at"]
+            if route and route not in summary["routes"] and len(summary["routes"]) < 10:
+                summary["routes"].append(route)
+
+        self.logger.warning("Slow query %.1fms route=%s fingerprint=%s: %s", duration_ms, route, fingerprint, statement[:200])
+
+        if first_seen and self._should_explain(engine, statement):
+            explain_parameters = (list(parameters)[0] if parameters else None) if executemany else parameters
+            self._get_explain_executor().submit(self._capture_plan, engine, fingerprint, statement, explain_parameters)
+
+    def _should_explain(self, engine, statement: str) -> bool:
+        if not self.explain_enabled or engine.dialect.name != "postgresql":
+            return False
+        return statement.lstrip().split(None, 1)[0].upper() in EXPLAINABLE_OPERATIONS
+
+    def _get_explain_executor(self) -> ThreadPoolExecutor:
+        if self._explain_executor is None:
+            self._explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        return self._explain_executor
+
+    def _get_plan_engine(self, engine):
+        """
+        실행 계획 수집 전용 엔진 (NullPool, 같은 DB URL)
+
+        워커의 작은 연결 풀에서 빌리면 이미 느린 워커의 마지막 여유 연결을 가져가므로 풀 밖에서 한 번 열고 닫습니다.
+        """
+        plan_engine = self._plan_engines.get(engine)
+        if plan_engine is None:
+            plan_engine = self._plan_engines[engine] = create_engine(engine.url, poolclass=NullPool)
+        return plan_engine
+
+    def _capture_plan(self, engine, fingerprint: str, statement: str, parameters: Any):
+        """
+        별도 연결에서 EXPLAIN 실행 후 지문에 저장
+
+        요청의 트랜잭션과 섞이지 않도록 풀 밖의 DBAPI 연결을 직접 사용하고 (이벤트 훅 미발생) 항상 롤백합니다.
+        """
+        connection = self._get_plan_engine(engine).raw_connection()
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(f"EXPLAIN (ANALYZE false, FORMAT JSON) {statement}", parameters)
+                plan = cursor.fetchone()[0]
+            finally:
+                cursor.close()
+                connection.rollback()
+        except Exception as e:
+            self.logger.warning("Slow query plan capture failed (%s): %s", fingerprint, e)
+            plan = {"error": str(e)[:200]}
+        finally:
+            connection.close()
+
+        with self._lock:
+            summary = self._fingerprints.get(fingerprint)
+            if summary is not None:
+                summary["plan"] = plan
+
+    def get_entries(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """최근 느린 쿼리 (최신순)"""
+        with self._lock:
+            entries = list(self._entries)
+        return entries[::-1][:limit]
+
+    def get_fingerprints(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """지문별 집계 (총 시간 내림차순, 실행 계획 포함)"""
+        with self._lock:
+            summaries = [dict(summary) for summary in self._fingerprints.values()]
+        summaries.sort(key=lambda summary: summary["total_ms"], reverse=True)
+        return summaries[:limit]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._fingerprints.clear()
+
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,391 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from sqlalchemy import event
+from app.utils.request_context import RequestContext, get_request_context, set_request_context, reset_request_context
+
+# OTLP span kind
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+# OTLP status code
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+REQUEST_ID_HEADER = "x-request-id"
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+# 쿼리 스팬에 남기는 SQL 최대 길이 (바인딩 값은 기록하지 않음)
+MAX_STATEMENT_LENGTH = 500
+
+class Span:
+    """트레이스 구간 하나 (sampled가 False면 전파용 ID만 가지고 내보내지 않음)"""
+
+    __slots__ = ("trace_id", "span_id", "parent_span_id", "name", "kind", "start_ns", "end_ns",
+                 "attributes", "status_code", "status_message", "sampled")
+
+    def __init__(self, trace_id: str, name: str, kind: int = SPAN_KIND_INTERNAL,
+                 parent_span_id: Optional[str] = None, sampled: bool = True,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes or {}
+        self.status_code = 0
+        self.status_message = ""
+        self.sampled = sampled
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.status_code = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"[:200]
+
+    def end(self):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self.sampled:
+            tracer.export(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_to_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": self.status_code, "message": self.status_message} if self.status_code else {}
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+def _to_otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def get_current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def get_trace_headers() -> Dict[str, str]:
+    """하위 서비스 호출에 붙일 헤더 (traceparent + X-Request-ID), 요청 밖에서는 빈 dict"""
+    headers = {}
+    span = _current_span.get()
+    if span is not None:
+        headers["traceparent"] = f"00-{span.trace_id}-{span.span_id}-{'01' if span.sampled else '00'}"
+    request_context = get_request_context()
+    if request_context is not None and request_context.request_id:
+        headers["X-Request-ID"] = request_context.request_id
+    return headers
+
+class _SpanExporter(threading.Thread):
+    """끝난 스팬을 모아 OTLP JSON(ExportTraceServiceRequest) 한 줄씩 파일/콘솔로 내보내는 스레드"""
+
+    def __init__(self, service_name: str, target: str, batch_size: int, interval: float, queue_size: int):
+        super().__init__(name="trace-exporter", daemon=True)
+        self.logger = logging.getLogger(__name__)
+        self.service_name = service_name
+        self.target = target
+        self.batch_size = batch_size
+        self.interval = interval
+        self.queue: "queue.Queue[Span]" = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self._flush_lock = threading.Lock()
+
+    def submit(self, span: Span):
+        try:
+            self.queue.put_nowait(span)
+        except queue.Full:
+            # 요청 경로를 막지 않도록 큐가 가득 차면 버림
+            self.dropped += 1
+
+    def run(self):
+        while True:
+            batch = self._drain(wait=self.interval)
+            if batch:
+                self._write(batch)
+
+    def _drain(self, wait: float = 0.0) -> List[Span]:
+        """최대 wait초 동안 batch_size개까지 모음 (wait=0이면 큐에 있는 것만)"""
+        batch = []
+        deadline = time.monotonic() + wait
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout > 0:
+                    batch.append(self.queue.get(timeout=timeout))
+                else:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self):
+        """남은 스팬을 즉시 기록 (종료 시 호출)"""
+        batch = self._drain()
+        while batch:
+            self._write(batch)
+            batch = self._drain()
+
+    def _write(self, spans: List[Span]):
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_to_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "app.utils.tracing"},
+                    "spans": [span.to_otlp() for span in spans]
+                }]
+            }]
+        }
+        line = json.dumps(payload, ensure_ascii=False)
+        with self._flush_lock:
+            try:
+                if self.target == "console":
+                    print(line)
+                else:
+                    with open(self.target, "a", encoding="utf-8") as f:
+                        f.write(line + "\n")
+            except Exception as e:
+                self.logger.error("트레이스 기록 실패: %s", e)
+
+class Tracer:
+    """
+    요청 단위 트레이싱 (요청 → DB/User Service/OpenAI/S3 호출 스팬)
+
+    - 샘플링은 요청 시작 시 결정 (TRACE_SAMPLE_RATE, 상위 서비스 traceparent의 sampled 플래그 우선)
+    - 샘플링되지 않은 요청도 traceparent/X-Request-ID는 하위 호출로 전파
+    - 끝난 스팬은 백그라운드 스레드가 OTLP JSON으로 TRACE_EXPORTER(file|console)에 기록
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.enabled = False
+        self.sample_rate = 0.0
+        self.exporter: Optional[_SpanExporter] = None
+
+    def init_app(self, app):
+        """앱 초기화"""
+        config = app.state.config
+        self.enabled = config.TRACING_ENABLED
+        self.sample_rate = config.TRACE_SAMPLE_RATE
+        if self.enabled and self.exporter is None:
+            target = "console" if config.TRACE_EXPORTER == "console" else (
+                config.TRACE_EXPORT_PATH or os.path.join(config.LOG_PATH, "traces.ndjson")
+            )
+            if target != "console":
+                os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+            self.exporter = _SpanExporter(
+                config.APP_NAME, target, config.TRACE_EXPORT_BATCH_SIZE,
+                config.TRACE_EXPORT_INTERVAL, config.TRACE_QUEUE_SIZE
+            )
+            self.exporter.start()
+            atexit.register(self.exporter.flush)
+        self.logger.info("Tracer initialized (enabled=%s, sample_rate=%s)", self.enabled, self.sample_rate)
+        return self
+
+    def after_fork(self):
+        """포크한 워커 프로세스에서 내보내기 스레드 다시 시작 (스레드는 포크 시 복사되지 않음)"""
+        exporter = self.exporter
+        if exporter is None or exporter.is_alive():
+            return
+        self.exporter = _SpanExporter(
+            exporter.service_name, exporter.target, exporter.batch_size, exporter.interval, exporter.queue.maxsize
+        )
+        self.exporter.start()
+        atexit.register(self.exporter.flush)
+
+    def export(self, span: Span):
+        if self.exporter is not None:
+            self.exporter.submit(span)
+
+    def should_sample(self) -> bool:
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def begin_span(self, name: str, kind: int = SPAN_KIND_INTERNAL,
+                   attributes: Optional[Dict[str, Any]] = None) -> Optional[Span]:
+        """현재 스팬의 자식 스팬 시작 (샘플링된 요청 안에서만, 아니면 None)"""
+        parent = _current_span.get()
+        if parent is None or not parent.sampled:
+            return None
+        return Span(parent.trace_id, name, kind, parent.span_id, attributes=attributes)
+
+    @contextmanager
+    def start_span(self, name: str, kind: int = SPAN_KIND_INTERNAL, attributes: Optional[Dict[str, Any]] = None):
+        """자식 스팬을 현재 스팬으로 두고 블록 실행 (샘플링되지 않았으면 None을 yield)"""
+        span = self.begin_span(name, kind, attributes)
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+tracer = Tracer()
+
+def _get_request_id(headers: Dict[bytes, bytes]) -> str:
+    request_id = headers.get(REQUEST_ID_HEADER.encode(), b"").decode("latin-1")
+    if REQUEST_ID_PATTERN.match(request_id):
+        return request_id
+    return uuid.uuid4().hex
+
+class TracingMiddleware:
+    """요청 ID 부여(X-Request-ID 응답 헤더)와 요청 루트 스팬 생성"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers", []))
+        request_id = _get_request_id(headers)
+        request_context = get_request_context()
+        context_token = None
+        if request_context is None:
+            request_context = RequestContext(scope["method"], scope["path"], scope=scope)
+            context_token = set_request_context(request_context)
+        request_context.request_id = request_id
+
+        # 상위 서비스의 traceparent가 있으면 같은 트레이스로 이어감
+        match = TRACEPARENT_PATTERN.match(headers.get(b"traceparent", b"").decode("latin-1"))
+        if match:
+            trace_id, parent_span_id = match.group(1), match.group(2)
+            sampled = tracer.enabled and match.group(3) == "01"
+        else:
+            trace_id, parent_span_id = os.urandom(16).hex(), None
+            sampled = tracer.enabled and tracer.should_sample()
+        span = Span(trace_id, f"{scope['method']} {scope['path']}", SPAN_KIND_SERVER, parent_span_id, sampled, {
+            "http.method": scope["method"],
+            "http.target": scope["path"],
+            "http.request_id": request_id
+        })
+        span_token = _current_span.set(span)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                route = scope.get("route")
+                if route is not None:
+                    route_path = getattr(route, "path_format", None) or route.path
+                    span.name = f"{scope['method']} {route_path}"
+                    span.set_attribute("http.route", route_path)
+                span.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.status_code = STATUS_ERROR
+                message = {**message, "headers": list(message.get("headers", [])) + [
+                    (REQUEST_ID_HEADER.encode(), request_id.encode("latin-1"))
+                ]}
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                span.end()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            span.end()
+            _current_span.reset(span_token)
+            if context_token is not None:
+                reset_request_context(context_token)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = tracer.begin_span("db.query", SPAN_KIND_CLIENT)
+    if span is not None:
+        span.set_attribute("db.system", conn.dialect.name)
+        span.set_attribute("db.statement", statement[:MAX_STATEMENT_LENGTH])
+        context._trace_span = span
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = getattr(context, "_trace_span", None)
+    if span is not None:
+        span.set_attribute("db.rows", cursor.rowcount)
+        span.end()
+
+def _handle_db_error(exception_context):
+    span = getattr(exception_context.execution_context, "_trace_span", None)
+    if span is not None:
+        span.record_error(exception_context.original_exception)
+        span.end()
+
+def _before_commit(session):
+    span = tracer.begin_span("db.commit", SPAN_KIND_CLIENT)
+    if span is not None:
+        session.info["trace_commit_span"] = span
+
+def _end_commit(session, *args):
+    span = session.info.pop("trace_commit_span", None)
+    if span is not None:
+        span.end()
+
+def trace_database(engine, session_factory):
+    """쿼리(cursor execute)와 세션 커밋(flush 포함) 스팬 (중복 등록 방지)"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_db_error)
+    event.listen(session_factory, "before_commit", _before_commit)
+    event.listen(session_factory, "after_commit", _end_commit)
+    event.listen(session_factory, "after_rollback", _end_commit)
+
+def trace_boto_client(client):
+    """boto3 클라이언트 API 호출 스팬 (botocore 이벤트 훅)"""
+    service = client.meta.service_model.endpoint_prefix
+
+    def before_call(model, context, **kwargs):
+        span = tracer.begin_span(f"{service}.{model.name}", SPAN_KIND_CLIENT, {"rpc.system": "aws-api"})
+        if span is not None:
+            context["trace_span"] = span
+
+    def after_call(http_response, context, **kwargs):
+        span = context.pop("trace_span", None)
+        if span is not None:
+            span.set_attribute("http.status_code", http_response.status_code)
+            if http_response.status_code >= 500:
+                span.status_code = STATUS_ERROR
+            span.end()
+
+    def after_call_error(exception, context, **kwargs):
+        span = context.pop("trace_span", None)
+        if span is not None:
+            span.record_error(exception)
+            span.end()
+
+    client.meta.events.register(f"before-call.{service}", before_call)
+    client.meta.events.register(f"after-call.{service}", after_call)
+    client.meta.events.register(f"after-call-error.{service}", after_call_error)
+    return client
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+응답 압축 벤치마크
+주요 엔드포인트와 같은 모양의 응답 본문을 CompressionMiddleware에 통과시켜
+압축 방식/수준별 전송 바이트와 요청당 CPU 시간을 비교합니다.
+
+측정 대상 (본문은 실제 직렬화 함수로 생성):
+- story_list: GET /api/v0/stories/ 한 페이지 (전체 필드)
+- story_summary: GET /api/v0/stories/?view=summary 한 페이지
+- sentence_segment: GET /api/v0/stories/segments/sentence/random (작은 응답)
+- story_stream: GET /api/v0/stories/stream (NDJSON 64KB 청크 스트리밍)
+
+사용법:
+    python benchmarks/bench_compression.py --rows 100 --stream-rows 5000 --repeat 30
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# app 패키지 임포트 시 엔진이 생성되므로 DB 설정이 없으면 임시 SQLite 파일 사용
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'story-bench.db')}")
+
+from app.common.compression import CompressionMiddleware, brotli
+from app.common.response import create_json_response, _iter_ndjson_chunks
+from app.helper.story_helper import STORY_SUMMARY_FIELDS, serialize_story
+from app.models.story import Story
+from app.utils.functions import make_excerpt
+
+WORDS = ["어릴", "적", "살던", "마을에는", "큰", "느티나무가", "있었습니다", "여름이면", "동네", "아이들과",
+         "냇가에서", "물고기를", "잡았고", "어머니는", "저녁마다", "된장찌개를", "끓여", "주셨지요", "장날에는",
+         "아버지", "손을", "잡고", "읍내에", "나갔습니다", "학교", "운동장", "가을", "운동회", "기억이", "납니다"]
+
+def make_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)) + "."
+
+def make_stories(count: int):
+    """DB 없이 로드된 상태와 같은 Story 객체 생성 (내용은 단어를 무작위로 조합)"""
+    rng = random.Random(42)
+    base_time = datetime(2024, 1, 1, 9, 0, 0)
+    stories = []
+    for index in range(count):
+        content = " ".join(make_text(rng, 12) for _ in range(10))
+        stories.append(Story(
+            id=index + 1,
+            user_id=index % 50 + 1,
+            title=f"추억 이야기 {index}",
+            content=content,
+            excerpt=make_excerpt(content),
+            segment_count=10,
+            image_url=f"https://bucket.s3.ap-northeast-2.amazonaws.com/story-images/{rng.getrandbits(256):064x}.jpg",
+            image_variants=None,
+            created_at=base_time + timedelta(minutes=index),
+            updated_at=base_time + timedelta(minutes=index, seconds=30)
+        ))
+    return stories
+
+def make_payloads(rows: int, stream_rows: int):
+    """엔드포인트별 (이름, Content-Type, 본문 청크 목록)"""
+    stories = make_stories(max(rows, stream_rows))
+    page = [serialize_story(story) for story in stories[:rows]]
+    summary = [{field: record[field] for field in STORY_SUMMARY_FIELDS} for record in page]
+    segment = {"story_id": 1, "title": "추억 이야기 0", "sentence": make_text(random.Random(1), 15),
+               "order": 3, "total": 10}
+    return [
+        ("story_list", "application/json", [create_json_response(page).body]),
+        ("story_summary", "application/json", [create_json_response(summary).body]),
+        ("sentence_segment", "application/json", [create_json_response(segment).body]),
+        ("story_stream", "application/x-ndjson",
+         list(_iter_ndjson_chunks(serialize_story(story) for story in stories[:stream_rows]))),
+    ]
+
+def make_app(content_type: str, chunks):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", content_type.encode("latin-1"))]})
+        for index, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(chunks) - 1})
+    return app
+
+async def request(app, accept_encoding: str) -> int:
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return size
+
+def measure(app, accept_encoding: str, repeat: int):
+    """요청당 CPU 시간(process_time) 중앙값과 전송 바이트"""
+    loop = asyncio.new_event_loop()
+    try:
+        size = loop.run_until_complete(request(app, accept_encoding))
+        timings = []
+        for _ in range(repeat):
+            started = time.process_time()
+            loop.run_until_complete(request(app, accept_encoding))
+            timings.append(time.process_time() - started)
+    finally:
+        loop.close()
+    return statistics.median(timings), size
+
+def main():
+    parser = argparse.ArgumentParser(description="응답 압축 벤치마크")
+    parser.add_argument("--rows", type=int, default=100, help="목록 페이지 행 수")
+    parser.add_argument("--stream-rows", type=int, default=5000, help="스트리밍 응답 행 수")
+    parser.add_argument("--repeat", type=int, default=30, help="측정 반복 횟수")
+    args = parser.parse_args()
+
+    settings = [("identity", "identity", {})]
+    settings += [(f"gzip-{level}", "gzip", {"gzip_level": level}) for level in (1, 6, 9)]
+    if brotli:
+        settings += [(f"br-{quality}", "br", {"brotli_quality": quality}) for quality in (1, 4, 6)]
+    else:
+        print("⚠️ brotli 미설치 - gzip만 측정합니다.")
+
+    for name, content_type, chunks in make_payloads(args.rows, args.stream_rows):
+        original = sum(len(chunk) for chunk in chunks)
+        print(f"📦 {name} ({original / 1024:.1f}KB, 청크 {len(chunks)}개)")
+        for label, accept_encoding, options in settings:
+            app = CompressionMiddleware(make_app(content_type, chunks), **options)
+            cpu, size = measure(app, accept_encoding, args.repeat)
+            print(f"{label:>10}: 전송 {size / 1024:9.1f}KB ({size / original * 100:5.1f}%) | "
+                  f"CPU {cpu * 1000:7.2f}ms/요청")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+앱 시작(임포트) 시간 벤치마크
+새 프로세스에서 python -X importtime -c "import story_manage"를 실행해 create_app까지의 시간을 측정하고,
+예산이나 기준선을 넘으면 종료 코드 1로 끝납니다 (CI 회귀 확인용).
+
+측정 항목:
+- import story_manage 전체 시간 (--runs회 중앙값, 첫 실행은 .pyc 생성용으로 제외)
+- 누적 시간 상위 모듈, 자체 시간 기준 상위 패키지
+- 시작 시 임포트되면 안 되는 무거운 패키지 (--forbid, 기본값: boto3 openai - 첫 사용 시 로드)
+
+사용법:
+    python benchmarks/bench_import_time.py --budget-ms 1500
+    python benchmarks/bench_import_time.py --save-baseline benchmarks/baseline-import.json
+    python benchmarks/bench_import_time.py --baseline benchmarks/baseline-import.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_importtime(target: str, env: dict):
+    """-X importtime 출력 파싱 결과 [(모듈, 자체 µs, 누적 µs)]와 벽시계 시간(ms)"""
+    code = (
+        "import time; started = time.perf_counter(); "
+        f"import {target}; "
+        "print((time.perf_counter() - started) * 1000)"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr[-2000:])
+
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    wall_ms = float(completed.stdout.strip().splitlines()[-1])
+    return modules, wall_ms
+
+def summarize(modules, top: int):
+    by_package = defaultdict(int)
+    for name, self_us, _ in modules:
+        by_package[name.split(".")[0]] += self_us
+    return {
+        "modules": sorted(((name, cumulative) for name, _, cumulative in modules), key=lambda m: -m[1])[:top],
+        "packages": sorted(by_package.items(), key=lambda p: -p[1])[:top],
+        "imported": {name for name, _, _ in modules},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="앱 시작(임포트) 시간 벤치마크")
+    parser.add_argument("--target", default="story_manage", help="임포트할 모듈 (기본값: story_manage)")
+    parser.add_argument("--runs", type=int, default=5, help="측정 횟수 (중앙값 사용)")
+    parser.add_argument("--top", type=int, default=15, help="출력할 상위 모듈/패키지 수")
+    parser.add_argument("--forbid", nargs="*", default=["boto3", "openai"], help="시작 시 임포트되면 실패로 볼 패키지")
+    parser.add_argument("--budget-ms", type=float, help="허용 임포트 시간 (밀리초)")
+    parser.add_argument("--baseline", help="비교할 기준선 JSON 경로")
+    parser.add_argument("--save-baseline", help="결과를 기준선 JSON으로 저장할 경로")
+    parser.add_argument("--threshold", type=float, default=0.2, help="허용 회귀 비율 (기본값: 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    # 임포트 시 엔진만 만들고 연결하지 않으므로 임시 SQLite로 충분 (스키마 확인은 startup 이후 워밍업에서 실행)
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'story-bench-import.db')}")
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    run_importtime(args.target, env)  # .pyc 생성
+    totals, walls, last = [], [], None
+    for _ in range(args.runs):
+        modules, wall_ms = run_importtime(args.target, env)
+        totals.append(sum(self_us for _, self_us, _ in modules) / 1000)
+        walls.append(wall_ms)
+        last = modules
+
+    summary = summarize(last, args.top)
+    total_ms = statistics.median(totals)
+    wall_ms = statistics.median(walls)
+    print(f"📦 import {args.target}: {total_ms:.0f}ms (importtime 합계) | {wall_ms:.0f}ms (create_app 포함 벽시계), {args.runs}회 중앙값")
+    print("   누적 시간 상위 모듈:")
+    for name, cumulative in summary["modules"]:
+        print(f"     {cumulative / 1000:8.1f}ms  {name}")
+    print("   자체 시간 상위 패키지:")
+    for name, self_us in summary["packages"]:
+        print(f"     {self_us / 1000:8.1f}ms  {name}")
+
+    results = {
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "target": args.target,
+        "total_ms": round(total_ms, 1),
+        "wall_ms": round(wall_ms, 1),
+        "packages": {name: round(self_us / 1000, 1) for name, self_us in summary["packages"]},
+    }
+
+    failed = False
+    forbidden = [name for name in args.forbid if name in summary["imported"]]
+    if forbidden:
+        print(f"❌ 시작 시 임포트되면 안 되는 패키지: {', '.join(forbidden)}")
+        failed = True
+
+    if args.budget_ms is not None:
+        if wall_ms > args.budget_ms:
+            print(f"❌ 임포트 시간이 예산({args.budget_ms:.0f}ms)을 넘었습니다.")
+            failed = True
+        else:
+            print(f"✅ 예산({args.budget_ms:.0f}ms) 이내")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"💾 기준선 저장: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if wall_ms > baseline["wall_ms"] * (1 + args.threshold):
+            print(f"❌ 기준선 대비 회귀: {baseline['wall_ms']:.0f}ms → {wall_ms:.0f}ms (허용 {args.threshold:.0%})")
+            failed = True
+        else:
+            print(f"✅ 기준선 대비 회귀 없음 ({baseline['wall_ms']:.0f}ms → {wall_ms:.0f}ms, 허용 {args.threshold:.0%})")
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
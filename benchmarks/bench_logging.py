@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+요청당 로깅 오버헤드 벤치마크
+게임 결과 제출(POST /api/v0/game/submit-result) 한 번에 남기는 로그를 같은 모양으로 호출해
+요청 스레드(이벤트 루프)에서 쓰는 시간을 비교하고, 예산을 넘으면 종료 코드 1로 끝납니다.
+
+비교 대상:
+- sync_fstring: 이전 방식 (루트 로거에 파일/콘솔 핸들러 직접 연결, 요청마다 f-string INFO 6줄, 그중 2줄은 요청 dict 전체)
+- queue_fstring: 같은 호출을 큐 핸들러로 (파일 쓰기만 리스너 스레드로 이동)
+- queue_lazy: 현재 방식 (큐 핸들러 + % 지연 포맷, 요청 dict는 DEBUG로만)
+- queue_lazy_json: 현재 방식 + JSON 출력 (LOG_JSON=true)
+- rate_limited: 현재 방식 + 로거별 초당 제한 (--rate-limit), 버려진 기록 수 함께 출력
+
+각 항목은 요청 스레드 시간(µs/요청)과 리스너가 큐를 모두 비우는 데 걸린 시간을 함께 보여줍니다.
+
+사용법:
+    python benchmarks/bench_logging.py --requests 20000 --budget-us 40
+"""
+
+import argparse
+import contextlib
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+from types import SimpleNamespace
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# app 패키지 임포트 시 엔진이 생성되므로 DB 설정이 없으면 임시 SQLite 파일 사용
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'story-bench.db')}")
+
+from app.config.config import Config
+from app.schemas.game_result import GameResultCreate
+from app.utils.logger import Logger
+from app.utils.metrics import LOG_RECORDS_DROPPED
+
+logger = logging.getLogger("app.api.game_result")
+helper_logger = logging.getLogger("app.helper.game_helper")
+
+def submit_fstring(game_result: GameResultCreate, user_id: int, result_id: int):
+    """이전 submit_game_result + save_game_result의 로그 호출"""
+    logger.info(f"Game result submission request received: {game_result.dict()}")
+    logger.info(f"Authenticated user_id: {user_id}")
+    logger.info(f"User ID validation: request_user_id={game_result.user_id}, authenticated_user_id={user_id}")
+    logger.info(f"Attempting to save game result: {game_result.dict()}")
+    helper_logger.info(f"Game result saved for user {game_result.user_id}, type: {game_result.game_type}")
+    logger.info(f"Game result saved successfully: result_id={result_id}, user_id={user_id}, game_type={game_result.game_type}, correct={game_result.is_correct}")
+
+def submit_lazy(game_result: GameResultCreate, user_id: int, result_id: int):
+    """현재 submit_game_result + save_rated_game의 로그 호출"""
+    logger.debug("Game result submission: authenticated_user_id=%s, request=%s", user_id, game_result)
+    helper_logger.debug("Game result saved for user %s, type: %s", game_result.user_id, game_result.game_type)
+    logger.info("Game result saved: result_id=%s, user_id=%s, game_type=%s, correct=%s",
+                result_id, user_id, game_result.game_type, game_result.is_correct)
+
+def make_config(log_path: str, queue: bool, json_output: bool, rate_limit: float):
+    config = Config()
+    config.PHASE = "bench"
+    config.LOG_PATH = log_path
+    config.LOG_LEVEL = logging.INFO
+    config.LOG_QUEUE_ENABLED = queue
+    config.LOG_JSON = json_output
+    config.LOG_RATE_LIMIT = rate_limit
+    config.LOG_RATE_LIMITS = ""
+    # 요청 스레드 비용만 보려고 큐 크기 제한 없음 (운영 기본값 10000에서는 리스너보다 빠르게 쌓이면 버림)
+    config.LOG_QUEUE_SIZE = 0
+    return config
+
+def setup_sync(log_path: str):
+    """이전 Logger.init_app과 같은 구성 (핸들러를 루트 로거에 직접 연결)"""
+    formatter = logging.Formatter(Config.LOG_FORMAT)
+    root_logger = logging.getLogger()
+    Logger.stop()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    file_handler = RotatingFileHandler(os.path.join(log_path, "story-api.log"), maxBytes=10485760, backupCount=10)
+    console_handler = logging.StreamHandler()
+    for handler in (file_handler, console_handler):
+        handler.setFormatter(formatter)
+        root_logger.addHandler(handler)
+    root_logger.setLevel(logging.INFO)
+
+def run_case(name: str, calls, requests: int, rounds: int, setup) -> dict:
+    log_path = tempfile.mkdtemp(prefix="story-bench-log-")
+    game_result = GameResultCreate(user_id=7, game_type="A", story_id=42, is_correct=True, response_time=3.2)
+    dropped_before = sum(child.value for child in LOG_RECORDS_DROPPED._children.values())
+    # 콘솔 핸들러 출력은 측정에서 버림 (StreamHandler는 생성 시점의 sys.stderr를 사용)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stderr(devnull):
+        setup(log_path)
+        timings = []
+        drains = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for index in range(requests):
+                calls(game_result, 7, index)
+            timings.append((time.perf_counter() - started) / requests * 1e6)
+            # 리스너가 큐를 다 비울 때까지 (동기 핸들러면 바로 0)
+            started = time.perf_counter()
+            listener_queue = Logger._queue_handler.queue if Logger._listener else None
+            while listener_queue is not None and listener_queue.unfinished_tasks:
+                time.sleep(0.001)
+            drains.append((time.perf_counter() - started) * 1000)
+        Logger.stop()
+    # 10MB마다 교체된 파일(story-api.log.1 ...)까지 합산
+    lines = 0
+    for filename in os.listdir(log_path):
+        with open(os.path.join(log_path, filename), encoding="utf-8") as f:
+            lines += sum(1 for _ in f)
+    shutil.rmtree(log_path, ignore_errors=True)
+    dropped = sum(child.value for child in LOG_RECORDS_DROPPED._children.values()) - dropped_before
+    return {
+        "name": name,
+        "us_per_request": statistics.median(timings),
+        "drain_ms": statistics.median(drains),
+        "lines_per_request": lines / (requests * rounds),
+        "dropped": int(dropped),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="요청당 로깅 오버헤드 벤치마크")
+    parser.add_argument("--requests", type=int, default=20000, help="측정 요청 수 (회차당)")
+    parser.add_argument("--rounds", type=int, default=3, help="측정 회차 (중앙값 사용)")
+    parser.add_argument("--rate-limit", type=float, default=100, help="rate_limited 항목의 로거별 초당 기록 수")
+    parser.add_argument("--budget-us", type=float, default=40.0, help="queue_lazy의 요청당 허용 시간 (마이크로초)")
+    args = parser.parse_args()
+
+    def queued(json_output=False, rate_limit=0):
+        def setup(log_path):
+            config = make_config(log_path, True, json_output, rate_limit)
+            Logger.init_app(SimpleNamespace(state=SimpleNamespace(config=config)))
+        return setup
+
+    cases = [
+        ("sync_fstring", submit_fstring, setup_sync),
+        ("queue_fstring", submit_fstring, queued()),
+        ("queue_lazy", submit_lazy, queued()),
+        ("queue_lazy_json", submit_lazy, queued(json_output=True)),
+        ("rate_limited", submit_lazy, queued(rate_limit=args.rate_limit)),
+    ]
+    results = [run_case(name, calls, args.requests, args.rounds, setup) for name, calls, setup in cases]
+
+    print(f"📦 요청 {args.requests}회 × {args.rounds}회차 (게임 결과 제출 경로의 로그 호출)")
+    print(f"{'case':<18} {'µs/요청':>9} {'큐 비우기 ms':>12} {'줄/요청':>8} {'버림':>8}")
+    for result in results:
+        print(f"{result['name']:<18} {result['us_per_request']:>9.2f} {result['drain_ms']:>12.1f} "
+              f"{result['lines_per_request']:>8.2f} {result['dropped']:>8}")
+
+    current = next(result for result in results if result["name"] == "queue_lazy")
+    if current["us_per_request"] > args.budget_us:
+        print(f"❌ 요청당 로깅 시간이 예산({args.budget_us}µs)을 넘었습니다.")
+        sys.exit(1)
+    print(f"✅ 예산({args.budget_us}µs) 이내")
+
+if __name__ == "__main__":
+    main()
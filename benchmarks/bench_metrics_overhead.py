@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+메트릭 수집 오버헤드 벤치마크
+요청 경로에 추가되는 비용을 측정하고 예산을 넘으면 종료 코드 1로 끝납니다 (CI 회귀 확인용).
+
+측정 항목:
+- MetricsMiddleware: 빈 ASGI 앱 호출 대비 요청당 추가 시간
+- DB 이벤트 훅: SQLite 메모리 DB의 SELECT 1 대비 쿼리당 추가 시간
+- Histogram.observe / track_dependency 단일 호출 시간
+
+사용법:
+    python benchmarks/bench_metrics_overhead.py --requests 20000 --budget-us 30
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# app 패키지 임포트 시 엔진이 생성되므로 DB 설정이 없으면 임시 SQLite 파일 사용
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'story-bench.db')}")
+
+from sqlalchemy import create_engine, text
+from app.utils.metrics import HTTP_REQUEST_DURATION, MetricsMiddleware, instrument_engine, track_dependency
+
+class _Route:
+    path_format = "/api/v0/stories/{story_id}"
+
+async def endpoint(scope, receive, send):
+    # 라우터가 하는 것처럼 scope에 라우트 기록
+    scope["route"] = _Route()
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b'{"results":null,"error":null}'})
+
+def per_request_us(app, count: int, rounds: int = 5) -> float:
+    """요청당 시간 중앙값 (마이크로초)"""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    async def run():
+        for _ in range(count):
+            scope = {"type": "http", "method": "GET", "path": "/api/v0/stories/1", "headers": []}
+            await app(scope, receive, send)
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(run())  # 워밍업
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            loop.run_until_complete(run())
+            timings.append((time.perf_counter() - started) / count * 1e6)
+    finally:
+        loop.close()
+    return statistics.median(timings)
+
+def per_query_us(instrumented: bool, count: int, rounds: int = 5) -> float:
+    """SELECT 1 한 번의 시간 중앙값 (마이크로초)"""
+    engine = create_engine("sqlite://")
+    if instrumented:
+        instrument_engine(engine)
+    with engine.connect() as conn:
+        statement = text("SELECT 1")
+        conn.execute(statement)
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for _ in range(count):
+                conn.execute(statement)
+            timings.append((time.perf_counter() - started) / count * 1e6)
+    return statistics.median(timings)
+
+def per_call_ns(func, count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - started) / count * 1e9
+
+def main():
+    parser = argparse.ArgumentParser(description="메트릭 수집 오버헤드 벤치마크")
+    parser.add_argument("--requests", type=int, default=20000, help="측정 요청/쿼리 수")
+    parser.add_argument("--budget-us", type=float, default=30.0, help="요청당 허용 오버헤드 (마이크로초)")
+    args = parser.parse_args()
+
+    bare = per_request_us(endpoint, args.requests)
+    instrumented = per_request_us(MetricsMiddleware(endpoint), args.requests)
+    middleware_overhead = instrumented - bare
+    print(f"📦 요청 {args.requests}회")
+    print(f"   미들웨어 없음: {bare:6.2f}µs/요청 | 있음: {instrumented:6.2f}µs/요청 | 오버헤드 {middleware_overhead:6.2f}µs")
+
+    plain_query = per_query_us(False, args.requests)
+    hooked_query = per_query_us(True, args.requests)
+    query_overhead = hooked_query - plain_query
+    print(f"   SELECT 1 훅 없음: {plain_query:6.2f}µs/쿼리 | 있음: {hooked_query:6.2f}µs/쿼리 | 오버헤드 {query_overhead:6.2f}µs")
+
+    child = HTTP_REQUEST_DURATION.labels("GET", "/bench", 200)
+    print(f"   Histogram.observe: {per_call_ns(lambda: child.observe(0.012), args.requests):6.0f}ns")
+
+    def tracked():
+        with track_dependency("bench", "noop"):
+            pass
+    print(f"   track_dependency: {per_call_ns(tracked, args.requests):6.0f}ns")
+
+    if middleware_overhead > args.budget_us or query_overhead > args.budget_us:
+        print(f"❌ 오버헤드가 예산({args.budget_us}µs)을 넘었습니다.")
+        sys.exit(1)
+    print(f"✅ 예산({args.budget_us}µs) 이내")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+이야기 목록 응답 직렬화 벤치마크
+ORM 행 목록이 HTTP 응답 본문(bytes)이 되기까지의 시간과 힙 최대 사용량(tracemalloc)을 비교합니다.
+
+비교 대상:
+- legacy: 행마다 StoryResponse.model_validate(__dict__) → create_response → jsonable_encoder → JSONResponse
+- type_adapter: 캐시된 TypeAdapter(List[StoryResponse])로 일괄 검증 → dump_json
+- projection: serialize_story로 행을 dict로 변환 → FastJSONResponse (현재 구현)
+
+사용법:
+    python benchmarks/bench_serialization.py --rows 1000 --repeat 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import List
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# app 패키지 임포트 시 엔진이 생성되므로 DB 설정이 없으면 임시 SQLite 파일 사용
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'story-bench.db')}")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from app.common.response import create_response, create_json_response, orjson
+from app.helper.story_helper import serialize_story
+from app.models.story import Story
+from app.schemas.story import StoryResponse
+
+STORY_LIST_ADAPTER = TypeAdapter(List[StoryResponse])
+
+def make_stories(count: int) -> List[Story]:
+    """DB 없이 로드된 상태와 같은 Story 객체 생성"""
+    base_time = datetime(2024, 1, 1, 9, 0, 0)
+    stories = []
+    for index in range(count):
+        stories.append(Story(
+            id=index + 1,
+            user_id=index % 50 + 1,
+            title=f"추억 이야기 {index}",
+            content="어릴 적 살던 마을에는 큰 느티나무가 있었습니다. " * 8,
+            image_url=f"https://bucket.s3.ap-northeast-2.amazonaws.com/story-images/{index:064x}.jpg",
+            image_variants=None,
+            created_at=base_time + timedelta(minutes=index),
+            updated_at=base_time + timedelta(minutes=index, seconds=30)
+        ))
+    return stories
+
+def legacy(stories) -> bytes:
+    # FastAPI는 dict 반환값을 jsonable_encoder로 변환한 뒤 JSONResponse로 렌더링
+    content = create_response([StoryResponse.model_validate(story.__dict__) for story in stories])
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+def type_adapter(stories) -> bytes:
+    results = STORY_LIST_ADAPTER.validate_python([story.__dict__ for story in stories])
+    return b'{"results":' + STORY_LIST_ADAPTER.dump_json(results) + b',"error":null}'
+
+def projection(stories) -> bytes:
+    return create_json_response([serialize_story(story) for story in stories]).body
+
+def measure(func, stories, repeat: int):
+    func(stories)  # 워밍업
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = func(stories)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    func(stories)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak, len(body)
+
+def main():
+    parser = argparse.ArgumentParser(description="이야기 목록 직렬화 벤치마크")
+    parser.add_argument("--rows", type=int, default=1000, help="목록 행 수")
+    parser.add_argument("--repeat", type=int, default=50, help="측정 반복 횟수")
+    args = parser.parse_args()
+
+    stories = make_stories(args.rows)
+    print(f"📦 {args.rows}행, {args.repeat}회 반복 (orjson {'사용' if orjson else '없음 - 표준 json'})")
+
+    baseline = None
+    for name, func in [("legacy", legacy), ("type_adapter", type_adapter), ("projection", projection)]:
+        median, peak, size = measure(func, stories, args.repeat)
+        baseline = baseline or median
+        print(f"{name:>12}: 중앙값 {median * 1000:7.2f}ms (x{baseline / median:4.1f}) | "
+              f"힙 최대 {peak / 1024:8.1f}KB | 본문 {size / 1024:.1f}KB")
+
+if __name__ == "__main__":
+    main()
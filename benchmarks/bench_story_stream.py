@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+이야기 목록 스트리밍 벤치마크
+전체 목록을 메모리에 올린 뒤 응답하는 방식과 서버 측 커서로 스트리밍하는 방식을
+결과 크기별로 비교합니다.
+
+측정 항목:
+- 첫 바이트까지 걸린 시간 (스트리밍은 첫 청크, 기존 방식은 전체 본문 완성 시점)
+- 전체 전송 시간
+- 파이썬 힙 최대 사용량 (tracemalloc)
+
+사용법:
+    python benchmarks/bench_story_stream.py --rows 1000 10000 50000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# app 패키지 임포트 시 엔진이 생성되므로 DB 설정이 없으면 임시 SQLite 파일 사용
+BENCH_DB_PATH = os.path.join(tempfile.gettempdir(), 'story-bench-stream.db')
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{BENCH_DB_PATH}")
+
+from app.common.response import create_json_response, create_ndjson_response
+from app.database import SessionLocal, engine, init_db
+from app.helper.story_helper import iter_story_records, query_story_list, serialize_story_list
+from app.models.story import Story
+
+def seed(rows: int):
+    """벤치마크용 이야기 rows개 준비 (기존 데이터 삭제)"""
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(Story.__table__.delete())
+        conn.execute(Story.__table__.insert(), [
+            {"user_id": 1, "title": f"추억 이야기 {index}", "content": "어릴 적 살던 마을 이야기입니다. " * 30}
+            for index in range(rows)
+        ])
+
+def materialized():
+    """기존 방식: .all()로 전체 조회 후 응답 본문 생성"""
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        stories = query_story_list(db).filter(Story.user_id == 1).order_by(Story.id).all()
+        body = create_json_response(serialize_story_list(stories)).body
+        first_byte = time.perf_counter() - started
+        return first_byte, first_byte, len(body)
+    finally:
+        db.close()
+
+def streaming():
+    """현재 방식: yield_per 배치로 읽으며 NDJSON 청크 전송"""
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        query = query_story_list(db).filter(Story.user_id == 1).order_by(Story.id)
+        response = create_ndjson_response(iter_story_records(db, query))
+        first_byte = None
+        size = 0
+        # StreamingResponse는 동기 이터레이터를 스레드 풀에서 순회하는 비동기 이터레이터로 감쌈
+        async def consume():
+            nonlocal first_byte, size
+            async for chunk in response.body_iterator:
+                if first_byte is None:
+                    first_byte = time.perf_counter() - started
+                size += len(chunk)
+        asyncio.run(consume())
+        return first_byte, time.perf_counter() - started, size
+    finally:
+        db.close()
+
+def measure(func):
+    tracemalloc.start()
+    first_byte, total, size = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first_byte, total, size, peak
+
+def main():
+    parser = argparse.ArgumentParser(description="이야기 목록 스트리밍 벤치마크")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 50000], help="결과 행 수")
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        seed(rows)
+        print(f"📦 {rows}행")
+        for name, func in [("materialized", materialized), ("streaming", streaming)]:
+            first_byte, total, size, peak = measure(func)
+            print(f"{name:>14}: 첫 바이트 {first_byte * 1000:8.1f}ms | 전체 {total * 1000:8.1f}ms | "
+                  f"힙 최대 {peak / 1024 / 1024:7.2f}MB | 본문 {size / 1024 / 1024:.1f}MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+이미지 업로드 벤치마크
+기존 방식(바이트 이어 붙이기 + 이벤트 루프에서 put_object)과
+현재 방식(스풀 파일 스트리밍 + 스레드 풀 upload_fileobj)을 로컬 S3 대역으로 비교합니다.
+
+측정 항목:
+- 업로드 1건당 파이썬 힙 최대 사용량 (tracemalloc)
+- 동시 업로드 중 이벤트 루프 지연 (10ms 주기 타이머의 최대/평균 지연)
+
+사용법:
+    python benchmarks/bench_upload.py --size-mb 5 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# app 패키지 임포트 시 엔진이 생성되므로 DB 설정이 없으면 임시 SQLite 파일 사용
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'story-bench.db')}")
+
+from starlette.datastructures import UploadFile
+from app.core.s3_service import S3Service
+
+class LocalS3Client:
+    """네트워크 전송을 흉내 내는 로컬 S3 대역 (boto3처럼 블로킹 호출)"""
+
+    def __init__(self, mb_per_second: float = 50.0):
+        self.seconds_per_byte = 1.0 / (mb_per_second * 1024 * 1024)
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body, ContentType=None, **kwargs):
+        time.sleep(len(Body) * self.seconds_per_byte)
+        self.objects[Key] = len(Body)
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None, Config=None, **kwargs):
+        size = 0
+        while chunk := Fileobj.read(1024 * 1024):
+            size += len(chunk)
+            time.sleep(len(chunk) * self.seconds_per_byte)
+        self.objects[Key] = size
+
+def make_upload_file(payload: bytes) -> UploadFile:
+    """Starlette 멀티파트 파서와 같은 방식으로 스풀 파일에 담긴 UploadFile 생성"""
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spooled.write(payload)
+    spooled.seek(0)
+    return UploadFile(file=spooled, filename="photo.jpg", headers={"content-type": "image/jpeg"})
+
+async def legacy_upload(s3_service: S3Service, upload: UploadFile):
+    """기존 구현: 8KB 청크를 bytes에 이어 붙인 뒤 루프 스레드에서 put_object"""
+    file_content = b""
+    while chunk := await upload.read(8192):
+        file_content += chunk
+    s3_service.s3_client.put_object(Bucket=s3_service.bucket_name, Key="legacy", Body=file_content)
+
+async def streaming_upload(s3_service: S3Service, upload: UploadFile):
+    """현재 구현: 크기만 확인하며 읽고 스풀 파일을 스레드 풀에서 스트리밍 업로드"""
+    while await upload.read(64 * 1024):
+        pass
+    await upload.seek(0)
+    await s3_service.upload_fileobj_async(upload.file, "jpg")
+
+async def measure_memory(upload_func, s3_service, payload: bytes) -> int:
+    upload = make_upload_file(payload)
+    tracemalloc.start()
+    await upload_func(s3_service, upload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    await upload.close()
+    return peak
+
+async def measure_loop_lag(upload_func, s3_service, payload: bytes, concurrency: int):
+    lags = []
+    stop = asyncio.Event()
+
+    async def ticker():
+        interval = 0.01
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - started - interval)
+
+    ticker_task = asyncio.create_task(ticker())
+    uploads = [make_upload_file(payload) for _ in range(concurrency)]
+    started = time.perf_counter()
+    await asyncio.gather(*(upload_func(s3_service, upload) for upload in uploads))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker_task
+    for upload in uploads:
+        await upload.close()
+    return elapsed, max(lags) if lags else 0.0, statistics.mean(lags) if lags else 0.0
+
+async def main():
+    parser = argparse.ArgumentParser(description="이미지 업로드 벤치마크")
+    parser.add_argument("--size-mb", type=float, default=5.0, help="업로드 파일 크기 (MB)")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 업로드 수")
+    parser.add_argument("--bandwidth", type=float, default=200.0, help="S3 대역 전송 속도 (MB/s)")
+    args = parser.parse_args()
+
+    s3_service = S3Service()
+    s3_service.s3_client = LocalS3Client(args.bandwidth)
+    payload = os.urandom(int(args.size_mb * 1024 * 1024))
+
+    print(f"📦 파일 크기 {args.size_mb}MB, 동시 업로드 {args.concurrency}건, "
+          f"업로드 스레드 {s3_service.upload_concurrency}개")
+    for name, upload_func in [("legacy", legacy_upload), ("streaming", streaming_upload)]:
+        peak = await measure_memory(upload_func, s3_service, payload)
+        elapsed, max_lag, avg_lag = await measure_loop_lag(upload_func, s3_service, payload, args.concurrency)
+        print(f"{name:>10}: 업로드당 힙 최대 {peak / 1024 / 1024:6.2f}MB | "
+              f"전체 {elapsed:6.2f}s | 루프 지연 최대 {max_lag * 1000:7.1f}ms, 평균 {avg_lag * 1000:6.1f}ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
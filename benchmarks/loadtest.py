@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+주요 엔드포인트 부하 테스트
+create_app으로 만든 앱을 로컬 SQLite(기본값) 또는 PostgreSQL에 붙이고, 외부 서비스는 대역으로 대체해
+자주 호출되는 경로를 동시 요청으로 실행합니다.
+
+대역:
+- User Service: 별도 스레드의 uvicorn 서버 (실제 HTTP 호출, 모든 사용자는 보호자 2명을 둔 시니어)
+- OpenAI: 문장 분리 대역 (--openai-latency-ms 만큼 블로킹 대기, 실제 서비스처럼 이벤트 루프를 막음)
+- S3: head_object만 응답하는 로컬 클라이언트 (--s3-latency-ms 만큼 대기)
+
+측정 항목 (시나리오별):
+- 지연 p50/p95/p99, 처리량(요청/초), 오류 수
+- 요청당 SQL 문 수
+- 프로세스 최대 RSS
+
+기준선 비교:
+- --save-baseline: 결과를 기준선 JSON으로 저장
+- --baseline: 기준선과 비교해 p95/처리량/요청당 SQL 수가 --threshold 이상 나빠지면 종료 코드 1
+
+사용법:
+    python benchmarks/loadtest.py --requests 500 --concurrency 16 --save-baseline benchmarks/baseline-sqlite.json
+    python benchmarks/loadtest.py --requests 500 --concurrency 16 --baseline benchmarks/baseline-sqlite.json
+    DATABASE_URL=postgresql://... python benchmarks/loadtest.py --scenarios story_list random_segment
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# app 패키지 임포트 시 엔진이 생성되므로 DB 설정이 없으면 새 임시 SQLite 파일 사용
+BENCH_DB_PATH = os.path.join(tempfile.gettempdir(), 'story-loadtest.db')
+if "DATABASE_URL" not in os.environ:
+    if os.path.exists(BENCH_DB_PATH):
+        os.remove(BENCH_DB_PATH)
+    os.environ["DATABASE_URL"] = f"sqlite:///{BENCH_DB_PATH}"
+os.environ.setdefault("SECRET_KEY", "loadtest-secret-key-0123456789abcdef")
+# 실제 외부 서비스로 나가지 않도록 자격 증명 제거
+os.environ.pop("OPENAI_API_KEY", None)
+os.environ.pop("AWS_ACCESS_KEY_ID", None)
+os.environ.pop("AWS_SECRET_ACCESS_KEY", None)
+
+import httpx
+import jwt
+import uvicorn
+from fastapi import FastAPI
+from sqlalchemy import event
+
+GUARDIANS_PER_SENIOR = 2
+SCENARIO_NAMES = (
+    "story_list", "random_segment", "sentence_random",
+    "submit_result", "personalized_recommendation", "story_create",
+)
+SAMPLE_SENTENCES = [
+    "어릴 적 살던 집 앞에는 큰 감나무가 있었다.",
+    "가을이면 형제들과 함께 감을 따서 처마 밑에 매달았다.",
+    "어머니는 곶감이 다 마르면 제사상에 올리셨다.",
+    "겨울 밤에는 화롯불에 고구마를 구워 먹었다.",
+    "그 시절 동네 아이들은 해가 질 때까지 골목에서 놀았다.",
+    "아버지는 장날마다 읍내에 다녀오시며 사탕을 사 오셨다.",
+]
+
+# ---------------------------------------------------------------------------
+# 외부 서비스 대역
+# ---------------------------------------------------------------------------
+
+def create_user_service_stub() -> FastAPI:
+    """User Service 대역 (사용자 조회, 보호자 목록)"""
+    stub = FastAPI()
+
+    @stub.get("/users/{user_id}")
+    async def get_user(user_id: int):
+        return {"id": user_id, "role": "senior", "name": f"user-{user_id}"}
+
+    @stub.get("/users/{user_id}/guardians")
+    async def get_guardians(user_id: int):
+        return [{"id": user_id * 100 + index} for index in range(1, GUARDIANS_PER_SENIOR + 1)]
+
+    return stub
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_user_service_stub() -> str:
+    """User Service 대역을 별도 스레드에서 실행하고 기본 URL 반환"""
+    port = get_free_port()
+    server = uvicorn.Server(uvicorn.Config(create_user_service_stub(), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="user-service-stub", daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}"
+
+class StubOpenAIService:
+    """OpenAI 문장 분리 대역 (동기 호출 지연 재현)"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def split_story_into_segments(self, content: str):
+        if self.latency:
+            time.sleep(self.latency)
+        return [sentence.strip() + "." for sentence in content.split(".") if sentence.strip()]
+
+class LocalS3Client:
+    """head_object만 응답하는 로컬 S3 대역 (파생 이미지가 모두 있는 것으로 응답)"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def head_object(self, Bucket, Key, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return {"ContentLength": 1024, "ContentType": "image/webp", "ETag": '"stub"'}
+
+# ---------------------------------------------------------------------------
+# 앱 준비
+# ---------------------------------------------------------------------------
+
+def create_bench_app(args):
+    """대역을 연결한 앱 생성"""
+    os.environ["USER_SERVICE_URL"] = start_user_service_stub()
+    from app import create_app
+    from app.core.s3_service import S3Service
+
+    from app.database import check_schema
+
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        app = create_app("development")
+    # 요청마다 남는 INFO/DEBUG 로그는 측정에서 제외
+    logging.getLogger().setLevel(logging.WARNING)
+    # ASGITransport는 startup 이벤트(워밍업)를 실행하지 않으므로 스키마를 직접 준비
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        check_schema(auto_create=True)
+
+    app.state.openai_service = StubOpenAIService(args.openai_latency_ms / 1000)
+    s3_service = S3Service()
+    s3_service.s3_client = LocalS3Client(args.s3_latency_ms / 1000)
+    app.state.s3_service = s3_service
+    return app
+
+def make_token(user_id: int) -> str:
+    return jwt.encode({"sub": str(user_id)}, os.environ["SECRET_KEY"], algorithm="HS256")
+
+def make_story_payload(index: int, s3_service) -> dict:
+    sentences = random.sample(SAMPLE_SENTENCES, 4)
+    payload = {"title": f"추억 {index}", "content": " ".join(sentences)}
+    # 절반은 이미지가 있는 이야기 (파생 이미지 조회 경로 포함)
+    if index % 2 == 0:
+        payload["image_url"] = s3_service.get_object_url(f"story-images/loadtest-{index}.jpg")
+    return payload
+
+class SqlCounter:
+    """엔진에서 실행된 SQL 문 수 (시나리오는 순서대로 실행하므로 전역 카운터로 충분)"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args, **kwargs):
+        self.count += 1
+
+async def seed(client: httpx.AsyncClient, app, args, tokens):
+    """사용자별 이야기와 게임 결과 준비 (API를 통해 생성)"""
+    story_ids = {}
+    for user_id, token in tokens.items():
+        headers = {"Authorization": f"Bearer {token}"}
+        for index in range(args.stories_per_user):
+            response = await client.post("/api/v0/stories/", headers=headers,
+                                         json=make_story_payload(index, app.state.s3_service))
+            response.raise_for_status()
+            story_ids.setdefault(user_id, []).append(response.json()["results"]["id"])
+        for index in range(args.results_per_user):
+            await client.post("/api/v0/difficulty/submit-result-with-difficulty", headers=headers, json={
+                "user_id": user_id, "game_type": "SENTENCE_SEQUENCE",
+                "story_id": story_ids[user_id][0], "is_correct": index % 3 != 0, "response_time": 12.5
+            })
+    return story_ids
+
+# ---------------------------------------------------------------------------
+# 시나리오
+# ---------------------------------------------------------------------------
+
+def build_scenarios(app, story_ids):
+    """시나리오 이름 → (user_id, 요청 번호)로 httpx 요청 인자를 만드는 함수"""
+    def story_create(user_id, index):
+        return "POST", "/api/v0/stories/", make_story_payload(index, app.state.s3_service)
+
+    def submit_result(user_id, index):
+        return "POST", "/api/v0/difficulty/submit-result-with-difficulty", {
+            "user_id": user_id,
+            "game_type": random.choice(["SENTENCE_SEQUENCE", "WORD_SEQUENCE"]),
+            "story_id": random.choice(story_ids[user_id]),
+            "is_correct": random.random() < 0.7,
+            "response_time": round(random.uniform(3, 30), 2)
+        }
+
+    return {
+        "story_list": lambda user_id, index: ("GET", "/api/v0/stories/?limit=20", None),
+        "random_segment": lambda user_id, index: ("GET", "/api/v0/stories/segments/random", None),
+        "sentence_random": lambda user_id, index: ("GET", "/api/v0/stories/segments/sentence/random", None),
+        "submit_result": submit_result,
+        "personalized_recommendation": lambda user_id, index: (
+            "GET", "/api/v0/personalization/personalized-recommendation", None
+        ),
+        "story_create": story_create,
+    }
+
+def percentile(sorted_values, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def get_max_rss_mb() -> float:
+    # Linux는 KB, macOS는 바이트 단위
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+async def run_scenario(client, build_request, tokens, requests: int, concurrency: int, sql_counter: SqlCounter):
+    """requests개 요청을 concurrency개 작업자로 실행"""
+    user_ids = list(tokens)
+    latencies = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            user_id = user_ids[index % len(user_ids)]
+            method, path, body = build_request(user_id, index)
+            started = time.perf_counter()
+            response = await client.request(method, path, json=body,
+                                            headers={"Authorization": f"Bearer {tokens[user_id]}"})
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    sql_before = sql_counter.count
+    started = time.perf_counter()
+    # 앱이 요청마다 출력하는 print는 측정 결과와 섞이지 않도록 버림
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "rps": round(requests / elapsed, 1),
+        "sql_per_request": round((sql_counter.count - sql_before) / requests, 2),
+        "max_rss_mb": round(get_max_rss_mb(), 1),
+    }
+
+# ---------------------------------------------------------------------------
+# 기준선 비교
+# ---------------------------------------------------------------------------
+
+def compare_with_baseline(results: dict, baseline: dict, threshold: float):
+    """기준선 대비 threshold 이상 나빠진 항목 목록"""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms → {current['p95_ms']}ms")
+        if current["rps"] < previous["rps"] * (1 - threshold):
+            regressions.append(f"{name}: 처리량 {previous['rps']} → {current['rps']} req/s")
+        # SQL 수는 실행 환경과 무관하므로 소수점 오차만 허용
+        if current["sql_per_request"] > previous["sql_per_request"] + 0.5:
+            regressions.append(f"{name}: 요청당 SQL {previous['sql_per_request']} → {current['sql_per_request']}")
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{name}: 오류 {previous['errors']} → {current['errors']}")
+    return regressions
+
+async def run(args):
+    app = create_bench_app(args)
+    from app.database import engine
+    sql_counter = SqlCounter(engine)
+
+    user_ids = list(range(1, args.users + 1))
+    tokens = {user_id: make_token(user_id) for user_id in user_ids}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        print(f"🌱 데이터 준비 중... (사용자 {args.users}명 × 이야기 {args.stories_per_user}개, DB {engine.dialect.name})")
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            story_ids = await seed(client, app, args, tokens)
+
+        scenarios = build_scenarios(app, story_ids)
+        selected = args.scenarios or SCENARIO_NAMES
+        results = {
+            "environment": {
+                "database": engine.dialect.name,
+                "python": platform.python_version(),
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "users": args.users,
+                "stories_per_user": args.stories_per_user,
+                "openai_latency_ms": args.openai_latency_ms,
+                "s3_latency_ms": args.s3_latency_ms,
+            },
+            "scenarios": {},
+        }
+
+        print(f"🚀 요청 {args.requests}회 × 동시 {args.concurrency}")
+        print(f"{'scenario':<28}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'SQL/req':>9}{'errors':>7}{'RSS MB':>9}")
+        for name in selected:
+            build_request = scenarios[name]
+            # 워밍업 (연결 풀, 쿼리 컴파일 캐시)
+            await run_scenario(client, build_request, tokens, args.warmup, min(args.concurrency, args.warmup), sql_counter)
+            result = await run_scenario(client, build_request, tokens, args.requests, args.concurrency, sql_counter)
+            results["scenarios"][name] = result
+            print(f"{name:<28}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+                  f"{result['rps']:>9.1f}{result['sql_per_request']:>9.2f}{result['errors']:>7}{result['max_rss_mb']:>9.1f}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"💾 기준선 저장: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("environment", {}).get("database") != results["environment"]["database"]:
+            print("⚠️ 기준선과 데이터베이스 종류가 다릅니다. 비교 결과를 신중히 해석하세요.")
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ 기준선 대비 회귀 ({args.threshold:.0%} 초과):")
+            for regression in regressions:
+                print(f"   - {regression}")
+            sys.exit(1)
+        print(f"✅ 기준선 대비 회귀 없음 (허용 {args.threshold:.0%})")
+
+def main():
+    parser = argparse.ArgumentParser(description="주요 엔드포인트 부하 테스트")
+    parser.add_argument("--requests", type=int, default=300, help="시나리오별 측정 요청 수")
+    parser.add_argument("--warmup", type=int, default=20, help="시나리오별 워밍업 요청 수")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 요청 수")
+    parser.add_argument("--users", type=int, default=10, help="사용자 수")
+    parser.add_argument("--stories-per-user", type=int, default=20, help="사용자별 이야기 수")
+    parser.add_argument("--results-per-user", type=int, default=10, help="사용자별 사전 게임 결과 수")
+    parser.add_argument("--openai-latency-ms", type=float, default=0.0, help="OpenAI 대역 응답 지연")
+    parser.add_argument("--s3-latency-ms", type=float, default=0.0, help="S3 대역 응답 지연")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIO_NAMES, default=None, help="실행할 시나리오 (기본값: 전체)")
+    parser.add_argument("--baseline", help="비교할 기준선 JSON 경로")
+    parser.add_argument("--save-baseline", help="결과를 기준선 JSON으로 저장할 경로")
+    parser.add_argument("--threshold", type=float, default=0.2, help="허용 회귀 비율 (기본값: 0.2 = 20%%)")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드")
+    args = parser.parse_args()
+    random.seed(args.seed)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
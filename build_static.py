@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+정적 자산 빌드 스크립트
+static/<앱>/app.js, style.css를 내용 해시가 붙은 파일명으로 static/dist/<앱>/에 복사하고
+.gz/.br 압축본과 해시 파일명을 참조하도록 고친 index.html, manifest.json을 생성합니다.
+
+서버는 static/dist/가 있으면 빌드된 index.html을 제공하고, 해시 파일은 immutable 캐시로 전송합니다.
+
+사용법:
+    python build_static.py                  # static/ 전체 빌드
+    python build_static.py --apps elderly   # 특정 앱만 빌드
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_URL = "/static"
+# app/common/static_files.py의 DIST_DIR과 동일 (이미지 빌드 시 DB 설정 없이 실행하도록 app을 임포트하지 않음)
+DIST_DIR = "dist"
+ASSET_NAMES = ("app.js", "style.css")
+HASH_LENGTH = 10
+ASSET_REFERENCE_PATTERN = re.compile(r'(href|src)="([^"]+)"')
+
+def fingerprint(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+
+def write_compressed(path: str, content: bytes):
+    """최고 압축 수준으로 .gz/.br 압축본 생성 (빌드 시 한 번만 수행)"""
+    with open(f"{path}.gz", "wb") as f:
+        # mtime 고정으로 같은 입력이면 같은 결과물
+        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli:
+        with open(f"{path}.br", "wb") as f:
+            f.write(brotli.compress(content, quality=11, mode=brotli.MODE_TEXT))
+
+def build_app(app_name: str, dist_dir: str) -> dict:
+    """앱 하나의 자산 빌드, {원본 경로: 해시 경로} 반환 (static/ 기준)"""
+    source_dir = os.path.join(STATIC_DIR, app_name)
+    target_dir = os.path.join(dist_dir, app_name)
+    os.makedirs(target_dir, exist_ok=True)
+
+    manifest = {}
+    for asset_name in ASSET_NAMES:
+        source_path = os.path.join(source_dir, asset_name)
+        if not os.path.exists(source_path):
+            continue
+        with open(source_path, "rb") as f:
+            content = f.read()
+        stem, extension = os.path.splitext(asset_name)
+        hashed_name = f"{stem}.{fingerprint(content)}{extension}"
+        target_path = os.path.join(target_dir, hashed_name)
+        with open(target_path, "wb") as f:
+            f.write(content)
+        write_compressed(target_path, content)
+        manifest[f"{app_name}/{asset_name}"] = f"{DIST_DIR}/{app_name}/{hashed_name}"
+        print(f"   - {app_name}/{asset_name} → {hashed_name} ({len(content) / 1024:.1f}KB)")
+
+    index_path = os.path.join(source_dir, "index.html")
+    if os.path.exists(index_path):
+        with open(index_path, "r", encoding="utf-8") as f:
+            html = f.read()
+
+        def replace_reference(match):
+            reference = match.group(2)
+            # 상대 경로(style.css)와 절대 경로(/static/admin/style.css) 모두 처리
+            if reference.startswith(f"{STATIC_URL}/"):
+                logical_path = reference[len(STATIC_URL) + 1:]
+            else:
+                logical_path = f"{app_name}/{reference.removeprefix('./')}"
+            if logical_path not in manifest:
+                return match.group(0)
+            return f'{match.group(1)}="{STATIC_URL}/{manifest[logical_path]}"'
+
+        html = ASSET_REFERENCE_PATTERN.sub(replace_reference, html)
+        with open(os.path.join(target_dir, "index.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+        write_compressed(os.path.join(target_dir, "index.html"), html.encode("utf-8"))
+
+    return manifest
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="정적 자산 빌드")
+    parser.add_argument("--apps", nargs="+", default=None, help="빌드할 앱 (기본값: static/ 아래 전체)")
+    args = parser.parse_args()
+
+    apps = args.apps or sorted(
+        name for name in os.listdir(STATIC_DIR)
+        if name != DIST_DIR and os.path.isdir(os.path.join(STATIC_DIR, name))
+    )
+
+    dist_dir = os.path.join(STATIC_DIR, DIST_DIR)
+    # 이전 해시 파일이 쌓이지 않도록 새로 생성
+    if os.path.exists(dist_dir):
+        shutil.rmtree(dist_dir)
+
+    print(f"🔨 정적 자산 빌드 중... (brotli {'사용' if brotli else '없음 - .gz만 생성'})")
+    manifest = {}
+    for app_name in apps:
+        manifest.update(build_app(app_name, dist_dir))
+
+    with open(os.path.join(dist_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    print(f"✅ 빌드 완료: {len(manifest)}개 자산 → {dist_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+고아 이미지 정리 스크립트
+어떤 이야기도 참조하지 않는 story-images/ 객체(원본 + 파생 이미지)를 찾아 일괄 삭제합니다.
+기본은 드라이런(보고서만 출력)이며, --delete를 지정해야 실제로 삭제합니다.
+
+사용법:
+    python cleanup_orphan_images.py                      # 드라이런
+    python cleanup_orphan_images.py --delete             # 삭제
+    python cleanup_orphan_images.py --grace-hours 72     # 최근 72시간 업로드는 보존
+"""
+
+import argparse
+import os
+import sys
+from dotenv import load_dotenv
+
+# 환경변수 로드
+load_dotenv()
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.s3_service import S3Service
+from app.core.image_gc import ImageGarbageCollector
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="고아 이미지 정리")
+    parser.add_argument("--delete", action="store_true", help="보고서만 출력하지 않고 실제로 삭제")
+    parser.add_argument("--grace-hours", type=int, default=None, help="최근 업로드 보존 시간 (기본값: IMAGE_GC_GRACE_HOURS)")
+    args = parser.parse_args()
+
+    try:
+        s3_service = S3Service()
+        if not s3_service.s3_client:
+            print("❌ S3 클라이언트를 초기화할 수 없습니다. AWS 설정을 확인하세요.")
+            sys.exit(1)
+
+        image_gc = ImageGarbageCollector()
+        image_gc.s3_service = s3_service
+
+        mode = "삭제" if args.delete else "드라이런"
+        print(f"🔍 고아 이미지 검색 중... ({mode}, 버킷: {s3_service.bucket_name})")
+        report = image_gc.collect(dry_run=not args.delete, grace_hours=args.grace_hours)
+
+        print(f"📊 검사한 객체: {report['scanned']}개")
+        print(f"📊 참조 중: {report['referenced']}개 / 유예 시간 내 업로드: {report['recent']}개")
+        print(f"🗑️ 고아 이미지: {report['orphaned']}개 ({report['orphaned_bytes'] / 1024 / 1024:.2f}MB)")
+        for key in report['sample']:
+            print(f"   - {key}")
+
+        if args.delete:
+            print(f"✅ 삭제 완료: {report['deleted']}개 (삭제 직전 재연결되어 보존: {report['kept']}개)")
+            if report['errors']:
+                print(f"⚠️ 삭제 실패: {len(report['errors'])}개")
+                for error in report['errors'][:20]:
+                    print(f"   - {error['key']}: {error['error']}")
+        else:
+            print("\n💡 실제로 삭제하려면 --delete 옵션을 사용하세요.")
+
+    except Exception as e:
+        print(f"\n💥 오류 발생: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
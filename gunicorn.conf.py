@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+운영용 gunicorn 설정 (uvicorn 워커 여러 개, uvloop + httptools)
+개발 환경은 기존처럼 python story_manage.py 또는 start.sh의 reload 모드를 사용합니다.
+
+사용법:
+    gunicorn -c gunicorn.conf.py story_manage:app
+    WEB_CONCURRENCY=4 DB_CONNECTION_BUDGET=40 gunicorn -c gunicorn.conf.py story_manage:app
+
+    kill -HUP <master pid>    # 워커를 새로 띄우고 기존 워커는 처리 중인 요청을 마친 뒤 종료
+    kill -USR2 <master pid>   # 새 코드로 마스터까지 교체 (이후 기존 마스터에 WINCH, QUIT)
+"""
+
+import importlib.util
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '8011')}")
+
+# 앱(app.database)을 임포트하면 그 시점의 WEB_CONCURRENCY로 풀 크기가 정해지므로 워커 수를 정하기 전에는 임포트하지 않음
+# app.database의 DEFAULT_DB_CONNECTION_BUDGET, MIN_WORKER_CONNECTIONS와 같은 값
+DEFAULT_DB_CONNECTION_BUDGET = 15
+MIN_WORKER_CONNECTIONS = 4
+db_connection_budget = int(os.getenv("DB_CONNECTION_BUDGET") or 0) or DEFAULT_DB_CONNECTION_BUDGET
+
+# 비동기 워커이므로 CPU 코어당 워커 1개, 단 기본값은 연결 예산으로 워커마다 최소 연결을 줄 수 있는 수까지
+# (WEB_CONCURRENCY로 지정 가능)
+workers = int(os.getenv("WEB_CONCURRENCY") or max(
+    1, min(multiprocessing.cpu_count(), db_connection_budget // MIN_WORKER_CONNECTIONS)
+))
+# 앱을 미리 로드하기 전에 워커 수를 알려 database.py가 워커당 연결 풀 크기를 예산에서 나누도록 함
+os.environ["WEB_CONCURRENCY"] = str(workers)
+# uvicorn 워커는 uvloop/httptools가 설치되어 있으면 자동으로 사용 (requirements.txt에 포함)
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# 마스터에서 앱을 한 번 로드한 뒤 포크 (워커 시작이 빠르고 공유 메모리 절약)
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+# 응답 없는 워커 재시작 시간, 종료/재시작 시 처리 중인 요청을 기다리는 시간 (초)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# 요청 N개마다 워커 교체 (메모리 증가 방지, 0이면 사용 안 함), 동시에 교체되지 않도록 jitter
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+
+def when_ready(server):
+    from app.database import MIN_WORKER_CONNECTIONS as min_worker_connections, get_connection_budget, get_pool_settings
+    pool_size, max_overflow = get_pool_settings()
+    budget = get_connection_budget()
+    if (pool_size + max_overflow) * workers > budget:
+        server.log.warning(
+            f"DB_CONNECTION_BUDGET={budget} is too small for {workers} workers "
+            f"(at least {min_worker_connections} each); up to {(pool_size + max_overflow) * workers} connections may open. "
+            f"Raise DB_CONNECTION_BUDGET or lower WEB_CONCURRENCY."
+        )
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    server.log.info(
+        f"Story API ready: workers={workers}, loop={loop}, http={http}, preload={preload_app}, "
+        f"db_pool_per_worker={pool_size}+{max_overflow}"
+    )
+
+def post_fork(server, worker):
+    """미리 로드한 앱을 워커에서 쓰기 전 정리 (마스터의 DB 연결과 백그라운드 스레드(트레이스/로그 출력)는 상속되지 않음)"""
+    if not preload_app:
+        return
+    from app.database import engine
+    from app.utils.logger import Logger
+    from app.utils.tracing import tracer
+    # 마스터가 연 연결을 닫지 않고 버림 (같은 소켓을 여러 프로세스가 쓰지 않도록)
+    engine.dispose(close=False)
+    tracer.after_fork()
+    Logger.after_fork()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+기존 데이터베이스 스키마 보완 스크립트
+create_all은 이미 존재하는 테이블에 인덱스/컬럼을 추가하지 않으므로,
+새로 추가된 컬럼, 인덱스와 테이블을 기존 데이터를 보존하면서 반영합니다.
+"""
+
+import os
+import sys
+from dotenv import load_dotenv
+
+# 환경변수 로드
+load_dotenv()
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SCHEMA_VERSION, engine, get_schema_version, init_db, set_schema_version
+from app.helper.game_helper import backfill_skill_ratings
+from app.helper.story_helper import backfill_story_difficulty
+from app.utils.functions import EXCERPT_LENGTH
+from sqlalchemy import inspect, text
+
+# 기존 테이블에 추가할 컬럼 (테이블, 컬럼, 타입)
+REQUIRED_COLUMNS = [
+    ("stories", "image_variants", "JSON"),
+    ("stories", "segment_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("stories", "excerpt", "VARCHAR(100)"),
+    ("stories", "difficulty_rating", "FLOAT NOT NULL DEFAULT 1500"),
+    ("stories", "rating_deviation", "FLOAT NOT NULL DEFAULT 350"),
+    ("stories", "char_length", "INTEGER NOT NULL DEFAULT 0"),
+    ("stories", "avg_segment_words", "FLOAT NOT NULL DEFAULT 0"),
+    ("stories", "rare_word_ratio", "FLOAT NOT NULL DEFAULT 0"),
+    ("stories", "difficulty_score", "FLOAT NOT NULL DEFAULT 0"),
+    ("story_segments", "word_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("story_segments", "char_length", "INTEGER NOT NULL DEFAULT 0"),
+    ("story_segments", "difficulty_score", "FLOAT NOT NULL DEFAULT 0"),
+    ("stories", "rand_key", "FLOAT NOT NULL DEFAULT 0"),
+    ("story_segments", "rand_key", "FLOAT NOT NULL DEFAULT 0"),
+    ("user_difficulties", "skill_rating", "FLOAT NOT NULL DEFAULT 1500"),
+    ("user_difficulties", "rating_deviation", "FLOAT NOT NULL DEFAULT 350"),
+    ("user_difficulties", "rated_games", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+# 기존 테이블에 추가할 인덱스 (이름, 테이블, 컬럼)
+REQUIRED_INDEXES = [
+    ("ix_stories_updated_at_id", "stories", "updated_at, id"),
+    ("ix_stories_user_id_created_at_id", "stories", "user_id, created_at, id"),
+    ("ix_stories_user_id_difficulty_score_rand_key", "stories", "user_id, difficulty_score, rand_key"),
+    ("ix_story_segments_story_id_difficulty_score_rand_key", "story_segments", "story_id, difficulty_score, rand_key"),
+]
+
+# 새 인덱스로 대체되어 제거할 인덱스
+OBSOLETE_INDEXES = [
+    "ix_stories_user_id_difficulty_score",
+    "ix_story_segments_story_id_difficulty_score",
+]
+
+def add_missing_columns():
+    """필요한 컬럼 추가 (기존 데이터 유지)"""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table_name, column_name, column_type in REQUIRED_COLUMNS:
+            existing_columns = {column["name"] for column in inspector.get_columns(table_name)}
+            if column_name in existing_columns:
+                print(f"✅ {table_name}.{column_name} 컬럼이 이미 존재합니다.")
+                continue
+            print(f"➕ {table_name}.{column_name} 컬럼 추가 중...")
+            conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"))
+            print(f"✅ {table_name}.{column_name} 컬럼 추가 완료!")
+
+def create_missing_indexes():
+    """필요한 인덱스 추가"""
+    with engine.begin() as conn:
+        for index_name, table_name, columns in REQUIRED_INDEXES:
+            print(f"➕ {table_name}({columns}) 인덱스 확인 중...")
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({columns})"))
+            print(f"✅ {index_name} 인덱스 준비 완료!")
+        for index_name in OBSOLETE_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+            print(f"🗑️ {index_name} 인덱스 제거 완료!")
+
+# 키셋 비교용 시각 컬럼 (테이블, 컬럼), 앱은 마이크로초까지 기록
+KEYSET_TIMESTAMP_COLUMNS = [
+    ("stories", "created_at"),
+    ("stories", "updated_at"),
+    ("story_tombstones", "deleted_at"),
+]
+
+def normalize_sqlite_timestamps():
+    """
+    SQLite에서 CURRENT_TIMESTAMP로 기록된 초 단위 시각을 앱 저장 형식(마이크로초까지)으로 맞춤
+
+    키셋 비교를 문자열 그대로 하므로 형식이 섞여 있으면 같은 초의 행이 건너뛰어집니다.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    print("🔄 SQLite 시각 형식 정규화 중...")
+    with engine.begin() as conn:
+        for table_name, column_name in KEYSET_TIMESTAMP_COLUMNS:
+            result = conn.execute(text(
+                f"UPDATE {table_name} SET {column_name} = {column_name} || '.000000' "
+                f"WHERE length({column_name}) = 19"
+            ))
+            print(f"✅ {table_name}.{column_name} {result.rowcount}개 정규화 완료!")
+
+def normalize_postgres_timestamps():
+    """
+    PostgreSQL 서버 시계(now(), 세션 시간대)로 기록된 키셋 시각을 앱 저장 형식(UTC)으로 맞춤
+
+    앱이 UTC로 직접 기록하기 전(스키마 버전 2 미만)의 행은 모두 서버 시계로 기록되었으므로 그때 한 번만 변환합니다.
+    서버 시간대가 UTC가 아니면 이전 행과 새 행의 순서가 뒤바뀌어 변경 피드가 행을 건너뛰거나 반복합니다.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        version = get_schema_version(conn)
+        if version is not None and version >= 2:
+            print("✅ PostgreSQL 시각이 이미 UTC로 기록되어 있습니다.")
+            return
+        timezone = conn.execute(text("SELECT current_setting('TimeZone')")).scalar()
+        if timezone.upper() in ("UTC", "ETC/UTC", "GMT", "Z"):
+            print(f"✅ PostgreSQL 시간대가 {timezone}이므로 변환할 시각이 없습니다.")
+            return
+        print(f"🔄 PostgreSQL 시각 UTC 변환 중 ({timezone})...")
+        for table_name, column_name in KEYSET_TIMESTAMP_COLUMNS:
+            result = conn.execute(text(
+                f"UPDATE {table_name} SET {column_name} = "
+                f"({column_name} AT TIME ZONE current_setting('TimeZone')) AT TIME ZONE 'UTC' "
+                f"WHERE {column_name} IS NOT NULL"
+            ))
+            print(f"✅ {table_name}.{column_name} {result.rowcount}개 변환 완료!")
+        # 이후 단계에서 실패해 다시 실행해도 두 번 변환하지 않도록 같은 트랜잭션에서 버전 2 기록
+        set_schema_version(conn, 2)
+
+def backfill_story_summaries():
+    """목록 요약 보기 컬럼(excerpt, segment_count) 채우기"""
+    print("🔄 이야기 요약 컬럼 백필 중...")
+    with engine.begin() as conn:
+        result = conn.execute(text(f"""
+            UPDATE stories
+            SET excerpt = SUBSTR(content, 1, {EXCERPT_LENGTH}),
+                segment_count = (
+                    SELECT COUNT(*) FROM story_segments WHERE story_segments.story_id = stories.id
+                )
+            WHERE excerpt IS NULL
+        """))
+        print(f"✅ {result.rowcount}개 이야기 요약 컬럼 백필 완료!")
+
+def backfill_random_keys():
+    """동점 무작위 선택용 rand_key 채우기 (컬럼 추가 시 기본값 0인 행만)"""
+    print("🔄 rand_key 백필 중...")
+    if engine.dialect.name == "sqlite":
+        random_value = "(abs(random()) % 1000000000) / 1000000000.0"
+    else:
+        random_value = "random()"
+    with engine.begin() as conn:
+        for table_name in ("stories", "story_segments"):
+            result = conn.execute(text(f"UPDATE {table_name} SET rand_key = {random_value} WHERE rand_key = 0"))
+            print(f"✅ {table_name} {result.rowcount}개 rand_key 백필 완료!")
+
+def backfill_difficulty_settings_version():
+    """난이도 설정 버전 카운터 행 생성 (현재 최대 버전에서 시작)"""
+    with engine.begin() as conn:
+        result = conn.execute(text("""
+            INSERT INTO difficulty_settings_version (id, version)
+            SELECT 1, COALESCE(MAX(version), 0) FROM difficulty_settings
+            WHERE NOT EXISTS (SELECT 1 FROM difficulty_settings_version)
+        """))
+        if result.rowcount:
+            print("✅ 난이도 설정 버전 카운터 생성 완료!")
+        else:
+            print("✅ 난이도 설정 버전 카운터가 이미 존재합니다.")
+
+def backfill_puzzle_difficulty():
+    """퍼즐 난이도 특징/점수 채우기 (아직 계산되지 않은 이야기만)"""
+    print("🔄 이야기 난이도 특징 백필 중...")
+    summary = backfill_story_difficulty(engine)
+    print(f"✅ 이야기 {summary['stories']:,}개, 세그먼트 {summary['segments']:,}개 난이도 계산 완료! ({summary['seconds']}초)")
+
+def backfill_ratings():
+    """
+    실력/이야기 난이도 점수 백필 (기존 game_results를 시간순으로 한 번 스트리밍)
+
+    점수가 한 번도 계산되지 않았을 때만 실행합니다 (다시 계산하려면 BACKFILL_SKILL_RATINGS=true).
+    """
+    with engine.connect() as conn:
+        rated_users = conn.execute(text("SELECT COUNT(*) FROM user_difficulties WHERE rated_games > 0")).scalar()
+    if rated_users and os.environ.get("BACKFILL_SKILL_RATINGS", "false").lower() != "true":
+        print(f"✅ 실력 점수가 이미 계산되어 있습니다 ({rated_users}명).")
+        return
+    print("🔄 실력/이야기 난이도 점수 백필 중...")
+    summary = backfill_skill_ratings(engine)
+    print(f"✅ 게임 결과 {summary['games']:,}건 재생 완료! (사용자 {summary['users']:,}명, "
+          f"새 난이도 행 {summary['created_users']:,}개, 이야기 {summary['stories']:,}개, {summary['seconds']}초)")
+
+def main():
+    """메인 함수"""
+    try:
+        print("🔄 데이터베이스 스키마 보완 시작...")
+
+        # 1. 새 테이블 생성 (기존 테이블은 유지)
+        init_db()
+
+        # 2. 기존 테이블에 컬럼 추가
+        add_missing_columns()
+
+        # 3. 기존 테이블에 인덱스 추가
+        create_missing_indexes()
+
+        # 4. 새 컬럼 값 백필
+        normalize_sqlite_timestamps()
+        normalize_postgres_timestamps()
+        backfill_story_summaries()
+        backfill_random_keys()
+        backfill_difficulty_settings_version()
+        backfill_puzzle_difficulty()
+        backfill_ratings()
+
+        # 5. 스키마 버전 기록 (앱은 시작 시 이 버전만 확인)
+        with engine.begin() as conn:
+            set_schema_version(conn)
+        print(f"✅ 스키마 버전 {SCHEMA_VERSION} 기록 완료!")
+
+        print("\n🎉 모든 작업이 완료되었습니다!")
+
+    except Exception as e:
+        print(f"\n💥 오류 발생: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
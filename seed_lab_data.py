@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+랩 환경 합성 데이터 생성 스크립트
+사용자/보호자 그래프, 이야기와 세그먼트, 게임 결과, 사용자 난이도를 DATABASE_URL에 대량 삽입합니다.
+PostgreSQL은 COPY를 사용하므로 게임 결과 1,000만 행도 몇 분 안에 적재됩니다.
+
+사용자/보호자 그래프는 LAB_USER_GRAPH_PATH(기본값: lab_users.json)에 저장되고,
+랩 모드 서버의 User Service 대역(/lab/user-service)이 이 파일을 읽습니다.
+
+사용법:
+    SERVICE_LAB_MODE=true python seed_lab_data.py --users 1000 --stories 5000 --game-results 1000000
+    SERVICE_LAB_MODE=true python seed_lab_data.py --users 20000 --stories 100000 --game-results 10000000 --reset
+"""
+
+import argparse
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+# 환경변수 로드
+load_dotenv()
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.config.config import Config, is_lab_environment
+from app.database import engine, init_db
+from app.lab.data_seeder import LabDataSeeder
+
+def print_sample_tokens(graph_path: str, count: int = 3):
+    """시드된 시니어의 테스트용 JWT 출력 (SECRET_KEY가 있을 때)"""
+    secret_key = os.environ.get("SECRET_KEY")
+    if not secret_key:
+        print("ℹ️ SECRET_KEY가 없어 테스트 토큰을 만들지 않았습니다.")
+        return
+    import json
+    import jwt
+    with open(graph_path, "r", encoding="utf-8") as f:
+        users = json.load(f)["users"]
+    seniors = [user_id for user_id, user in users.items() if user["role"] == "senior"][:count]
+    print("🔑 테스트 토큰 (Authorization: Bearer <토큰>):")
+    for user_id in seniors:
+        print(f"   - 사용자 {user_id}: {jwt.encode({'sub': user_id}, secret_key, algorithm='HS256')}")
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="랩 환경 합성 데이터 생성")
+    parser.add_argument("--users", type=int, default=1000, help="사용자 수 (60%%는 시니어)")
+    parser.add_argument("--stories", type=int, default=5000, help="이야기 수")
+    parser.add_argument("--game-results", type=int, default=1000000, help="게임 결과 수")
+    parser.add_argument("--days", type=int, default=180, help="데이터 기간 (일)")
+    parser.add_argument("--batch-size", type=int, default=50000, help="삽입 배치 크기")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드 (같은 값이면 같은 데이터)")
+    parser.add_argument("--graph-path", default=Config.LAB_USER_GRAPH_PATH, help="사용자 그래프 JSON 경로")
+    parser.add_argument("--reset", action="store_true", help="기존 이야기/게임 데이터를 지우고 생성")
+    parser.add_argument("--force", action="store_true", help="랩 모드(SERVICE_LAB_MODE)가 아니어도 실행")
+    args = parser.parse_args()
+
+    if not is_lab_environment() and not args.force:
+        print("❌ 랩 모드가 아닙니다. 운영 DB 보호를 위해 SERVICE_LAB_MODE=true 또는 --force가 필요합니다.")
+        sys.exit(1)
+
+    print(f"🗄️ 대상 DB: {engine.url.render_as_string(hide_password=True)}")
+    init_db()
+    seeder = LabDataSeeder(engine, seed=args.seed, batch_size=args.batch_size)
+
+    print(f"🌱 생성 중... (사용자 {args.users:,}, 이야기 {args.stories:,}, 게임 결과 {args.game_results:,})")
+    started = time.perf_counter()
+    try:
+        summary = seeder.seed(
+            users=args.users, stories=args.stories, game_results=args.game_results,
+            days=args.days, graph_path=args.graph_path, reset=args.reset
+        )
+    except Exception as e:
+        print(f"❌ 데이터 생성 실패: {e}")
+        sys.exit(1)
+
+    for name, result in summary.items():
+        rate = result["rows"] / result["seconds"] if result["seconds"] else 0
+        print(f"   - {name}: {result['rows']:,}행, {result['seconds']:.1f}초 ({rate:,.0f}행/초)")
+    print(f"✅ 완료: {time.perf_counter() - started:.1f}초, 사용자 그래프 → {args.graph_path}")
+    print_sample_tokens(args.graph_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+난이도 정책 오프라인 시뮬레이터
+운영과 같은 난이도 규칙(app/core/difficulty_rules.py)에 합성 사용자 또는 내보낸 게임 기록을 메모리에서 재생하고
+진동률(oscillation), 첫 상승까지 걸린 게임 수, 초당 판단 수 등을 비교합니다. DB 조회는 하지 않습니다(--from-db 제외).
+
+사용법:
+    python simulate_difficulty.py --players 10000 --games-per-player 200 --workers 4
+    python simulate_difficulty.py --policy window      # 이전 방식(최근 10게임 기록)과 비교
+    python simulate_difficulty.py --profile all --players 20000 --games-per-player 100
+    python simulate_difficulty.py --set EASY_TO_MEDIUM=0.65 --set CONSECUTIVE_FAILURE_FOR_DECREASE=2
+    python simulate_difficulty.py --from-csv game_results.csv
+    python simulate_difficulty.py --from-db
+"""
+
+import argparse
+import os
+import sys
+from dotenv import load_dotenv
+
+# 환경변수 로드
+load_dotenv()
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.config.difficulty_config import SENIOR_DIFFICULTY_PROFILES
+from app.core.difficulty_rules import DIFFICULTY_THRESHOLDS, apply_profile
+from app.lab.difficulty_simulator import (
+    DEFAULT_OSCILLATION_WINDOW, POLICIES, load_csv_histories, load_database_histories, replay_histories, simulate_synthetic
+)
+
+def parse_overrides(items):
+    """KEY=VALUE 목록을 기준값 딕셔너리로 변환 (정수/실수 자동 판별)"""
+    overrides = {}
+    for item in items:
+        key, _, value = item.partition("=")
+        key = key.strip().upper()
+        if key not in DIFFICULTY_THRESHOLDS or not value:
+            raise ValueError(f"알 수 없는 기준값: {item} (사용 가능: {', '.join(DIFFICULTY_THRESHOLDS)})")
+        overrides[key] = int(value) if value.strip().lstrip("-").isdigit() else float(value)
+    return overrides
+
+def build_policies(profile: str, overrides):
+    """비교할 정책 목록 [(이름, 기준값)]"""
+    names = ["DEFAULT", *SENIOR_DIFFICULTY_PROFILES] if profile == "all" else [profile.upper()]
+    policies = []
+    for name in names:
+        if name == "DEFAULT":
+            thresholds = dict(DIFFICULTY_THRESHOLDS)
+        elif name in SENIOR_DIFFICULTY_PROFILES:
+            thresholds = apply_profile(DIFFICULTY_THRESHOLDS, SENIOR_DIFFICULTY_PROFILES[name])
+        else:
+            raise ValueError(f"알 수 없는 프로필: {name}")
+        thresholds.update(overrides)
+        policies.append((name, thresholds))
+    return policies
+
+def print_summary(name, summary):
+    def waits(value):
+        return "-" if value is None else f"{value}게임"
+
+    print(f"📊 {name}")
+    print(f"   - 사용자 {summary['players']:,}명, 게임 {summary['games']:,}, 판단 {summary['decisions']:,}")
+    print(f"   - 상승 {summary['level_ups']:,} / 하락 {summary['level_downs']:,}, "
+          f"100게임당 변경 {summary['changes_per_100_games']}, 진동률 {summary['oscillation_rate']:.1%}")
+    print(f"   - 첫 상승까지 p50 {waits(summary['time_to_level_up_p50'])}, p90 {waits(summary['time_to_level_up_p90'])}, "
+          f"끝까지 상승 못함 {summary['never_leveled_up']:.1%}, 어려운 게임 비중 {summary['hard_game_share']:.1%}")
+    print(f"   - {summary['elapsed_seconds']}초, 초당 판단 {summary['decisions_per_second']:,}")
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="난이도 정책 오프라인 시뮬레이션")
+    parser.add_argument("--players", type=int, default=10000, help="합성 사용자 수")
+    parser.add_argument("--games-per-player", type=int, default=100, help="합성 사용자당 게임 수")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="합성 시뮬레이션 프로세스 수")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드 (같은 값이면 같은 결과)")
+    parser.add_argument("--policy", choices=POLICIES, default="rating",
+                        help="rating: 실력 점수 + 히스테리시스 (운영), window: 최근 10게임 기록 기준 (이전 방식)")
+    parser.add_argument("--stories", type=int, default=500, help="합성 시뮬레이션의 이야기 수 (이야기 난이도 점수)")
+    parser.add_argument("--profile", default="DEFAULT",
+                        help="DEFAULT, SENIOR_DIFFICULTY_PROFILES 이름(BEGINNER 등) 또는 all")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="기준값 덮어쓰기 (예: EASY_TO_MEDIUM=0.65), 여러 번 지정 가능")
+    parser.add_argument("--oscillation-window", type=int, default=DEFAULT_OSCILLATION_WINDOW,
+                        help="변경 후 이 게임 수 안에 되돌아가면 진동으로 집계")
+    parser.add_argument("--from-csv", help="내보낸 게임 결과 CSV 재생 (user_id,game_type,is_correct,response_time,created_at)")
+    parser.add_argument("--from-db", action="store_true", help="DATABASE_URL의 game_results 재생")
+    args = parser.parse_args()
+
+    try:
+        policies = build_policies(args.profile, parse_overrides(args.set))
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    for name, thresholds in policies:
+        if args.from_csv:
+            if not os.path.exists(args.from_csv):
+                print(f"❌ 파일을 찾을 수 없습니다: {args.from_csv}")
+                sys.exit(1)
+            metrics = replay_histories(load_csv_histories(args.from_csv), thresholds, args.oscillation_window, args.policy)
+        elif args.from_db:
+            from app.database import engine
+            metrics = replay_histories(load_database_histories(engine), thresholds, args.oscillation_window, args.policy)
+        else:
+            metrics = simulate_synthetic(
+                args.players, args.games_per_player, thresholds,
+                seed=args.seed, workers=args.workers, oscillation_window=args.oscillation_window,
+                policy=args.policy, story_count=args.stories
+            )
+        print_summary(f"{name} ({args.policy})", metrics.summary())
+
+if __name__ == "__main__":
+    main()
@@ -33,6 +33,12 @@ if [ -f "venv/bin/activate" ]; then
     source venv/bin/activate
 fi
 
+# 운영: 의존성은 배포 시 설치되어 있으므로 설치 없이 gunicorn 워커 여러 개로 실행 (reload 없음)
+if [ "$PHASE" = "production" ]; then
+    echo "Starting service on port 8011 (gunicorn, ${WEB_CONCURRENCY:-$(nproc)} workers)..."
+    exec gunicorn -c gunicorn.conf.py story_manage:app
+fi
+
 # 의존성 설치
 echo "Installing dependencies..."
 pip install -r requirements.txt
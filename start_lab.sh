@@ -14,6 +14,11 @@ export CORE_MODULES_AVAILABLE=false
 # 환경변수 설정
 export OPENAI_API_KEY=${OPENAI_API_KEY:-mock_key}
 export STORY_DATABASE_URL=${STORY_DATABASE_URL:-sqlite:///test.db}
+# 랩 데이터는 로컬 DB에 저장 (PostgreSQL을 쓰려면 DATABASE_URL 지정)
+export DATABASE_URL=${DATABASE_URL:-sqlite:///lab.db}
+export SECRET_KEY=${SECRET_KEY:-lab-secret-key-change-me-0123456789}
+# User Service 대역 (seed_lab_data.py로 만든 사용자/보호자 그래프 제공)
+export USER_SERVICE_URL=${USER_SERVICE_URL:-http://localhost:8011/lab/user-service}
 export AWS_ACCESS_KEY_ID=${AWS_ACCESS_KEY_ID:-mock_key}
 export AWS_SECRET_ACCESS_KEY=${AWS_SECRET_ACCESS_KEY:-mock_secret}
 export S3_BUCKET_NAME=${S3_BUCKET_NAME:-mock-bucket}
@@ -37,6 +42,12 @@ fi
 echo "Installing dependencies..."
 pip install -r requirements.txt
 
+# 랩 데이터가 없으면 기본 규모로 생성 (대용량은 seed_lab_data.py 직접 실행)
+if [ ! -f "${LAB_USER_GRAPH_PATH:-lab_users.json}" ]; then
+    echo "Seeding lab data..."
+    python seed_lab_data.py
+fi
+
 # 서비스 시작
 echo "Starting service in LAB mode on port 8011..."
 uvicorn story_manage:app --host 0.0.0.0 --port 8011 --reload 
\ No newline at end of file
@@ -68,29 +68,80 @@ async function handleImageUpload(event) {
   }
   
   try {
-    const formData = new FormData();
-    formData.append('file', file);
+    // S3 직접 업로드 (실패 시 API 서버 경유 업로드로 대체)
+    let imageUrl = await uploadImageDirect(file);
+    if (!imageUrl) {
+      imageUrl = await uploadImageViaApi(file);
+    }
     
-    const response = await fetch(`${API_BASE_URL}/upload/image`, {
+    uploadedImageUrl = imageUrl;
+    showImagePreview(uploadedImageUrl);
+    showMessage('이미지가 성공적으로 업로드되었습니다.', 'success');
+  } catch (error) {
+    showMessage('이미지 업로드 중 오류가 발생했습니다: ' + error.message, 'error');
+  }
+}
+
+// presigned POST로 S3에 직접 업로드 후 완료 검증, 실패 시 null 반환
+async function uploadImageDirect(file) {
+  try {
+    const presignResponse = await fetch(`${API_BASE_URL}/upload/image/presign`, {
       method: 'POST',
       headers: {
-        'Authorization': 'Bearer ' + jwt
+        'Authorization': 'Bearer ' + jwt,
+        'Content-Type': 'application/json'
       },
-      body: formData
+      body: JSON.stringify({ filename: file.name, content_type: file.type, size: file.size })
     });
+    const presignData = await presignResponse.json();
+    if (!presignResponse.ok || !presignData.results) {
+      return null;
+    }
     
-    const data = await response.json();
+    const presigned = presignData.results;
+    const formData = new FormData();
+    Object.entries(presigned.fields).forEach(([key, value]) => formData.append(key, value));
+    formData.append('file', file);  // file 필드는 반드시 마지막
     
-    if (data.results) {
-      uploadedImageUrl = data.results.image_url;
-      showImagePreview(uploadedImageUrl);
-      showMessage('이미지가 성공적으로 업로드되었습니다.', 'success');
-    } else {
-      showMessage('이미지 업로드에 실패했습니다: ' + (data.error || '알 수 없는 오류'), 'error');
+    const uploadResponse = await fetch(presigned.url, { method: 'POST', body: formData });
+    if (!uploadResponse.ok) {
+      return null;
     }
+    
+    const completeResponse = await fetch(`${API_BASE_URL}/upload/image/complete`, {
+      method: 'POST',
+      headers: {
+        'Authorization': 'Bearer ' + jwt,
+        'Content-Type': 'application/json'
+      },
+      body: JSON.stringify({ key: presigned.key })
+    });
+    const completeData = await completeResponse.json();
+    return completeData.results ? completeData.results.image_url : null;
   } catch (error) {
-    showMessage('이미지 업로드 중 오류가 발생했습니다: ' + error.message, 'error');
+    console.warn('S3 직접 업로드 실패, 서버 경유 업로드로 재시도합니다:', error);
+    return null;
+  }
+}
+
+// API 서버를 거쳐 업로드
+async function uploadImageViaApi(file) {
+  const formData = new FormData();
+  formData.append('file', file);
+  
+  const response = await fetch(`${API_BASE_URL}/upload/image`, {
+    method: 'POST',
+    headers: {
+      'Authorization': 'Bearer ' + jwt
+    },
+    body: formData
+  });
+  
+  const data = await response.json();
+  if (!data.results) {
+    throw new Error(data.error || data.detail || '알 수 없는 오류');
   }
+  return data.results.image_url;
 }
 
 // 이미지 미리보기 표시
@@ -112,18 +163,24 @@ function removeImage() {
 // API 호출 함수들
 async function fetchStories() {
   try {
-    const response = await fetch(`${API_BASE_URL}/stories/`, {
-      headers: {
-        'Authorization': 'Bearer ' + jwt,
-        'Content-Type': 'application/json'
-      }
-    });
-    const data = await response.json();
-    if (data.results) {
-      stories = data.results;
-    } else {
-      stories = [];
-    }
+    // 목록은 커서 기반 페이지로 내려오므로 next_cursor가 없을 때까지 이어서 조회
+    const loaded = [];
+    let cursor = null;
+    do {
+      const params = new URLSearchParams({ limit: '100' });
+      if (cursor) params.set('cursor', cursor);
+      const response = await fetch(`${API_BASE_URL}/stories/?${params}`, {
+        headers: {
+          'Authorization': 'Bearer ' + jwt,
+          'Content-Type': 'application/json'
+        }
+      });
+      const data = await response.json();
+      if (!data.results) break;
+      loaded.push(...data.results);
+      cursor = data.meta ? data.meta.next_cursor : null;
+    } while (cursor);
+    stories = loaded;
   } catch (error) {
     console.error('이야기 목록을 불러오는데 실패했습니다:', error);
     stories = [];